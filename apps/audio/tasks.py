@@ -6,11 +6,10 @@ Celery tasks for audio conversion, trimming, and extraction.
 import os
 import time
 from django.conf import settings
-from django.core.files import File
 from apps.core.celery_compat import shared_task
 
-from apps.core.models import ConversionJob, ConvertedFile
-from apps.core.tasks import BaseConversionTask, update_job_processing
+from apps.core.models import ConversionJob
+from apps.core.tasks import BaseConversionTask, RETRY_POLICY, update_job_processing
 from apps.core.utils import (
     convert_audio,
     trim_audio,
@@ -18,9 +17,15 @@ from apps.core.utils import (
     get_duration,
     generate_output_filename,
     get_file_size,
+    persist_output,
+    remove_file,
 )
 
-@shared_task(base=BaseConversionTask, bind=True, autoretry_for=(Exception,), retry_backoff=True, max_retries=3)
+# Resolved once per worker process instead of per task
+AUDIO_OUTPUT_DIR = settings.OUTPUT_DIR / 'audio'
+AUDIO_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+@shared_task(base=BaseConversionTask, bind=True, **RETRY_POLICY)
 def convert_audio_task(self, job_id, output_format, options):
     """Background task for audio conversion."""
     job = update_job_processing(job_id)
@@ -39,30 +44,18 @@ def convert_audio_task(self, job_id, output_format, options):
         
         # Output setup
         output_filename = generate_output_filename(os.path.basename(job.input_file.name), output_format)
-        output_dir = settings.OUTPUT_DIR / 'audio'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = str(output_dir / output_filename)
+        output_path = str(AUDIO_OUTPUT_DIR / output_filename)
         
         # Perform conversion
         convert_audio(input_path, output_path, output_format, options)
         
-        # Save result
-        with open(output_path, 'rb') as f:
-            job.output_file.save(output_filename, File(f), save=False)
-        
-        job.mark_completed(job.output_file.name)
-        
-        # ConvertedFile record
-        ConvertedFile.objects.create(
-            conversion_job=job,
-            output_file=job.output_file,
-            output_format=output_format,
-            file_size=get_file_size(output_path)
-        )
+        # Save result and mark completed in one transaction
+        file_size = get_file_size(output_path)
+        persist_output(job, output_path, output_filename, move=True)
+        job.complete_with_output(output_format=output_format, file_size=file_size)
         
         # Cleanup
-        if os.path.exists(output_path):
-            os.remove(output_path)
+        remove_file(output_path)
             
         return True
     
@@ -83,28 +76,17 @@ def trim_audio_task(self, job_id, trim_start, trim_end, copy_mode, output_format
         
         # Output setup
         output_filename = generate_output_filename(os.path.basename(job.input_file.name), output_format)
-        output_dir = settings.OUTPUT_DIR / 'audio'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = str(output_dir / output_filename)
+        output_path = str(AUDIO_OUTPUT_DIR / output_filename)
         
         # Perform trim
         trim_audio(input_path, output_path, trim_start, trim_end, copy_mode)
         
-        # Save result
-        with open(output_path, 'rb') as f:
-            job.output_file.save(output_filename, File(f), save=False)
-            
-        job.mark_completed(job.output_file.name)
+        # Save result and mark completed in one transaction
+        file_size = get_file_size(output_path)
+        persist_output(job, output_path, output_filename, move=True)
+        job.complete_with_output(output_format=output_format, file_size=file_size)
         
-        ConvertedFile.objects.create(
-            conversion_job=job,
-            output_file=job.output_file,
-            output_format=output_format,
-            file_size=get_file_size(output_path)
-        )
-        
-        if os.path.exists(output_path):
-            os.remove(output_path)
+        remove_file(output_path)
             
         return True
     except Exception as e:
@@ -122,28 +104,17 @@ def video_to_audio_task(self, job_id, output_format, options):
         
         # Output setup
         output_filename = generate_output_filename(os.path.basename(job.input_file.name), output_format)
-        output_dir = settings.OUTPUT_DIR / 'audio'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = str(output_dir / output_filename)
+        output_path = str(AUDIO_OUTPUT_DIR / output_filename)
         
         # Extract
         extract_audio_from_video(input_path, output_path, output_format, options)
         
-        # Save result
-        with open(output_path, 'rb') as f:
-            job.output_file.save(output_filename, File(f), save=False)
-            
-        job.mark_completed(job.output_file.name)
-        
-        ConvertedFile.objects.create(
-            conversion_job=job,
-            output_file=job.output_file,
-            output_format=output_format,
-            file_size=get_file_size(output_path)
-        )
+        # Save result and mark completed in one transaction
+        file_size = get_file_size(output_path)
+        persist_output(job, output_path, output_filename, move=True)
+        job.complete_with_output(output_format=output_format, file_size=file_size)
         
-        if os.path.exists(output_path):
-            os.remove(output_path)
+        remove_file(output_path)
             
         return True
     except Exception as e:
@@ -7,6 +7,69 @@ from django.views.generic import TemplateView
 from django.conf import settings
 
 
+# Tool cards on the audio home page
+AUDIO_TOOLS = (
+    {
+        'name': 'Audio Converter',
+        'description': 'Convert audio files between 15+ formats',
+        'url': '/audio/convert/',
+        'icon': '🔄'
+    },
+    {
+        'name': 'Audio Trimmer',
+        'description': 'Trim audio files with timeline selection',
+        'url': '/audio/trim/',
+        'icon': '✂️'
+    },
+    {
+        'name': 'Video to Audio',
+        'description': 'Extract audio from video files',
+        'url': '/audio/extract/',
+        'icon': '🎬➡️🎵'
+    },
+)
+
+
+# Output format choices on the convert page
+AUDIO_OUTPUT_FORMATS = (
+    {'value': 'mp3', 'label': 'MP3'},
+    {'value': 'wav', 'label': 'WAV'},
+    {'value': 'aac', 'label': 'AAC'},
+    {'value': 'm4a', 'label': 'M4A'},
+    {'value': 'flac', 'label': 'FLAC'},
+    {'value': 'ogg', 'label': 'OGG'},
+    {'value': 'opus', 'label': 'OPUS'},
+    {'value': 'aiff', 'label': 'AIFF'},
+    {'value': 'wma', 'label': 'WMA'},
+    {'value': 'amr', 'label': 'AMR'},
+    {'value': 'ac3', 'label': 'AC3'},
+    {'value': 'ape', 'label': 'APE'},
+    {'value': 'caf', 'label': 'CAF'},
+)
+
+
+# Bitrate choices on the convert page
+AUDIO_BITRATE_OPTIONS = (
+    {'value': '64k', 'label': '64 kbps'},
+    {'value': '128k', 'label': '128 kbps'},
+    {'value': '192k', 'label': '192 kbps'},
+    {'value': '256k', 'label': '256 kbps'},
+    {'value': '320k', 'label': '320 kbps'},
+)
+
+
+# Output format choices on the video-to-audio page
+EXTRACT_OUTPUT_FORMATS = (
+    {'value': 'mp3', 'label': 'MP3'},
+    {'value': 'wav', 'label': 'WAV'},
+    {'value': 'aac', 'label': 'AAC'},
+    {'value': 'm4a', 'label': 'M4A'},
+    {'value': 'flac', 'label': 'FLAC'},
+    {'value': 'ogg', 'label': 'OGG'},
+    {'value': 'opus', 'label': 'OPUS'},
+)
+
+
 class AudioHomeView(TemplateView):
     """Audio tools home page."""
     template_name = 'audio/home.html'
@@ -14,26 +77,7 @@ class AudioHomeView(TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['title'] = 'Audio Tools'
-        context['tools'] = [
-            {
-                'name': 'Audio Converter',
-                'description': 'Convert audio files between 15+ formats',
-                'url': '/audio/convert/',
-                'icon': '🔄'
-            },
-            {
-                'name': 'Audio Trimmer',
-                'description': 'Trim audio files with timeline selection',
-                'url': '/audio/trim/',
-                'icon': '✂️'
-            },
-            {
-                'name': 'Video to Audio',
-                'description': 'Extract audio from video files',
-                'url': '/audio/extract/',
-                'icon': '🎬➡️🎵'
-            },
-        ]
+        context['tools'] = AUDIO_TOOLS
         return context
 
 
@@ -45,28 +89,8 @@ class AudioConvertPageView(TemplateView):
         context = super().get_context_data(**kwargs)
         context['title'] = 'Audio Converter'
         context['input_formats'] = settings.SUPPORTED_AUDIO_FORMATS
-        context['output_formats'] = [
-            {'value': 'mp3', 'label': 'MP3'},
-            {'value': 'wav', 'label': 'WAV'},
-            {'value': 'aac', 'label': 'AAC'},
-            {'value': 'm4a', 'label': 'M4A'},
-            {'value': 'flac', 'label': 'FLAC'},
-            {'value': 'ogg', 'label': 'OGG'},
-            {'value': 'opus', 'label': 'OPUS'},
-            {'value': 'aiff', 'label': 'AIFF'},
-            {'value': 'wma', 'label': 'WMA'},
-            {'value': 'amr', 'label': 'AMR'},
-            {'value': 'ac3', 'label': 'AC3'},
-            {'value': 'ape', 'label': 'APE'},
-            {'value': 'caf', 'label': 'CAF'},
-        ]
-        context['bitrate_options'] = [
-            {'value': '64k', 'label': '64 kbps'},
-            {'value': '128k', 'label': '128 kbps'},
-            {'value': '192k', 'label': '192 kbps'},
-            {'value': '256k', 'label': '256 kbps'},
-            {'value': '320k', 'label': '320 kbps'},
-        ]
+        context['output_formats'] = AUDIO_OUTPUT_FORMATS
+        context['bitrate_options'] = AUDIO_BITRATE_OPTIONS
         return context
 
 
@@ -89,13 +113,5 @@ class VideoToAudioPageView(TemplateView):
         context = super().get_context_data(**kwargs)
         context['title'] = 'Video to Audio'
         context['input_formats'] = settings.SUPPORTED_VIDEO_FORMATS
-        context['output_formats'] = [
-            {'value': 'mp3', 'label': 'MP3'},
-            {'value': 'wav', 'label': 'WAV'},
-            {'value': 'aac', 'label': 'AAC'},
-            {'value': 'm4a', 'label': 'M4A'},
-            {'value': 'flac', 'label': 'FLAC'},
-            {'value': 'ogg', 'label': 'OGG'},
-            {'value': 'opus', 'label': 'OPUS'},
-        ]
+        context['output_formats'] = EXTRACT_OUTPUT_FORMATS
         return context
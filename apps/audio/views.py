@@ -30,9 +30,15 @@ from apps.core.utils import (
     get_file_extension,
     generate_output_filename,
     get_file_size,
+    save_upload,
+    open_scratch_file,
     FFmpegError,
 )
-from .tasks import convert_audio_task, trim_audio_task, video_to_audio_task
+from .tasks import AUDIO_OUTPUT_DIR, convert_audio_task, trim_audio_task, video_to_audio_task
+
+# Staging directory for uploads that are only probed, created once per process
+INFO_TEMP_DIR = settings.UPLOAD_DIR / 'temp'
+INFO_TEMP_DIR.mkdir(parents=True, exist_ok=True)
 
 
 
@@ -51,11 +57,6 @@ class AudioConvertView(BaseConversionView):
     def post(self, request):
         """Convert audio file to specified format."""
         
-        # Check rate limit
-        rate_limit_response = self.check_rate_limit(request)
-        if rate_limit_response:
-            return rate_limit_response
-        
         # Validate input
         serializer = AudioConvertSerializer(data=request.data)
         if not serializer.is_valid():
@@ -104,6 +105,7 @@ class AudioConvertView(BaseConversionView):
         # Async mode dispatch
         if settings.USE_ASYNC_CONVERSION:
             convert_audio_task.delay(job.id, output_format, options)
+            self.hand_off_slot(request)
             self.log_usage(request, success=True, job=job)
             response_serializer = ConversionJobSerializer(job, context={'request': request})
             return Response(response_serializer.data, status=status.HTTP_200_OK)
@@ -121,9 +123,7 @@ class AudioConvertView(BaseConversionView):
             
             # Generate output filename and path
             output_filename = generate_output_filename(uploaded_file.name, output_format)
-            output_dir = settings.OUTPUT_DIR / 'audio'
-            output_dir.mkdir(parents=True, exist_ok=True)
-            output_path = str(output_dir / output_filename)
+            output_path = str(AUDIO_OUTPUT_DIR / output_filename)
             
             # Convert audio
             convert_audio(input_path, output_path, output_format, options)
@@ -188,11 +188,6 @@ class AudioTrimView(BaseConversionView):
     def post(self, request):
         """Trim audio file between start and end times."""
         
-        # Check rate limit
-        rate_limit_response = self.check_rate_limit(request)
-        if rate_limit_response:
-            return rate_limit_response
-        
         # Validate input
         serializer = AudioTrimSerializer(data=request.data)
         if not serializer.is_valid():
@@ -243,6 +238,7 @@ class AudioTrimView(BaseConversionView):
         # Async mode dispatch
         if settings.USE_ASYNC_CONVERSION:
             trim_audio_task.delay(job.id, trim_start, trim_end, copy_mode, output_format)
+            self.hand_off_slot(request)
             self.log_usage(request, success=True, job=job)
             response_serializer = ConversionJobSerializer(job, context={'request': request})
             return Response(response_serializer.data, status=status.HTTP_200_OK)
@@ -272,9 +268,7 @@ class AudioTrimView(BaseConversionView):
                 uploaded_file.name,
                 output_format if output_format else input_format
             )
-            output_dir = settings.OUTPUT_DIR / 'audio'
-            output_dir.mkdir(parents=True, exist_ok=True)
-            output_path = str(output_dir / output_filename)
+            output_path = str(AUDIO_OUTPUT_DIR / output_filename)
             
             # Trim audio
             trim_audio(input_path, output_path, trim_start, trim_end, copy_mode)
@@ -340,11 +334,6 @@ class VideoToAudioView(BaseConversionView):
     def post(self, request):
         """Extract audio from video file."""
         
-        # Check rate limit
-        rate_limit_response = self.check_rate_limit(request)
-        if rate_limit_response:
-            return rate_limit_response
-        
         # Validate input
         serializer = VideoToAudioSerializer(data=request.data)
         if not serializer.is_valid():
@@ -378,7 +367,7 @@ class VideoToAudioView(BaseConversionView):
         input_format = get_file_extension(uploaded_file.name)
         
         # Validate input is a video format
-        video_formats = getattr(settings, 'SUPPORTED_VIDEO_FORMATS', [])
+        video_formats = getattr(settings, 'SUPPORTED_VIDEO_FORMATS', frozenset())
         if input_format not in video_formats:
             return Response(
                 {'error': f'Unsupported video format: {input_format}'},
@@ -397,6 +386,7 @@ class VideoToAudioView(BaseConversionView):
         # Async mode dispatch
         if settings.USE_ASYNC_CONVERSION:
             video_to_audio_task.delay(job.id, output_format, options)
+            self.hand_off_slot(request)
             self.log_usage(request, success=True, job=job)
             response_serializer = ConversionJobSerializer(job, context={'request': request})
             return Response(response_serializer.data, status=status.HTTP_200_OK)
@@ -414,9 +404,7 @@ class VideoToAudioView(BaseConversionView):
             
             # Generate output filename and path
             output_filename = generate_output_filename(uploaded_file.name, output_format)
-            output_dir = settings.OUTPUT_DIR / 'audio'
-            output_dir.mkdir(parents=True, exist_ok=True)
-            output_path = str(output_dir / output_filename)
+            output_path = str(AUDIO_OUTPUT_DIR / output_filename)
             
             # Extract audio
             extract_audio_from_video(input_path, output_path, output_format, options)
@@ -481,18 +469,19 @@ class AudioInfoView(APIView):
         
         uploaded_file = request.data['file']
         
-        # Save temporarily
-        temp_dir = settings.UPLOAD_DIR / 'temp'
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        temp_path = str(temp_dir / uploaded_file.name)
+        release_temp = None
         
         try:
-            with open(temp_path, 'wb') as f:
-                for chunk in uploaded_file.chunks():
-                    f.write(chunk)
+            # Uploads Django spooled to disk are probed in place; in-memory
+            # ones are written to an anonymous scratch file with one write()
+            if hasattr(uploaded_file, 'temporary_file_path'):
+                probe_path = uploaded_file.temporary_file_path()
+            else:
+                temp_path, release_temp = open_scratch_file(INFO_TEMP_DIR)
+                probe_path = save_upload(uploaded_file, temp_path)
             
             # Get media info
-            info = get_media_info(temp_path)
+            info = get_media_info(probe_path)
             
             # Extract relevant data
             format_info = info.get('format', {})
@@ -529,5 +518,5 @@ class AudioInfoView(APIView):
         
         finally:
             # Clean up temp file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            if release_temp:
+                release_temp()
@@ -1,7 +1,36 @@
+from pathlib import Path
+
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Switch new SQLite connections to WAL mode.
+
+    WAL lets readers run alongside the single writer, and synchronous=NORMAL
+    is safe under WAL while skipping an fsync per commit. busy_timeout makes
+    a writer wait for the lock rather than fail immediately.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute('PRAGMA busy_timeout=5000')
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
     verbose_name = 'Core'
+
+    def ready(self):
+        # Created once per process, before any view or task module (whose
+        # own output subdirectories live under these) is imported
+        for directory in (settings.UPLOAD_DIR, settings.OUTPUT_DIR, settings.FILE_UPLOAD_TEMP_DIR):
+            if directory:
+                Path(directory).mkdir(parents=True, exist_ok=True)
+
+        connection_created.connect(configure_sqlite, dispatch_uid='core.configure_sqlite')
@@ -6,6 +6,7 @@ Uses dependency_guard for safe detection.
 
 import logging
 import functools
+import time
 from apps.core.dependency_guard import CELERY_AVAILABLE
 
 logger = logging.getLogger(__name__)
@@ -45,6 +46,10 @@ class SyncTask:
     def on_retry(self, exc, task_id, args, kwargs, einfo):
         """Handle task retry - override in subclass."""
         pass
+    
+    def after_return(self, status, retval, task_id, args, kwargs, einfo):
+        """Handle task return (success or failure) - override in subclass."""
+        pass
 
 
 def make_sync_task(func, base_class=None):
@@ -59,9 +64,11 @@ def make_sync_task(func, base_class=None):
             try:
                 result = func(task_instance, *args, **kwargs)
                 task_instance.on_success(result, 'sync-task', args, kwargs)
+                task_instance.after_return('SUCCESS', result, 'sync-task', args, kwargs, None)
                 return result
             except Exception as e:
                 task_instance.on_failure(e, 'sync-task', args, kwargs, None)
+                task_instance.after_return('FAILURE', e, 'sync-task', args, kwargs, None)
                 raise
         else:
             return func(*args, **kwargs)
@@ -111,6 +118,80 @@ def shared_task(*args, **kwargs):
     return decorator
 
 
+def send_task_nowait(task, args=None, kwargs=None, **options):
+    """
+    Fire-and-forget dispatch of a task by name.
+    
+    Publishes the message without registering a result in the result
+    backend (results are persisted on the ConversionJob instead).
+    Compression follows settings.CELERY_TASK_COMPRESSION.
+    Runs the task inline when Celery is not installed.
+    """
+    args = args or []
+    kwargs = kwargs or {}
+    
+    if not CELERY_AVAILABLE:
+        return task.delay(*args, **kwargs)
+    
+    from config.celery import app
+    
+    return app.send_task(
+        task.name,
+        args=args,
+        kwargs=kwargs,
+        ignore_result=True,
+        **options
+    )
+
+
+# How long a broker reachability result is trusted before re-checking
+BROKER_CHECK_INTERVAL = 30
+
+_broker_status = {'reachable': False, 'checked_at': None}
+
+
+def async_conversion_enabled() -> bool:
+    """
+    Whether conversion jobs should be queued instead of run inline.
+    
+    Requires USE_ASYNC_CONVERSION, Celery, and a reachable broker. If the
+    broker is down, views fall back to processing in the request instead
+    of queueing jobs nobody will pick up.
+    """
+    from django.conf import settings
+    
+    return settings.USE_ASYNC_CONVERSION and broker_reachable()
+
+
+def broker_reachable() -> bool:
+    """
+    Whether Celery is installed and its broker accepts connections.
+    
+    The check is cached for BROKER_CHECK_INTERVAL seconds so it costs
+    nothing per request.
+    """
+    if not CELERY_AVAILABLE:
+        return False
+    
+    now = time.monotonic()
+    checked_at = _broker_status['checked_at']
+    if checked_at is not None and now - checked_at < BROKER_CHECK_INTERVAL:
+        return _broker_status['reachable']
+    
+    from config.celery import app
+    
+    try:
+        with app.connection_for_write() as conn:
+            conn.ensure_connection(max_retries=1, timeout=1)
+        reachable = True
+    except Exception as e:
+        logger.warning(f"Celery broker unreachable, processing inline: {e}")
+        reachable = False
+    
+    _broker_status.update(reachable=reachable, checked_at=now)
+    return reachable
+
+
 if CELERY_AVAILABLE:
     Task = CeleryTask
 else:
@@ -27,6 +27,12 @@ PYMUPDF_AVAILABLE = is_available('fitz')
 CAIROSVG_AVAILABLE = is_available('cairosvg')
 WEASYPRINT_AVAILABLE = is_available('weasyprint')
 HEIF_AVAILABLE = is_available('pillow_heif')
+PYVIPS_AVAILABLE = is_available('pyvips')
+BOTO3_AVAILABLE = is_available('boto3')
+BLAKE3_AVAILABLE = is_available('blake3')
+ZSTD_AVAILABLE = is_available('zstandard')
+REDIS_AVAILABLE = is_available('redis')
+PYNVVIDEOCODEC_AVAILABLE = is_available('PyNvVideoCodec')
 
 # Log availability for debugging
 if not CELERY_AVAILABLE:
@@ -0,0 +1,157 @@
+"""
+Core Middleware.
+Per-client rate limiting for the conversion endpoints.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.http import JsonResponse
+
+from .dependency_guard import REDIS_AVAILABLE
+from .ratelimit import (
+    ACQUIRE_SLOT_SCRIPT,
+    HitCounter,
+    acquire_slot,
+    get_client,
+    release_slot,
+)
+from .utils import check_rate_limit, get_client_ip
+from .views import BaseConversionView
+
+logger = logging.getLogger(__name__)
+
+# After a Redis failure, use the database count for this many seconds
+# before trying Redis again
+REDIS_RETRY_INTERVAL = 30
+
+
+class RateLimitMiddleware:
+    """
+    Enforce RATE_LIMIT_REQUESTS_PER_HOUR on POSTs to conversion views.
+
+    Runs once per request, ahead of the view, for every BaseConversionView.
+    Hits are counted in-process and flushed to Redis in batches (see
+    HitCounter); if Redis is not installed or not reachable, it falls back
+    to counting ToolUsageLog rows.
+
+    Also caps MAX_CONCURRENT_CONVERSIONS_PER_IP (see ratelimit). The slot is
+    released when the response is ready, unless the view queued a job and
+    handed the slot over (BaseConversionView.hand_off_slot); that job's
+    task releases it instead. The concurrency cap has no database fallback
+    and is skipped while Redis is unavailable.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._hits = HitCounter()
+        self._slot_script = None
+        self._redis_failed_at = None
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        # A view that queued a task hands the slot to it (hand_off_slot)
+        holder = getattr(request, 'concurrency_slot', None)
+        if holder and not getattr(request, 'concurrency_slot_handed_off', False):
+            self._release_slot(holder)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        if (
+            request.method != 'POST'
+            or view_class is None
+            or not issubclass(view_class, BaseConversionView)
+        ):
+            return None
+
+        limit = getattr(settings, 'RATE_LIMIT_REQUESTS_PER_HOUR', 100)
+        client_ip = get_client_ip(request)
+
+        count = self._count_hit(client_ip)
+        if count is None:
+            is_allowed, remaining = check_rate_limit(client_ip)
+        else:
+            is_allowed, remaining = count <= limit, max(0, limit - count)
+
+        if not is_allowed:
+            return JsonResponse(
+                {
+                    'error': 'Rate limit exceeded. Please try again later.',
+                    'remaining_requests': remaining
+                },
+                status=429
+            )
+
+        slot = self._acquire_slot(client_ip)
+        if slot is False:
+            return JsonResponse(
+                {'error': 'Too many conversions in progress. Please wait for one to finish.'},
+                status=429
+            )
+        if slot:
+            request.concurrency_slot = {'client_ip': client_ip, 'slot': slot}
+
+        return None
+
+    def _redis_usable(self) -> bool:
+        """Whether Redis is installed and not in its failure backoff."""
+        if not REDIS_AVAILABLE:
+            return False
+        return (
+            self._redis_failed_at is None
+            or time.monotonic() - self._redis_failed_at >= REDIS_RETRY_INTERVAL
+        )
+
+    def _acquire_slot(self, client_ip: str):
+        """
+        Take a concurrent-conversion slot.
+
+        Returns:
+            Slot id, False when the client is at its limit, or None when
+            Redis can't be used (the cap is not enforced)
+        """
+        if not self._redis_usable():
+            return None
+
+        import redis
+
+        try:
+            if self._slot_script is None:
+                self._slot_script = get_client().register_script(ACQUIRE_SLOT_SCRIPT)
+            slot = acquire_slot(self._slot_script, client_ip)
+        except redis.RedisError as e:
+            logger.warning(f"Rate limit store unreachable, not limiting concurrency: {e}")
+            self._redis_failed_at = time.monotonic()
+            return None
+
+        return slot or False
+
+    def _release_slot(self, holder: dict) -> None:
+        """Give back a slot taken in process_view (best effort)."""
+        import redis
+
+        try:
+            release_slot(get_client(), holder['client_ip'], holder['slot'])
+        except redis.RedisError as e:
+            logger.warning(f"Could not release conversion slot, it will expire: {e}")
+
+    def _count_hit(self, client_ip: str):
+        """
+        Count this request; returns None when Redis can't be used.
+
+        The count is the local estimate from HitCounter, so this never
+        waits on Redis. A failed flush switches to the database count for
+        REDIS_RETRY_INTERVAL.
+        """
+        if not REDIS_AVAILABLE:
+            return None
+
+        failed_at = self._hits.failed_at
+        if failed_at is not None and time.monotonic() - failed_at < REDIS_RETRY_INTERVAL:
+            return None
+
+        return self._hits.hit(client_ip)
@@ -4,7 +4,7 @@ All production-ready models with proper indexes and relationships.
 """
 
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from datetime import timedelta
 
@@ -141,10 +141,14 @@ class ConversionJob(models.Model):
     def __str__(self):
         return f'{self.tool_type}:{self.operation_type} - {self.status} ({self.id})'
     
-    def mark_processing(self):
-        """Mark job as processing."""
+    def mark_processing(self, duration=None):
+        """Mark job as processing, storing its duration in the same UPDATE."""
         self.status = JobStatus.PROCESSING
-        self.save(update_fields=['status'])
+        update_fields = ['status']
+        if duration is not None:
+            self.duration = duration
+            update_fields.append('duration')
+        self.save(update_fields=update_fields)
     
     def mark_completed(self, output_file_path):
         """Mark job as completed with output file."""
@@ -153,6 +157,21 @@ class ConversionJob(models.Model):
         self.completed_at = timezone.now()
         self.save(update_fields=['status', 'output_file', 'completed_at'])
     
+    def complete_with_output(self, output_format, file_size, original_filename=''):
+        """
+        Mark job as completed and register its ConvertedFile.
+        Both writes share one transaction (a single commit round-trip).
+        """
+        with transaction.atomic():
+            self.mark_completed(self.output_file.name)
+            return ConvertedFile.objects.create(
+                conversion_job=self,
+                output_file=self.output_file,
+                output_format=output_format,
+                original_filename=original_filename,
+                file_size=file_size
+            )
+    
     def mark_failed(self, error_message):
         """Mark job as failed with error message."""
         self.status = JobStatus.FAILED
@@ -297,10 +316,19 @@ class ConvertedFile(models.Model):
         return timezone.now() > self.expires_at
     
     def record_download(self):
-        """Record a download event."""
+        """
+        Record a download event.
+        
+        The count is incremented in the database (one atomic UPDATE), so
+        concurrent downloads of the same file are all counted.
+        """
+        now = timezone.now()
+        ConvertedFile.objects.filter(pk=self.pk).update(
+            download_count=models.F('download_count') + 1,
+            last_downloaded_at=now
+        )
         self.download_count += 1
-        self.last_downloaded_at = timezone.now()
-        self.save(update_fields=['download_count', 'last_downloaded_at'])
+        self.last_downloaded_at = now
 
 
 class ToolUsageLog(models.Model):
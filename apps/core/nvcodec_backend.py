@@ -0,0 +1,120 @@
+"""
+PyNvVideoCodec Video Backend.
+GPU-native H.264 transcoding that keeps decoded frames on the GPU.
+
+FFmpeg's NVDEC -> NVENC path still runs every frame through its filter
+graph; PyNvVideoCodec hands decoded surfaces straight to the encoder.
+Video is transcoded here and FFmpeg is only used to remux it with the
+original audio. Enabled with settings.VIDEO_BACKEND = 'pynvc'.
+"""
+
+import os
+import tempfile
+from typing import Dict, Optional
+
+from django.conf import settings
+
+from .dependency_guard import PYNVVIDEOCODEC_AVAILABLE
+from .utils import FFmpegError, get_media_info, run_ffmpeg, remove_file
+
+
+# Encoder settings comparable to NVENC_OPTIONS (p4, constant quality 23)
+NVC_ENCODER_CONFIG = {
+    'codec': 'h264',
+    'preset': 'P4',
+    'rc': 'vbr',
+    'cq': 23,
+}
+
+
+def backend_enabled() -> bool:
+    """Whether convert_video should try this backend first."""
+    return (
+        PYNVVIDEOCODEC_AVAILABLE
+        and getattr(settings, 'VIDEO_BACKEND', 'ffmpeg').lower() == 'pynvc'
+    )
+
+
+def _frame_rate(input_path: str) -> str:
+    """Video stream frame rate as FFmpeg expects it (e.g. '30000/1001')."""
+    info = get_media_info(input_path)
+    for stream in info.get('streams', []):
+        if stream.get('codec_type') == 'video':
+            return stream.get('avg_frame_rate') or stream.get('r_frame_rate') or '25'
+    raise FFmpegError('No video stream found')
+
+
+def transcode(
+    input_path: str,
+    output_path: str,
+    acodec: str,
+    mux_options: list,
+    video_bitrate: Optional[str] = None,
+    gpu: Optional[int] = None,
+    progress_callback=None
+) -> Dict[str, str]:
+    """
+    Transcode a video to H.264 on the GPU and remux it with its audio.
+
+    Args:
+        input_path: Path to input video file
+        output_path: Path for output file
+        acodec: Audio codec for the output container
+        mux_options: Container flags for the remux (e.g. -movflags +faststart)
+        video_bitrate: Target video bitrate (e.g. '4M'); constant quality if None
+        gpu: CUDA device index (default: settings.NVENC_GPU)
+        progress_callback: Passed to run_ffmpeg() for the remux
+
+    Returns:
+        FFmpeg progress stats of the remux (see run_ffmpeg)
+
+    Raises:
+        FFmpegError: If the remux fails
+        RuntimeError: If PyNvVideoCodec can't decode or encode the input
+    """
+    import PyNvVideoCodec as nvc
+
+    gpu = getattr(settings, 'NVENC_GPU', 0) if gpu is None else gpu
+    frame_rate = _frame_rate(input_path)
+
+    config = dict(NVC_ENCODER_CONFIG, gpuid=gpu)
+    if video_bitrate:
+        config.update(rc='cbr', bitrate=video_bitrate)
+        del config['cq']
+
+    demuxer = nvc.CreateDemuxer(filename=input_path)
+    decoder = nvc.CreateDecoder(
+        gpuid=gpu,
+        codec=demuxer.GetNvCodecId(),
+        cudacontext=0,
+        cudastream=0,
+        usedevicememory=True
+    )
+    encoder = nvc.CreateEncoder(demuxer.Width(), demuxer.Height(), 'NV12', False, **config)
+
+    fd, video_path = tempfile.mkstemp(suffix='.h264', dir=os.path.dirname(output_path))
+    try:
+        with os.fdopen(fd, 'wb') as video_file:
+            # Decoded surfaces stay in device memory and go straight to NVENC
+            for packet in demuxer:
+                for frame in decoder.Decode(packet):
+                    video_file.write(encoder.Encode(frame))
+            video_file.write(encoder.EndEncode())
+
+        # Raw H.264 has no timestamps: restore the source frame rate and
+        # take the audio from the original file
+        return run_ffmpeg(
+            video_path,
+            output_path,
+            [
+                '-i', input_path,
+                '-map', '0:v:0', '-map', '1:a?',
+                '-c:v', 'copy', '-acodec', acodec,
+                *mux_options
+            ],
+            input_options=['-framerate', frame_rate],
+            progress_callback=progress_callback,
+            pin_cpus=False
+        )
+    finally:
+        remove_file(video_path)
@@ -0,0 +1,242 @@
+"""
+Rate Limit Stores.
+Redis-backed counters behind RateLimitMiddleware.
+
+Hourly request counts are batched in-process (HitCounter) and flushed to
+Redis in the background, so a request never waits on a Redis round trip.
+
+An hourly request count doesn't stop one IP from holding many long FFmpeg
+jobs at the same time. Each running conversion holds a slot: a member of
+the Redis sorted set conc:{client_ip}, scored by its start time. Slots are
+released when the request (sync mode) or task (async mode) finishes, and
+expire after CONCURRENCY_SLOT_TTL in case a worker dies holding one.
+"""
+
+import logging
+import os
+import secrets
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Fixed one-hour windows, matching RATE_LIMIT_REQUESTS_PER_HOUR
+RATE_LIMIT_WINDOW = 3600
+
+# INCRBY and EXPIRE in one atomic step; the key expires with its window
+RATE_LIMIT_SCRIPT = """
+local count = redis.call('INCRBY', KEYS[1], ARGV[1])
+if count == tonumber(ARGV[1]) then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return count
+"""
+
+# How long the flush thread gathers hits after the first one before
+# pushing them to Redis (seconds); it sleeps while no hits arrive
+HIT_FLUSH_INTERVAL = 0.02
+
+# Drop expired slots, then take one if the client is under its limit.
+# Check and insert happen in one atomic round trip.
+ACQUIRE_SLOT_SCRIPT = """
+local key, now, ttl, limit, slot = KEYS[1], tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), ARGV[4]
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - ttl)
+if redis.call('ZCARD', key) >= limit then
+    return 0
+end
+redis.call('ZADD', key, now, slot)
+redis.call('EXPIRE', key, ttl)
+return 1
+"""
+
+
+@lru_cache(maxsize=1)
+def get_client():
+    """
+    Process-wide Redis client for rate limiting (short timeouts), on
+    RATELIMIT_REDIS_URL.
+
+    Its connection pool is capped at REDIS_MAX_CONNECTIONS; sockets are
+    reused across requests and threads.
+    """
+    import redis
+
+    pool = redis.ConnectionPool.from_url(
+        getattr(settings, 'RATELIMIT_REDIS_URL', settings.REDIS_URL),
+        max_connections=getattr(settings, 'REDIS_MAX_CONNECTIONS', 50),
+        socket_connect_timeout=0.5,
+        socket_timeout=0.5
+    )
+    return redis.Redis(connection_pool=pool)
+
+
+class HitCounter:
+    """
+    Per-IP hourly hit counts, batched in-process and flushed to Redis.
+
+    hit() only touches a local dict: it adds one to the IP's pending delta
+    and returns the last total Redis reported plus what is still pending.
+    A daemon thread waits until a hit arrives, gathers more for
+    HIT_FLUSH_INTERVAL and sends all pending deltas in one pipeline, so
+    Redis sees one INCRBY per busy IP per interval rather than one per
+    request, and an idle process doesn't wake at all. A batch that fails
+    to reach Redis is merged back into the pending deltas and sent with
+    the next flush. Counts from other processes show up after their next
+    flush, so the limit can be overshot by a few requests.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._totals = {}
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._script = None
+        self.failed_at = None
+
+    def hit(self, client_ip: str) -> int:
+        """Count a request; returns the client's estimated total this window."""
+        window = int(time.time()) // RATE_LIMIT_WINDOW
+        key = f'ratelimit:{client_ip}:{window}'
+
+        with self._lock:
+            self._ensure_flusher()
+            pending = self._pending.get(key, 0) + 1
+            self._pending[key] = pending
+            self._wake.set()
+            return self._totals.get(key, 0) + pending
+
+    def _ensure_flusher(self) -> None:
+        """Start the flush thread (again, after a fork). Caller holds the lock."""
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        self._pid = os.getpid()
+        self._pending.clear()
+        self._totals.clear()
+        # The parent's event may have been copied in the set state
+        self._wake = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name='ratelimit-flush', daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        wake = self._wake
+        while True:
+            wake.wait()
+            wake.clear()
+            # Let more hits join the batch before sending it
+            time.sleep(HIT_FLUSH_INTERVAL)
+            self.flush()
+
+    def flush(self) -> None:
+        """Push pending deltas to Redis and refresh the known totals."""
+        with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+
+        import redis
+
+        try:
+            if self._script is None:
+                self._script = get_client().register_script(RATE_LIMIT_SCRIPT)
+            pipe = get_client().pipeline(transaction=False)
+            for key, delta in batch.items():
+                self._script(keys=[key], args=[delta, RATE_LIMIT_WINDOW], client=pipe)
+            counts = pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Rate limit store unreachable, counting from the database: {e}")
+            self.failed_at = time.monotonic()
+            self._requeue(batch)
+            return
+
+        self.failed_at = None
+        current = f':{int(time.time()) // RATE_LIMIT_WINDOW}'
+        with self._lock:
+            # Totals from past windows are never read again
+            self._totals = {
+                key: total for key, total in self._totals.items() if key.endswith(current)
+            }
+            for key, count in zip(batch, counts):
+                self._totals[key] = int(count)
+
+    def _requeue(self, batch: dict) -> None:
+        """
+        Merge a batch that didn't reach Redis back into the pending deltas.
+
+        Deltas for past windows are dropped, as Redis would expire them
+        anyway. The thread is not woken: the middleware counts from the
+        database for REDIS_RETRY_INTERVAL, and the first hit after that
+        sends the merged batch.
+        """
+        current = f':{int(time.time()) // RATE_LIMIT_WINDOW}'
+        with self._lock:
+            for key, delta in batch.items():
+                if key.endswith(current):
+                    self._pending[key] = self._pending.get(key, 0) + delta
+
+
+def slot_key(client_ip: str) -> str:
+    """Sorted set holding a client's running conversions."""
+    return f'conc:{client_ip}'
+
+
+def slot_ttl() -> int:
+    """Seconds after which an unreleased slot is dropped."""
+    return getattr(settings, 'CONCURRENCY_SLOT_TTL', 3600)
+
+
+def acquire_slot(script, client_ip: str):
+    """
+    Try to take a conversion slot for client_ip.
+
+    Args:
+        script: ACQUIRE_SLOT_SCRIPT registered on a Redis client
+        client_ip: Client address
+
+    Returns:
+        Slot id, or None when the client is at its limit
+    """
+    limit = getattr(settings, 'MAX_CONCURRENT_CONVERSIONS_PER_IP', 5)
+    # 4 random bytes: collisions are negligible at a handful of slots per key
+    slot = secrets.token_hex(4)
+    acquired = script(
+        keys=[slot_key(client_ip)],
+        args=[time.time(), slot_ttl(), limit, slot]
+    )
+    return slot if int(acquired) else None
+
+
+def release_slot(client, client_ip: str, slot: str) -> None:
+    """Give a slot back."""
+    client.zrem(slot_key(client_ip), slot)
+
+
+def release_job_slot(job_id) -> None:
+    """
+    Release the slot recorded on a queued job, once its task has finished.
+
+    Best effort: if Redis is unavailable the slot simply expires.
+    """
+    from .dependency_guard import REDIS_AVAILABLE
+    from .models import ConversionJob
+
+    if not REDIS_AVAILABLE:
+        return
+
+    options = ConversionJob.objects.filter(id=job_id).values_list('options', flat=True).first()
+    holder = (options or {}).get('concurrency_slot')
+    if not holder:
+        return
+
+    import redis
+
+    try:
+        release_slot(get_client(), holder['client_ip'], holder['slot'])
+    except redis.RedisError:
+        pass
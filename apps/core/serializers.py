@@ -133,6 +133,14 @@ class VideoConvertSerializer(serializers.Serializer):
     resolution = serializers.CharField(required=False, allow_blank=True)
     video_bitrate = serializers.CharField(required=False, allow_blank=True)
     audio_bitrate = serializers.CharField(required=False, allow_blank=True)
+    # x264 speed/size tradeoff for H.264 outputs (default: veryfast)
+    preset = serializers.ChoiceField(
+        choices=[
+            'ultrafast', 'superfast', 'veryfast', 'faster', 'fast',
+            'medium', 'slow', 'slower', 'veryslow',
+        ],
+        required=False
+    )
 
 
 class VideoTrimSerializer(serializers.Serializer):
@@ -153,6 +161,37 @@ class VideoTrimSerializer(serializers.Serializer):
         return data
 
 
+class VideoMultiTrimSerializer(serializers.Serializer):
+    """Serializer for cutting several clips from one video."""
+    
+    # Upper bound on clips per request (all are outputs of one FFmpeg run)
+    MAX_SEGMENTS = 20
+    
+    file = serializers.FileField(required=True)
+    # JSON list of [start_time, end_time] pairs, e.g. [[0, 10], [30, 45]]
+    segments = serializers.JSONField(binary=True)
+    copy_mode = serializers.BooleanField(default=True)
+    output_format = serializers.CharField(required=False, allow_blank=True)
+    
+    def validate_segments(self, value):
+        """Validate and normalize the segment list."""
+        if not isinstance(value, list) or not value:
+            raise serializers.ValidationError('Provide a list of [start_time, end_time] pairs.')
+        if len(value) > self.MAX_SEGMENTS:
+            raise serializers.ValidationError(f'At most {self.MAX_SEGMENTS} segments are allowed.')
+        
+        segments = []
+        for segment in value:
+            try:
+                start, end = (float(t) for t in segment)
+            except (TypeError, ValueError):
+                raise serializers.ValidationError('Each segment must be a [start_time, end_time] pair.')
+            if start < 0 or end <= start:
+                raise serializers.ValidationError('End time must be greater than start time.')
+            segments.append([start, end])
+        return segments
+
+
 class UploadedFileSerializer(serializers.ModelSerializer):
     """Serializer for UploadedFile model."""
     
@@ -4,16 +4,77 @@ Shared base task and utilities for background processing.
 """
 
 from apps.core.celery_compat import shared_task, Task, CELERY_AVAILABLE
+from django.db import DatabaseError
 from django.utils import timezone
 from .models import ConversionJob, ConvertedFile, JobStatus
+from .ratelimit import release_job_slot
+from .utils import (
+    log_tool_usage,
+    remove_file,
+    probe_ffmpeg,
+    FFmpegTransientError,
+    FFMPEG_HEALTH_KEY,
+    FFMPEG_HEALTH_TTL,
+)
+import ctypes
 import logging
-import os
+import platform
 
 logger = logging.getLogger(__name__)
 
+# Failures worth retrying: I/O and connection blips (OSError covers
+# ConnectionError and TimeoutError), database hiccups, and FFmpeg being
+# killed rather than rejecting its input. Anything else (bad input,
+# unsupported codec) would fail the same way again.
+RETRYABLE_EXCEPTIONS = (OSError, DatabaseError, FFmpegTransientError)
+
+# Shared retry policy for conversion tasks; jitter spreads retries of jobs
+# that failed together (e.g. during a storage outage)
+RETRY_POLICY = {
+    'autoretry_for': RETRYABLE_EXCEPTIONS,
+    'retry_backoff': True,
+    'retry_backoff_max': 300,
+    'retry_jitter': True,
+    'max_retries': 3,
+}
+
+
+# Returned by a task that handed its job on to other tasks (e.g. a chord);
+# the job's concurrency slot is then released by whichever finishes the job
+JOB_HANDED_OFF = 'handed_off'
+
+
+def release_memory():
+    """
+    Return freed heap memory to the OS.
+    
+    glibc keeps freed arenas mapped, so worker RSS ratchets up after large
+    Pillow/PyMuPDF allocations. malloc_trim(0) releases them (Linux only).
+    """
+    if platform.system() != 'Linux':
+        return
+    try:
+        ctypes.CDLL('libc.so.6', use_errno=True).malloc_trim(0)
+    except (OSError, AttributeError):
+        # Non-glibc libc (e.g. musl) has no malloc_trim
+        pass
+
+
 class BaseConversionTask(Task):
     """Base class for all conversion tasks with error handling."""
     
+    def after_return(self, status, retval, task_id, args, kwargs, einfo):
+        """Release task memory and the job's concurrency slot once the task is done."""
+        release_memory()
+
+        # A retried job keeps its slot until its last attempt, and a
+        # handed-off job keeps it until the tasks it dispatched finish
+        if status == 'RETRY' or retval == JOB_HANDED_OFF:
+            return
+        job_id = kwargs.get('job_id') or (args[0] if args else None)
+        if job_id:
+            release_job_slot(job_id)
+    
     def on_failure(self, exc, task_id, args, kwargs, einfo):
         """Handle task failure by updating the ConversionJob."""
         job_id = kwargs.get('job_id')
@@ -25,11 +86,20 @@ class BaseConversionTask(Task):
             except ConversionJob.DoesNotExist:
                 logger.error(f"Task {task_id} failed, but job {job_id} not found.")
 
-def update_job_processing(job_id):
-    """Mark job as processing safely."""
+def update_job_processing(job_id, probe_duration=False):
+    """
+    Mark job as processing safely.
+    
+    With probe_duration, a job created without a duration has it probed
+    here and saved together with the status change.
+    """
     try:
         job = ConversionJob.objects.get(id=job_id)
-        job.mark_processing()
+        duration = None
+        if probe_duration and not job.duration:
+            from .utils import get_duration
+            duration = get_duration(job.input_file.path)
+        job.mark_processing(duration=duration)
         return job
     except ConversionJob.DoesNotExist:
         logger.error(f"Job {job_id} not found during status update.")
@@ -56,22 +126,19 @@ def cleanup_expired_files():
             # Delete output file
             if converted_file.output_file:
                 file_path = converted_file.output_file.path
-                if os.path.exists(file_path):
-                    os.remove(file_path)
+                remove_file(file_path)
             
             # Delete input file from conversion job
             if converted_file.conversion_job:
                 job = converted_file.conversion_job
                 if job.input_file:
                     try:
-                        if os.path.exists(job.input_file.path):
-                            os.remove(job.input_file.path)
+                        remove_file(job.input_file.path)
                     except Exception:
                         pass
                 if job.output_file:
                     try:
-                        if os.path.exists(job.output_file.path):
-                            os.remove(job.output_file.path)
+                        remove_file(job.output_file.path)
                     except Exception:
                         pass
             
@@ -85,3 +152,28 @@ def cleanup_expired_files():
     logger.info(f"Cleanup task completed. Deleted {deleted_count} expired files.")
     return deleted_count
 
+
+@shared_task(ignore_result=True)
+def refresh_ffmpeg_health():
+    """
+    Re-probe FFmpeg and store the result for HealthCheckView.
+    
+    Scheduled every 30 seconds so health requests read a cached result
+    instead of running `ffmpeg -version` themselves.
+    """
+    from django.core.cache import cache
+    
+    cache.set(FFMPEG_HEALTH_KEY, probe_ffmpeg(), FFMPEG_HEALTH_TTL)
+
+
+@shared_task(ignore_result=True)
+def log_tool_usage_task(tool_name, client_ip, success=True, job_id=None, processing_time_ms=None, user_agent=''):
+    """Write a ToolUsageLog row off the request path (see BaseConversionView.log_usage)."""
+    log_tool_usage(
+        tool_name=tool_name,
+        client_ip=client_ip,
+        success=success,
+        conversion_job_id=job_id,
+        processing_time_ms=processing_time_ms,
+        user_agent=user_agent
+    )
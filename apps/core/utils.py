@@ -4,17 +4,28 @@ FFmpeg wrapper, file handling, and helper functions.
 """
 
 import os
+import hashlib
+import posixpath
+import shutil
 import subprocess
 import uuid
 import json
 import mimetypes
+import time
+import zipfile
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Dict, Any, Tuple, List
 
 from django.conf import settings
+from django.core.files import File
 from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
 from django.utils import timezone
 
+from apps.core.dependency_guard import BOTO3_AVAILABLE, BLAKE3_AVAILABLE
+
 
 # ============================================
 # FILE UTILITIES
@@ -48,11 +59,538 @@ def get_file_size(file_path: str) -> int:
         return 0
 
 
+def compute_upload_digest(uploaded_file, chunk_size: int = 1 << 20) -> str:
+    """
+    Hash an uploaded file's content in a single streaming pass.
+    
+    Uses BLAKE3 (SIMD-accelerated) when installed, otherwise BLAKE2b from
+    hashlib. The file is rewound afterwards so it can still be saved.
+    
+    Args:
+        uploaded_file: Django UploadedFile
+        chunk_size: Read size per chunk
+    
+    Returns:
+        Hex digest of the file content
+    """
+    if BLAKE3_AVAILABLE:
+        from blake3 import blake3
+        hasher = blake3()
+    else:
+        hasher = hashlib.blake2b(digest_size=32)
+    
+    for chunk in uploaded_file.chunks(chunk_size=chunk_size):
+        hasher.update(chunk)
+    
+    uploaded_file.seek(0)
+    return hasher.hexdigest()
+
+
 def ensure_directory(path: str) -> None:
     """Ensure directory exists."""
     Path(path).mkdir(parents=True, exist_ok=True)
 
 
+def remove_file(path: str) -> None:
+    """Delete a file if it exists (one unlink, no exists() check first)."""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def preallocate_file(fileobj, size: int) -> None:
+    """
+    Reserve disk space for a file that is about to be written.
+    
+    Lets the filesystem allocate one contiguous extent up front instead of
+    growing the file write by write. Callers truncate to the real size
+    once writing is done. No-op where posix_fallocate is unsupported.
+    """
+    if size <= 0 or not hasattr(os, 'posix_fallocate'):
+        return
+    try:
+        os.posix_fallocate(fileobj.fileno(), 0, size)
+    except OSError:
+        # Filesystem doesn't support fallocate (e.g. some network mounts)
+        pass
+
+
+# Outputs at least this large are dropped from the page cache once copied;
+# nothing reads them again through the source path
+PAGE_CACHE_DROP_BYTES = 16 << 20
+
+
+def _fadvise(fd: int, advice_name: str) -> None:
+    """Best-effort posix_fadvise over the whole file; no-op where unsupported."""
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, advice)
+    except OSError:
+        pass
+
+
+def copy_file_kernel(src_path: str, dst_path: str) -> int:
+    """
+    Copy a file without pulling its bytes through Python.
+    
+    Uses os.copy_file_range (in-kernel, zero-copy on Linux) and falls back
+    to an os.sendfile loop, then to shutil.copyfile. Large sources are read
+    with sequential read-ahead and dropped from the page cache afterwards,
+    so a big encode doesn't evict hotter pages.
+    
+    Args:
+        src_path: Source file path
+        dst_path: Destination file path (created or truncated)
+    
+    Returns:
+        Number of bytes copied
+    """
+    src_fd = os.open(src_path, os.O_RDONLY)
+    try:
+        size = os.fstat(src_fd).st_size
+        large = size >= PAGE_CACHE_DROP_BYTES
+        if large:
+            _fadvise(src_fd, 'POSIX_FADV_SEQUENTIAL')
+        
+        dst_fd = os.open(dst_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            copied = _copy_fd_kernel(src_fd, dst_fd, size)
+        finally:
+            os.close(dst_fd)
+        
+        if large:
+            _fadvise(src_fd, 'POSIX_FADV_DONTNEED')
+    finally:
+        os.close(src_fd)
+    
+    if copied is not None:
+        return copied
+    
+    shutil.copyfile(src_path, dst_path)
+    return get_file_size(dst_path)
+
+
+def _copy_fd_kernel(src_fd: int, dst_fd: int, size: int) -> Optional[int]:
+    """
+    Copy src_fd to dst_fd in-kernel; returns None if neither syscall works.
+    """
+    copy_file_range = getattr(os, 'copy_file_range', None)
+    if copy_file_range is not None:
+        try:
+            copied = 0
+            while True:
+                n = copy_file_range(src_fd, dst_fd, 1 << 30)
+                if n == 0:
+                    return copied
+                copied += n
+        except OSError:
+            # EXDEV/ENOSYS/EINVAL on older kernels or exotic filesystems
+            os.lseek(src_fd, 0, os.SEEK_SET)
+            os.lseek(dst_fd, 0, os.SEEK_SET)
+            os.ftruncate(dst_fd, 0)
+    
+    if hasattr(os, 'sendfile'):
+        try:
+            copied = 0
+            while copied < size:
+                n = os.sendfile(dst_fd, src_fd, copied, size - copied)
+                if n == 0:
+                    break
+                copied += n
+            return copied
+        except OSError:
+            os.ftruncate(dst_fd, 0)
+    
+    return None
+
+
+# Media and page outputs are already compressed; store them as-is
+ZIP_COPY_BUFSIZE = 1 << 20
+
+
+def zip_outputs(paths: List[str], zip_path: str) -> int:
+    """
+    Bundle output files into an uncompressed (ZIP_STORED) archive.
+    
+    Each member is opened once and its size and mtime are taken from
+    fstat on that descriptor, then copied into the archive in 1 MiB
+    blocks. The archive is preallocated to its upper bound and trimmed
+    to the written size afterwards.
+    
+    Args:
+        paths: Files to add, stored under their basenames
+        zip_path: Path of the archive to write
+    
+    Returns:
+        Size of the archive in bytes
+    """
+    # Stored members plus per-entry headers bound the archive size
+    upper_bound = sum(get_file_size(path) for path in paths) + 4096 * len(paths)
+    
+    with open(zip_path, 'wb') as zip_file:
+        preallocate_file(zip_file, upper_bound)
+        with zipfile.ZipFile(
+            zip_file, 'w', compression=zipfile.ZIP_STORED, allowZip64=True
+        ) as zipf:
+            for path in paths:
+                with open(path, 'rb') as src:
+                    st = os.fstat(src.fileno())
+                    # Clamp like strict_timestamps=False: ZIP can't store pre-1980 dates
+                    date_time = max(time.localtime(st.st_mtime)[:6], (1980, 1, 1, 0, 0, 0))
+                    info = zipfile.ZipInfo(os.path.basename(path), date_time=date_time)
+                    info.compress_type = zipfile.ZIP_STORED
+                    info.file_size = st.st_size
+                    info.external_attr = (st.st_mode & 0xFFFF) << 16
+                    with zipf.open(info, 'w') as dest:
+                        shutil.copyfileobj(src, dest, ZIP_COPY_BUFSIZE)
+        written = zip_file.tell()
+        zip_file.truncate(written)
+    
+    return written
+
+
+def open_scratch_file(directory) -> Tuple[str, Any]:
+    """
+    Create an anonymous scratch file for staging an upload.
+    
+    On Linux the file is created with O_TMPFILE: it has no directory
+    entry, so concurrent uploads with the same name can't collide and
+    nothing is left behind if the worker dies. It is addressed through
+    /proc/<pid>/fd/<n>, which also resolves from child processes.
+    Elsewhere a uniquely named temp file is used instead.
+    
+    Args:
+        directory: Directory (filesystem) to create the file on
+    
+    Returns:
+        Tuple of (path, release) - call release() when done with the file
+    """
+    if hasattr(os, 'O_TMPFILE'):
+        try:
+            fd = os.open(directory, os.O_TMPFILE | os.O_RDWR, 0o600)
+        except OSError:
+            # Filesystem without O_TMPFILE support
+            fd = None
+        if fd is not None:
+            return f'/proc/{os.getpid()}/fd/{fd}', lambda: os.close(fd)
+    
+    import tempfile
+    
+    fd, path = tempfile.mkstemp(dir=directory)
+    os.close(fd)
+    
+    def release():
+        remove_file(path)
+    
+    return path, release
+
+
+def save_upload(uploaded_file, path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Write a Django UploadedFile to disk.
+    
+    Uploads Django already spooled to a temp file are copied in-kernel;
+    in-memory uploads are written straight from the BytesIO buffer, and
+    any other file-like object is read into one reusable 1 MiB buffer
+    instead of allocating a new bytes object per chunk.
+    
+    Args:
+        uploaded_file: Django UploadedFile
+        path: Destination path
+        chunk_size: Copy block size for in-memory uploads
+    
+    Returns:
+        The destination path
+    """
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        copy_file_kernel(uploaded_file.temporary_file_path(), path)
+        return path
+    
+    # May already have been read (e.g. saved to a FileField or hashed)
+    uploaded_file.seek(0)
+    source = getattr(uploaded_file, 'file', uploaded_file)
+    
+    # Buffered writer: guarantees full writes, and large writes bypass its buffer
+    with open(path, 'wb') as out:
+        if hasattr(source, 'getbuffer'):
+            # InMemoryUploadedFile: bytes are already resident, write a view
+            with source.getbuffer() as view:
+                out.write(view)
+        elif hasattr(source, 'readinto'):
+            buf = bytearray(chunk_size)
+            mv = memoryview(buf)
+            while True:
+                n = source.readinto(mv)
+                if not n:
+                    break
+                out.write(mv[:n])
+        else:
+            shutil.copyfileobj(uploaded_file, out, chunk_size)
+    return path
+
+
+def upload_input_path(job, uploaded_file, scratch_path: str) -> str:
+    """
+    Get a filesystem path a synchronous conversion can read the upload from.
+    
+    Creating the job already wrote the upload to storage; on local storage
+    that copy is read directly. Otherwise uploads Django spooled to disk
+    are read in place, and only in-memory uploads are written out, to
+    scratch_path.
+    
+    Args:
+        job: ConversionJob created from the upload
+        uploaded_file: Django UploadedFile
+        scratch_path: Where to write the upload if it isn't on disk yet
+    
+    Returns:
+        Path of the upload's bytes on disk
+    """
+    try:
+        return job.input_file.path
+    except NotImplementedError:
+        # Remote storage (e.g. S3) has no local path
+        pass
+    
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        return uploaded_file.temporary_file_path()
+    return save_upload(uploaded_file, scratch_path)
+
+
+# FileResponse read size when no sendfile-capable file wrapper is used
+DOWNLOAD_BLOCK_SIZE = 1 << 20
+
+# Downloads at least this large are streamed through nginx unbuffered
+LARGE_DOWNLOAD_BYTES = 64 << 20
+
+
+def file_download_response(file_path: str, filename: str, delete_after: bool = False):
+    """
+    Build an attachment FileResponse that servers can send with sendfile.
+    
+    The file is opened unbuffered so the response wraps a raw OS file
+    descriptor; gunicorn's wsgi.file_wrapper (and ASGI zero-copy send)
+    then hand it to sendfile(2) instead of copying through Python. When
+    no file wrapper is available, Django streams it in 1 MiB blocks.
+    Files of LARGE_DOWNLOAD_BYTES or more are marked X-Accel-Buffering: no
+    so a fronting nginx relays them as they arrive instead of spooling
+    the whole body to its proxy temp files first.
+    
+    With ``settings.USE_X_ACCEL`` enabled, files under MEDIA_ROOT are
+    handed off to nginx instead: the response has an empty body and an
+    ``X-Accel-Redirect`` header pointing at the internal location, so the
+    worker is freed immediately and nginx serves the file itself.
+    
+    Args:
+        file_path: Path of the file to send
+        filename: Download filename for Content-Disposition
+        delete_after: Unlink the file once it is open; the open descriptor
+            keeps the data alive until the response has been sent. Handed-off
+            (X-Accel) files are left for the output sweep instead.
+    
+    Returns:
+        FileResponse with Content-Length set, or an X-Accel-Redirect
+        HttpResponse
+    """
+    from django.http import FileResponse
+    
+    if getattr(settings, 'USE_X_ACCEL', False):
+        response = _x_accel_response(file_path, filename)
+        if response is not None:
+            return response
+    
+    f = open(file_path, 'rb', buffering=0)
+    if delete_after:
+        os.unlink(file_path)
+    size = os.fstat(f.fileno()).st_size
+    response = FileResponse(f, as_attachment=True, filename=filename)
+    response.block_size = DOWNLOAD_BLOCK_SIZE
+    response['Content-Length'] = size
+    if size >= LARGE_DOWNLOAD_BYTES:
+        response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _x_accel_response(file_path: str, filename: str):
+    """
+    Build an empty response that tells nginx to serve file_path internally.
+    
+    Returns None when the file lies outside MEDIA_ROOT (nginx could not
+    reach it through the internal alias).
+    
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+    """
+    from urllib.parse import quote
+    from django.http import HttpResponse
+    from django.utils.http import content_disposition_header
+    
+    media_root = os.path.realpath(settings.MEDIA_ROOT)
+    real_path = os.path.realpath(file_path)
+    if os.path.commonpath([media_root, real_path]) != media_root:
+        return None
+    
+    # Nothing is opened here, so check the file exists before handing it off
+    if not os.path.isfile(real_path):
+        raise FileNotFoundError(file_path)
+    
+    relative = os.path.relpath(real_path, media_root).replace(os.sep, '/')
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    
+    response = HttpResponse(content_type=content_type)
+    response['X-Accel-Redirect'] = settings.X_ACCEL_LOCATION + quote(relative)
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    return response
+
+
+def upload_output(local_path: str, storage_key: str, storage) -> str:
+    """
+    Upload a local output file to S3-compatible storage.
+    
+    Uses boto3's transfer manager so large outputs go up as concurrent
+    multipart uploads straight from disk.
+    
+    Args:
+        local_path: Local path of the file to upload
+        storage_key: Storage name (relative to the storage location)
+        storage: S3 storage backend instance (django-storages)
+    
+    Returns:
+        Storage name of the uploaded file
+    """
+    from boto3.s3.transfer import TransferConfig
+    
+    config = TransferConfig(
+        multipart_chunksize=16 * 1024 * 1024,
+        max_concurrency=8,
+    )
+    
+    location = getattr(storage, 'location', '')
+    key = posixpath.join(location, storage_key) if location else storage_key
+    
+    storage.bucket.upload_file(
+        local_path,
+        key,
+        ExtraArgs={'ContentType': get_mime_type(local_path)},
+        Config=config,
+    )
+    return storage_key
+
+
+def _is_s3_storage(storage) -> bool:
+    """Check whether a storage backend is an S3 (django-storages) backend."""
+    return BOTO3_AVAILABLE and hasattr(storage, 'bucket_name')
+
+
+def storage_output_path(job, output_filename: str, scratch_dir) -> Tuple[str, Optional[str]]:
+    """
+    Choose where a tool should write job's output.
+    
+    On FileSystemStorage this is the output's final storage path, so the
+    tool writes it in place and persist_output() has nothing to copy or
+    rename. Other backends need a local file to upload, so it goes in
+    scratch_dir.
+    
+    Args:
+        job: ConversionJob owning the output
+        output_filename: Filename to store the output under
+        scratch_dir: Local directory for outputs that must be uploaded
+    
+    Returns:
+        Tuple of (path to write to, storage name if written in place)
+    """
+    field_file = job.output_file
+    storage = field_file.storage
+    
+    if _is_s3_storage(storage) or not isinstance(storage, FileSystemStorage):
+        return os.path.join(str(scratch_dir), output_filename), None
+    
+    name = field_file.field.generate_filename(job, output_filename)
+    name = storage.get_available_name(name, max_length=field_file.field.max_length)
+    path = storage.path(name)
+    ensure_directory(os.path.dirname(path))
+    return path, name
+
+
+def persist_output(
+    job,
+    output_path: str,
+    output_filename: str,
+    move: bool = False,
+    stored_name: Optional[str] = None
+) -> str:
+    """
+    Persist a locally produced output file into job.output_file.
+    
+    On FileSystemStorage the file is copied in-kernel straight to its final
+    storage path (or, with move, renamed there when it is on the same
+    filesystem); if it was already written there (stored_name) it is only
+    registered. On S3 storage it is uploaded with
+    upload_output(); other backends go through the regular FieldFile.save().
+    
+    Args:
+        job: ConversionJob owning the output
+        output_path: Local path of the produced output file
+        output_filename: Filename to store the output under
+        move: The caller doesn't need output_path afterwards, so it may be
+            renamed into storage instead of copied (and is removed if not)
+        stored_name: Storage name output_path was written under, from
+            storage_output_path()
+    
+    Returns:
+        Storage name of the persisted file
+    """
+    field_file = job.output_file
+    storage = field_file.storage
+    field = field_file.field
+    
+    if stored_name:
+        if storage.file_permissions_mode is not None:
+            os.chmod(output_path, storage.file_permissions_mode)
+        job.output_file = stored_name
+        return stored_name
+    
+    if _is_s3_storage(storage):
+        name = field.generate_filename(job, output_filename)
+        name = storage.get_available_name(name, max_length=field.max_length)
+        job.output_file = upload_output(output_path, name, storage)
+        return name
+    
+    if not isinstance(storage, FileSystemStorage):
+        with open(output_path, 'rb') as f:
+            field_file.save(output_filename, File(f), save=False)
+        return field_file.name
+    
+    name = field.generate_filename(job, output_filename)
+    name = storage.get_available_name(name, max_length=field.max_length)
+    dst_path = storage.path(name)
+    
+    ensure_directory(os.path.dirname(dst_path))
+    moved = False
+    if move:
+        try:
+            # Same filesystem: a single rename(2), no bytes copied
+            os.rename(output_path, dst_path)
+            moved = True
+        except OSError:
+            # Different filesystem (EXDEV): fall back to copying
+            pass
+    
+    if not moved:
+        copy_file_kernel(output_path, dst_path)
+        if move:
+            remove_file(output_path)
+    
+    if storage.file_permissions_mode is not None:
+        os.chmod(dst_path, storage.file_permissions_mode)
+    
+    job.output_file = name
+    return name
+
+
 def sanitize_filename(filename: str) -> str:
     """
     Sanitize filename for safe storage and display.
@@ -103,18 +641,33 @@ def generate_clean_output_filename(original_name: str, output_format: str) -> st
 
 
 def get_client_ip(request) -> str:
-    """Extract client IP from request."""
+    """
+    Extract client IP from request.
+    
+    The result is cached on the Django request (shared with DRF's wrapper),
+    so the middleware, rate limit, job and usage log parse it only once.
+    """
+    http_request = getattr(request, '_request', request)
+    ip = getattr(http_request, '_client_ip', None)
+    if ip is not None:
+        return ip
+    
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
     if x_forwarded_for:
         ip = x_forwarded_for.split(',')[0].strip()
     else:
         ip = request.META.get('REMOTE_ADDR', '127.0.0.1')
+    http_request._client_ip = ip
     return ip
 
 
 def get_user_agent(request) -> str:
-    """Extract user agent from request."""
-    return request.META.get('HTTP_USER_AGENT', '')[:500]
+    """Extract user agent from request (cached like get_client_ip)."""
+    http_request = getattr(request, '_request', request)
+    user_agent = getattr(http_request, '_user_agent', None)
+    if user_agent is None:
+        user_agent = http_request._user_agent = request.META.get('HTTP_USER_AGENT', '')[:500]
+    return user_agent
 
 
 # ============================================
@@ -126,21 +679,103 @@ class FFmpegError(Exception):
     pass
 
 
+class FFmpegTransientError(FFmpegError):
+    """FFmpeg was killed by a signal (OOM killer, crash), not by bad input."""
+    pass
+
+
+@lru_cache(maxsize=None)
+def _resolve_executable(executable: str) -> str:
+    """
+    Absolute path of an executable, looked up on PATH once per process.
+    
+    Unresolvable names are returned unchanged so the caller still gets its
+    usual "not found" error when running it.
+    """
+    return shutil.which(executable) or executable
+
+
 def get_ffmpeg_path() -> str:
     """Get FFmpeg executable path."""
-    return getattr(settings, 'FFMPEG_PATH', 'ffmpeg')
+    return _resolve_executable(getattr(settings, 'FFMPEG_PATH', 'ffmpeg'))
 
 
 def get_ffprobe_path() -> str:
     """Get FFprobe executable path."""
-    return getattr(settings, 'FFPROBE_PATH', 'ffprobe')
+    return _resolve_executable(getattr(settings, 'FFPROBE_PATH', 'ffprobe'))
+
+
+def get_ghostscript_path() -> str:
+    """Get Ghostscript executable path."""
+    return _resolve_executable(getattr(settings, 'GHOSTSCRIPT_PATH', 'gs'))
+
+
+def get_pdftoppm_path() -> str:
+    """Get pdftoppm (poppler-utils) executable path."""
+    return _resolve_executable(getattr(settings, 'PDFTOPPM_PATH', 'pdftoppm'))
+
+
+# Cache key and lifetime of the FFmpeg health probe. The refresh_ffmpeg_health
+# beat task rewrites it every 30 seconds; readers only probe on a miss.
+FFMPEG_HEALTH_KEY = 'health:ffmpeg'
+FFMPEG_HEALTH_TTL = 90
+
+
+def probe_ffmpeg() -> Tuple[str, Optional[str]]:
+    """Run `ffmpeg -version`; returns (status, error)."""
+    try:
+        result = subprocess.run(
+            [get_ffmpeg_path(), '-version'],
+            capture_output=True,
+            timeout=5
+        )
+        if result.returncode != 0:
+            return 'unhealthy', 'FFmpeg process returned non-zero exit code'
+    except Exception as e:
+        return 'unhealthy', str(e)
+    return 'healthy', None
+
+
+def warm_ffmpeg_caches() -> None:
+    """
+    Resolve the FFmpeg binaries and probe NVENC ahead of the first task.
+    
+    Called in the Celery parent process before the pool forks, so every
+    child inherits the cached paths and capability result instead of
+    probing on its first job.
+    """
+    get_ffmpeg_path()
+    get_ffprobe_path()
+    if getattr(settings, 'FFMPEG_HWACCEL', 'auto').lower() == 'auto':
+        nvenc_available()
+
+
+# Probe results kept per worker process (keyed by file identity, so a
+# rewritten file is probed again)
+MEDIA_INFO_CACHE_SIZE = 64
 
 
 def get_media_info(file_path: str) -> Dict[str, Any]:
     """
     Get media file information using ffprobe.
     Returns duration, format, streams info.
+    
+    One ffprobe run returns format and streams together, and the result
+    is cached by (path, inode, size, mtime): a job that needs both the
+    duration and stream details (e.g. the frame rate) probes its input
+    once. Treat the returned dict as read-only.
     """
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        # Let ffprobe report the problem
+        return _probe_media(file_path, None)
+    return _probe_media(file_path, (st.st_ino, st.st_size, st.st_mtime_ns))
+
+
+@lru_cache(maxsize=MEDIA_INFO_CACHE_SIZE)
+def _probe_media(file_path: str, identity) -> Dict[str, Any]:
+    """Run ffprobe on file_path; identity only keys the cache."""
     ffprobe = get_ffprobe_path()
     
     cmd = [
@@ -185,52 +820,261 @@ def get_duration(file_path: str) -> Optional[float]:
     return None
 
 
+def parse_frame_rate(value) -> float:
+    """
+    Parse an ffprobe frame rate ('30000/1001', '25/1' or '25') to fps.
+    
+    Returns 0.0 for missing or malformed values, including ffprobe's '0/0'.
+    """
+    num, _, den = str(value or '').partition('/')
+    try:
+        if not den:
+            return float(num)
+        den = float(den)
+        return float(num) / den if den else 0.0
+    except ValueError:
+        return 0.0
+
+
+def get_upload_duration(uploaded_file) -> Optional[float]:
+    """
+    Probe an upload's duration from Django's temporary upload file.
+    
+    Returns None for in-memory uploads, which have no path to probe; the
+    job's duration is then probed once the input is in storage.
+    """
+    if not hasattr(uploaded_file, 'temporary_file_path'):
+        return None
+    return get_duration(uploaded_file.temporary_file_path())
+
+
+# How much of an FFmpeg input to start reading ahead before FFmpeg opens it
+INPUT_PREFETCH_BYTES = 64 << 20
+
+
+def prefetch_input(file_path: str) -> None:
+    """
+    Hint the kernel to start reading an FFmpeg input ahead of time.
+    
+    Marks the file for sequential access (larger read-ahead windows) and
+    queues the first INPUT_PREFETCH_BYTES with POSIX_FADV_WILLNEED, so disk
+    reads overlap FFmpeg's startup and probing. No-op where posix_fadvise
+    is unsupported.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        os.posix_fadvise(fd, 0, INPUT_PREFETCH_BYTES, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _read_ffmpeg_progress(stream, stats: Dict[str, str], progress_callback=None) -> None:
+    """
+    Consume FFmpeg's -progress key=value stream.
+    
+    Each block ends with a progress=continue|end line; stats always holds
+    the latest complete block, which is passed to progress_callback.
+    """
+    block = {}
+    for line in stream:
+        key, sep, value = line.strip().partition('=')
+        if not sep:
+            continue
+        block[key] = value
+        if key == 'progress':
+            stats.clear()
+            stats.update(block)
+            block = {}
+            if progress_callback is not None:
+                try:
+                    progress_callback(dict(stats))
+                except Exception:
+                    pass
+
+
+def _ffmpeg_cpu_set() -> Optional[set]:
+    """
+    CPUs this worker process's FFmpeg should be pinned to, or None.
+    
+    With FFMPEG_PIN_CPUS enabled, the CPUs allowed to this process are cut
+    into blocks of FFMPEG_THREADS and each prefork child takes the block
+    matching its pool index, so concurrent encodes stay on disjoint cores
+    (and their caches) instead of being migrated between them.
+    """
+    if not getattr(settings, 'FFMPEG_PIN_CPUS', False) or not hasattr(os, 'sched_setaffinity'):
+        return None
+    
+    threads = getattr(settings, 'FFMPEG_THREADS', 0)
+    if threads <= 0:
+        return None
+    
+    try:
+        from billiard.process import current_process
+        index = current_process().index
+    except (ImportError, AttributeError):
+        return None
+    if index is None:
+        return None
+    
+    cpus = sorted(os.sched_getaffinity(0))
+    blocks = len(cpus) // threads
+    if blocks < 2:
+        return None
+    
+    start = (index % blocks) * threads
+    return set(cpus[start:start + threads])
+
+
+def _wait_process(process: subprocess.Popen, timeout: float) -> int:
+    """
+    Wait for a child process without polling.
+    
+    Popen.wait(timeout) sleeps in a loop (up to 50 ms per check) until the
+    child exits. On Linux 5.3+ a pidfd becomes readable the moment the
+    child exits, so the worker sleeps in poll() and wakes up immediately.
+    
+    Raises:
+        subprocess.TimeoutExpired: If the process is still running after timeout
+    """
+    import select
+    
+    # gevent's monkey-patching removes select.poll; its Popen.wait is
+    # already cooperative
+    if not hasattr(select, 'poll'):
+        return process.wait(timeout=timeout)
+    
+    try:
+        pidfd = os.pidfd_open(process.pid)
+    except (AttributeError, OSError):
+        # No pidfd support (non-Linux, old kernel or Python)
+        return process.wait(timeout=timeout)
+    
+    try:
+        poller = select.poll()
+        poller.register(pidfd, select.POLLIN)
+        if not poller.poll(timeout * 1000):
+            raise subprocess.TimeoutExpired(process.args, timeout)
+    finally:
+        os.close(pidfd)
+    
+    # Already exited: this only reaps it
+    return process.wait()
+
+
 def run_ffmpeg(
     input_path: str,
     output_path: str,
     options: List[str] = None,
-    timeout: int = 300
-) -> bool:
+    timeout: int = 300,
+    input_options: List[str] = None,
+    progress_callback=None,
+    pin_cpus: bool = True
+) -> Dict[str, str]:
     """
     Run FFmpeg command with given options.
     
+    FFmpeg reports its progress (-progress pipe:1) as it runs; the stream
+    is parsed on a background thread, so the final output size and
+    duration come for free instead of from a stat() afterwards.
+    
     Args:
         input_path: Input file path
         output_path: Output file path
         options: Additional FFmpeg options
         timeout: Command timeout in seconds
+        input_options: Options placed before -i (e.g. hardware decoding)
+        progress_callback: Called with each progress block (out_time_us,
+            total_size, speed, progress, ...)
+        pin_cpus: Pin FFmpeg to this worker's CPU block (FFMPEG_PIN_CPUS);
+            pass False for GPU encodes, which are not CPU-bound
     
     Returns:
-        True if successful, raises FFmpegError otherwise
+        Final progress stats (total_size, out_time_us, ...) if successful,
+        raises FFmpegError otherwise
     """
+    import tempfile
+    import threading
+    
     ffmpeg = get_ffmpeg_path()
     
-    # PERFORMANCE: Use all CPU cores for faster encoding
-    cmd = [ffmpeg, '-y', '-threads', '0', '-i', input_path]
+    # PERFORMANCE: Size decoder and encoder threads to this worker's share
+    # of the CPU (settings.FFMPEG_THREADS)
+    threads = str(getattr(settings, 'FFMPEG_THREADS', 0))
+    cmd = [
+        ffmpeg, '-y', '-nostats', '-progress', 'pipe:1',
+        '-threads', threads, *(input_options or []), '-i', input_path
+    ]
     
     if options:
         cmd.extend(options)
     
-    cmd.append(output_path)
-    
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=timeout
+    cmd.extend(['-threads', threads, output_path])
+    
+    stats = {}
+    
+    # stderr goes to a file so only the progress pipe needs draining
+    with tempfile.TemporaryFile() as stderr_file:
+        try:
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+                text=True
+            )
+        except FileNotFoundError:
+            raise FFmpegError('FFmpeg not found. Please install FFmpeg.')
+        
+        cpu_set = _ffmpeg_cpu_set() if pin_cpus else None
+        if cpu_set:
+            try:
+                os.sched_setaffinity(process.pid, cpu_set)
+            except OSError:
+                # Process already exited, or CPUs went offline
+                pass
+        
+        reader = threading.Thread(
+            target=_read_ffmpeg_progress,
+            args=(process.stdout, stats, progress_callback),
+            daemon=True
         )
+        reader.start()
         
-        if result.returncode != 0:
-            error_msg = result.stderr[-500:] if result.stderr else 'Unknown error'
-            raise FFmpegError(f'FFmpeg conversion failed: {error_msg}')
+        try:
+            returncode = _wait_process(process, timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            raise FFmpegError(f'FFmpeg timeout after {timeout} seconds')
+        finally:
+            reader.join()
+            process.stdout.close()
         
-        return True
+        if returncode < 0:
+            raise FFmpegTransientError(f'FFmpeg terminated by signal {-returncode}')
+        
+        if returncode != 0:
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode(errors='replace')
+            error_msg = stderr[-500:] if stderr else 'Unknown error'
+            raise FFmpegError(f'FFmpeg conversion failed: {error_msg}')
     
-    except subprocess.TimeoutExpired:
-        raise FFmpegError(f'FFmpeg timeout after {timeout} seconds')
-    except FileNotFoundError:
-        raise FFmpegError('FFmpeg not found. Please install FFmpeg.')
+    return stats
+
+
+def ffmpeg_output_size(stats: Dict[str, str], output_path: str) -> int:
+    """Output size from run_ffmpeg() stats, falling back to a stat()."""
+    try:
+        return int(stats['total_size'])
+    except (KeyError, TypeError, ValueError):
+        return get_file_size(output_path)
 
 
 # ============================================
@@ -634,6 +1478,127 @@ VIDEO_CODEC_MAP = {
 }
 
 
+# Software encoders with an NVENC (NVIDIA hardware) equivalent
+NVENC_CODECS = {
+    'libx264': 'h264_nvenc',
+}
+
+# x264-specific flags (each followed by a value) that NVENC rejects
+X264_ONLY_OPTIONS = {'-preset', '-crf'}
+
+# NVENC constant-quality settings comparable to x264 veryfast / crf 23
+NVENC_OPTIONS = ['-preset', 'p4', '-rc', 'vbr', '-cq', '23', '-b:v', '0']
+
+# Decode on the GPU (NVDEC) and keep frames in GPU memory for the encoder
+CUDA_INPUT_OPTIONS = ['-hwaccel', 'cuda', '-hwaccel_output_format', 'cuda']
+
+# Per-slot lock files bounding concurrent NVENC sessions on one GPU
+NVENC_LOCK_PATTERN = 'nvenc-gpu{gpu}-slot{slot}.lock'
+
+
+@lru_cache(maxsize=None)
+def nvenc_available() -> bool:
+    """
+    Whether FFmpeg can encode with NVENC on this machine.
+    
+    Probed once per process with a tiny test encode, so FFmpeg builds
+    that have NVENC compiled in but no usable GPU/driver report False.
+    """
+    cmd = [
+        get_ffmpeg_path(), '-v', 'error',
+        '-f', 'lavfi', '-i', 'nullsrc=s=256x256:d=0.1',
+        '-c:v', 'h264_nvenc', '-f', 'null', '-'
+    ]
+    try:
+        return subprocess.run(cmd, capture_output=True, timeout=30).returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+
+
+def hwaccel_enabled(mode: str = None) -> bool:
+    """
+    Resolve an FFMPEG_HWACCEL mode: 'none', 'cuda', or 'auto' (probe).
+    
+    Args:
+        mode: Override for settings.FFMPEG_HWACCEL
+    """
+    mode = (mode or getattr(settings, 'FFMPEG_HWACCEL', 'auto')).lower()
+    if mode == 'none':
+        return False
+    if mode == 'cuda':
+        return True
+    return nvenc_available()
+
+
+@contextmanager
+def nvenc_session(gpu: int = None):
+    """
+    Hold one of the NVENC_MAX_SESSIONS encoder slots on a GPU.
+    
+    Consumer NVIDIA cards refuse encode sessions beyond a small fixed
+    number, failing with "OpenEncodeSessionEx failed: out of memory". Slots
+    are flock()ed lock files, so the cap holds across every worker process
+    on the host and a slot is released if its holder dies. Does not block:
+    yields False when every slot is busy so the caller can encode on the CPU.
+    
+    Args:
+        gpu: CUDA device index (default: settings.NVENC_GPU)
+    """
+    import fcntl
+    import tempfile
+    
+    gpu = getattr(settings, 'NVENC_GPU', 0) if gpu is None else gpu
+    max_sessions = getattr(settings, 'NVENC_MAX_SESSIONS', 2)
+    
+    for slot in range(max_sessions):
+        lock_path = os.path.join(tempfile.gettempdir(), NVENC_LOCK_PATTERN.format(gpu=gpu, slot=slot))
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            continue
+        try:
+            yield True
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+        return
+    
+    yield False
+
+
+def _strip_x264_options(ffmpeg_options: List[str]) -> List[str]:
+    """Drop X264_ONLY_OPTIONS (and their values) from an option list."""
+    options = []
+    skip_value = False
+    for opt in ffmpeg_options:
+        if skip_value:
+            skip_value = False
+            continue
+        if opt in X264_ONLY_OPTIONS:
+            skip_value = True
+            continue
+        options.append(opt)
+    return options
+
+
+def _nvenc_video_options(ffmpeg_options: List[str], vcodec: str, resolution: Optional[str]) -> List[str]:
+    """
+    Rewrite a software encode option list for NVENC.
+    
+    x264 rate-control flags are swapped for NVENC_OPTIONS and scaling is
+    done with scale_cuda, so decoded frames never leave the GPU.
+    """
+    options = _strip_x264_options(ffmpeg_options)
+    options.extend(NVENC_OPTIONS)
+    options.extend(['-vcodec', NVENC_CODECS[vcodec]])
+    options.extend(['-gpu', str(getattr(settings, 'NVENC_GPU', 0))])
+    if resolution:
+        options.extend(['-vf', 'scale_cuda=' + resolution.replace('x', ':')])
+    return options
+
+
 def get_3gp_format_info() -> str:
     """
     Returns information about 3GP format limitations.
@@ -704,19 +1669,38 @@ def convert_video(
     input_path: str,
     output_path: str,
     output_format: str,
-    options: Dict[str, Any] = None
-) -> str:
+    options: Dict[str, Any] = None,
+    hwaccel: str = None,
+    start_time: float = None,
+    end_time: float = None,
+    progress_callback=None
+) -> Dict[str, str]:
     """
     Convert video file to specified format with format-aware handling.
     
+    H.264 outputs are decoded with NVDEC and encoded with NVENC when
+    hardware acceleration is enabled, a GPU is usable and one of its
+    NVENC_MAX_SESSIONS slots is free; if no slot is free or the GPU encode
+    fails (unsupported input codec), the conversion is done on the CPU.
+    With settings.VIDEO_BACKEND = 'pynvc', unscaled whole-file H.264
+    conversions first try the PyNvVideoCodec backend (nvcodec_backend).
+    
+    With start_time/end_time only that clip is converted: the seek is
+    placed before -i, so FFmpeg jumps to the nearest keyframe instead of
+    decoding everything up to the start.
+    
     Args:
         input_path: Path to input video file
         output_path: Path for output file
         output_format: Target video format
-        options: Additional options (resolution, bitrate, etc.)
+        options: Additional options (resolution, bitrate, x264 preset, etc.)
+        hwaccel: 'auto', 'cuda' or 'none' (default: settings.FFMPEG_HWACCEL)
+        start_time: Clip start in seconds (optional)
+        end_time: Clip end in seconds (optional, requires start_time)
+        progress_callback: Passed to run_ffmpeg() for live progress
     
     Returns:
-        Output file path
+        Final FFmpeg progress stats (see run_ffmpeg)
     
     Raises:
         FFmpegError: If conversion fails
@@ -735,36 +1719,109 @@ def convert_video(
     format_config = VIDEO_CODEC_MAP.get(output_format_lower, {})
     vcodec = format_config.get('vcodec', 'copy')
     acodec = format_config.get('acodec', 'copy')
-    ffmpeg_options = format_config.get('options', []).copy()
+    format_options = format_config.get('options', [])
+    resolution = adjusted_options.get('resolution')
     
-    # Add video codec
-    ffmpeg_options.extend(['-vcodec', vcodec])
+    # Options shared by the software and NVENC paths
+    common_options = []
     
     # Add audio codec
-    ffmpeg_options.extend(['-acodec', acodec])
-    
-    # Add resolution - use adjusted options which may have format-specific limits
-    if 'resolution' in adjusted_options and adjusted_options['resolution']:
-        # Check if resolution is already in ffmpeg_options (from format config)
-        has_resolution = any(opt == '-s' for opt in ffmpeg_options)
-        if not has_resolution:
-            ffmpeg_options.extend(['-s', adjusted_options['resolution']])
+    common_options.extend(['-acodec', acodec])
     
     # Add video bitrate if specified (and not a legacy format)
     if 'video_bitrate' in adjusted_options and adjusted_options['video_bitrate']:
-        ffmpeg_options.extend(['-b:v', adjusted_options['video_bitrate']])
+        common_options.extend(['-b:v', adjusted_options['video_bitrate']])
     
     # Add audio bitrate if specified (and not a legacy format)
     if 'audio_bitrate' in adjusted_options and adjusted_options['audio_bitrate']:
-        ffmpeg_options.extend(['-b:a', adjusted_options['audio_bitrate']])
+        common_options.extend(['-b:a', adjusted_options['audio_bitrate']])
+    
+    # Input-side seek for clips
+    input_options = []
+    if start_time is not None:
+        input_options.extend(['-ss', str(start_time)])
+        if end_time is not None:
+            input_options.extend(['-t', str(end_time - start_time)])
+    
+    prefetch_input(input_path)
+    
+    from . import nvcodec_backend
+    
+    # PyNvVideoCodec backend: whole-file H.264 transcodes without scaling
+    if (
+        vcodec in NVENC_CODECS
+        and not resolution
+        and start_time is None
+        and nvcodec_backend.backend_enabled()
+        and hwaccel_enabled(hwaccel)
+    ):
+        mux_options = _strip_x264_options(format_options)
+        if adjusted_options.get('audio_bitrate'):
+            mux_options.extend(['-b:a', adjusted_options['audio_bitrate']])
+        with nvenc_session() as acquired:
+            if acquired:
+                try:
+                    return nvcodec_backend.transcode(
+                        input_path, output_path, acodec, mux_options,
+                        video_bitrate=adjusted_options.get('video_bitrate'),
+                        progress_callback=progress_callback
+                    )
+                except Exception as e:
+                    import logging
+                    logging.warning(f'Video conversion: PyNvVideoCodec transcode failed, using FFmpeg: {e}')
+    
+    if vcodec in NVENC_CODECS and hwaccel_enabled(hwaccel):
+        hw_options = _nvenc_video_options(format_options, vcodec, resolution) + common_options
+        gpu_input_options = CUDA_INPUT_OPTIONS + [
+            '-hwaccel_device', str(getattr(settings, 'NVENC_GPU', 0))
+        ] + input_options
+        with nvenc_session() as acquired:
+            if acquired:
+                try:
+                    return run_ffmpeg(
+                        input_path, output_path, hw_options,
+                        input_options=gpu_input_options,
+                        progress_callback=progress_callback,
+                        pin_cpus=False
+                    )
+                except FFmpegError as e:
+                    import logging
+                    logging.warning(f'Video conversion: NVENC encode failed, using CPU: {e}')
+            else:
+                import logging
+                logging.info('Video conversion: all NVENC sessions busy, using CPU')
+    
+    ffmpeg_options = format_options.copy()
+    
+    # Caller-selected x264 preset replaces the format default
+    preset = adjusted_options.get('preset')
+    if preset and vcodec == 'libx264':
+        if '-preset' in ffmpeg_options:
+            ffmpeg_options[ffmpeg_options.index('-preset') + 1] = preset
+        else:
+            ffmpeg_options.extend(['-preset', preset])
+    
+    # Add video codec
+    ffmpeg_options.extend(['-vcodec', vcodec])
+    
+    # Add resolution - use adjusted options which may have format-specific limits
+    if resolution:
+        # Check if resolution is already in ffmpeg_options (from format config)
+        has_resolution = any(opt == '-s' for opt in ffmpeg_options)
+        if not has_resolution:
+            ffmpeg_options.extend(['-s', resolution])
+    
+    ffmpeg_options.extend(common_options)
     
     # For strict formats, add pixel format for compatibility
     if output_format_lower in ['3gp', 'flv', 'wmv']:
         ffmpeg_options.extend(['-pix_fmt', 'yuv420p'])
     
-    run_ffmpeg(input_path, output_path, ffmpeg_options)
-    
-    return output_path
+    return run_ffmpeg(
+        input_path, output_path, ffmpeg_options,
+        input_options=input_options,
+        progress_callback=progress_callback
+    )
 
 
 def trim_video(
@@ -772,34 +1829,87 @@ def trim_video(
     output_path: str,
     start_time: float,
     end_time: float,
-    copy_mode: bool = True
-) -> str:
+    copy_mode: bool = True,
+    output_format: str = None
+) -> Dict[str, str]:
     """
     Trim video file between start and end time.
     
+    A re-encoding trim to a known format is done by convert_video() in the
+    same FFmpeg pass, with that format's codecs and an input-side seek.
+    Stream copies seek on the input too, so cutting a short clip from a
+    long file only reads the bytes of the clip.
+    
     Args:
         input_path: Path to input video file
         output_path: Path for output file
         start_time: Start time in seconds
         end_time: End time in seconds
         copy_mode: If True, use stream copy (faster, no re-encoding)
+        output_format: Target video format (default: output_path extension)
     
     Returns:
-        Output file path
+        Final FFmpeg progress stats (see run_ffmpeg)
     """
+    output_format = (output_format or get_file_extension(output_path)).lower()
+    if not copy_mode and output_format in VIDEO_CODEC_MAP:
+        return convert_video(
+            input_path, output_path, output_format,
+            start_time=start_time, end_time=end_time
+        )
+    
     duration = end_time - start_time
     
-    ffmpeg_options = [
+    # Input-side seek: FFmpeg jumps to the keyframe before start_time
+    # instead of reading (or decoding) everything ahead of it
+    input_options = [
         '-ss', str(start_time),
         '-t', str(duration)
     ]
     
+    ffmpeg_options = []
     if copy_mode:
-        ffmpeg_options.extend(['-c', 'copy'])
+        # Copied packets keep their source timestamps; shift them to start at 0
+        ffmpeg_options.extend(['-c', 'copy', '-avoid_negative_ts', 'make_zero'])
     
-    run_ffmpeg(input_path, output_path, ffmpeg_options)
+    return run_ffmpeg(input_path, output_path, ffmpeg_options, input_options=input_options)
+
+
+def trim_video_segments(
+    input_path: str,
+    output_paths: List[str],
+    segments: List[Tuple[float, float]],
+    copy_mode: bool = True
+) -> Dict[str, str]:
+    """
+    Cut several clips out of one video in a single FFmpeg run.
     
-    return output_path
+    Every clip is its own output of the same command, so the input is
+    read (and, when re-encoding, decoded) once for all of them instead of
+    once per clip.
+    
+    Args:
+        input_path: Path to input video file
+        output_paths: One output path per segment
+        segments: (start_time, end_time) pairs in seconds
+        copy_mode: If True, use stream copy (faster, no re-encoding)
+    
+    Returns:
+        Final FFmpeg progress stats (see run_ffmpeg)
+    """
+    if not segments or len(segments) != len(output_paths):
+        raise FFmpegError('Each trim segment needs exactly one output path')
+    
+    ffmpeg_options = []
+    for index, ((start_time, end_time), path) in enumerate(zip(segments, output_paths)):
+        ffmpeg_options.extend(['-ss', str(start_time), '-to', str(end_time)])
+        if copy_mode:
+            ffmpeg_options.extend(['-c', 'copy'])
+        # run_ffmpeg appends the last output itself
+        if index < len(segments) - 1:
+            ffmpeg_options.append(path)
+    
+    return run_ffmpeg(input_path, output_paths[-1], ffmpeg_options)
 
 
 # ============================================
@@ -845,7 +1955,8 @@ def log_tool_usage(
     success: bool = True,
     conversion_job=None,
     processing_time_ms: int = None,
-    user_agent: str = ''
+    user_agent: str = '',
+    conversion_job_id=None
 ) -> None:
     """
     Log tool usage for analytics.
@@ -857,14 +1968,18 @@ def log_tool_usage(
         conversion_job: Optional related ConversionJob
         processing_time_ms: Processing time in milliseconds
         user_agent: User agent string
+        conversion_job_id: Related job's ID, instead of conversion_job
     """
     from .models import ToolUsageLog
     
+    if conversion_job is not None:
+        conversion_job_id = conversion_job.pk
+    
     ToolUsageLog.objects.create(
         tool_name=tool_name,
         client_ip=client_ip,
         success=success,
-        conversion_job=conversion_job,
+        conversion_job_id=conversion_job_id,
         processing_time_ms=processing_time_ms,
         user_agent=user_agent
     )
@@ -3,8 +3,9 @@ Core Views for File Converter SaaS.
 Home page, health check, and base API views.
 """
 
-import subprocess
+import logging
 from datetime import timedelta
+from django.core.cache import cache
 from django.views.generic import TemplateView
 from django.utils import timezone
 from django.db import connection
@@ -14,9 +15,45 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 
-from .models import ConversionJob, ConvertedFile
+from .models import ConversionJob, ConvertedFile, JobStatus
 from .serializers import ConversionJobSerializer, HealthCheckSerializer
-from .utils import get_ffmpeg_path
+from .utils import (
+    file_download_response,
+    probe_ffmpeg,
+    FFMPEG_HEALTH_KEY,
+    FFMPEG_HEALTH_TTL,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Tool cards on the home page
+HOME_TOOLS = (
+    {
+        'name': 'Audio Converter',
+        'description': 'Convert audio files between 15+ formats',
+        'url': '/audio/',
+        'icon': '🎵'
+    },
+    {
+        'name': 'Video Converter',
+        'description': 'Convert video files between 17+ formats',
+        'url': '/video/',
+        'icon': '🎬'
+    },
+    {
+        'name': 'Image Converter',
+        'description': 'Convert images between 17+ formats',
+        'url': '/image/',
+        'icon': '🖼️'
+    },
+    {
+        'name': 'PDF Tools',
+        'description': 'Convert, merge, split, and edit PDFs',
+        'url': '/pdf/',
+        'icon': '📄'
+    },
+)
 
 
 class HomeView(TemplateView):
@@ -26,56 +63,72 @@ class HomeView(TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['title'] = 'File Converter SaaS'
-        context['tools'] = [
-            {
-                'name': 'Audio Converter',
-                'description': 'Convert audio files between 15+ formats',
-                'url': '/audio/',
-                'icon': '🎵'
-            },
-            {
-                'name': 'Video Converter',
-                'description': 'Convert video files between 17+ formats',
-                'url': '/video/',
-                'icon': '🎬'
-            },
-            {
-                'name': 'Image Converter',
-                'description': 'Convert images between 17+ formats',
-                'url': '/image/',
-                'icon': '🖼️'
-            },
-            {
-                'name': 'PDF Tools',
-                'description': 'Convert, merge, split, and edit PDFs',
-                'url': '/pdf/',
-                'icon': '📄'
-            },
-        ]
+        context['tools'] = HOME_TOOLS
         return context
 
 
+# Database probe results are reused for this many seconds; kept short so
+# a real outage still shows up quickly
+HEALTH_DB_TTL = 5
+
+
+def _probe_database():
+    """Run `SELECT 1`; returns (status, error)."""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except Exception as e:
+        return 'unhealthy', str(e)
+    return 'healthy', None
+
+
+def _cached_probe(key, probe, ttl):
+    """Probe result from the cache, re-probing on a miss or cache error."""
+    try:
+        return tuple(cache.get_or_set(key, probe, ttl))
+    except Exception:
+        return probe()
+
+
+def get_cached_ffmpeg_status():
+    """
+    FFmpeg health as (status, error).
+    
+    Kept fresh by the refresh_ffmpeg_health beat task, so in steady state
+    this is a cache read; FFmpeg is only run here on a miss.
+    """
+    return _cached_probe(FFMPEG_HEALTH_KEY, probe_ffmpeg, FFMPEG_HEALTH_TTL)
+
+
+def get_cached_db_status():
+    """Database health as (status, error), probed at most every HEALTH_DB_TTL seconds."""
+    return _cached_probe('health:db', _probe_database, HEALTH_DB_TTL)
+
+
 class HealthCheckView(APIView):
-    """Health check endpoint for monitoring."""
+    """
+    Health check endpoint for monitoring.
+    
+    FFmpeg and database probes are cached (FFMPEG_HEALTH_TTL,
+    HEALTH_DB_TTL), so frequent load balancer checks don't fork FFmpeg. Staff users can
+    pass ?refresh=1 to drop the cached results and probe again.
+    """
     
     def get(self, request):
         """Return system health status."""
         from django.conf import settings
-        from django.db import connection
         import shutil
-        import subprocess
         
         show_details = getattr(settings, 'HEALTH_CHECK_SENSITIVE_INFO', False) or settings.DEBUG
         
+        if request.query_params.get('refresh') and request.user.is_staff:
+            try:
+                cache.delete_many([FFMPEG_HEALTH_KEY, 'health:db'])
+            except Exception:
+                pass
+        
         # Check database connection
-        db_status = 'healthy'
-        db_error = None
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute('SELECT 1')
-        except Exception as e:
-            db_status = 'unhealthy'
-            db_error = str(e)
+        db_status, db_error = get_cached_db_status()
             
         # Check Database Schema (Tables)
         schema_status = 'healthy'
@@ -100,22 +153,7 @@ class HealthCheckView(APIView):
             db_error = f"{db_error} | Schema Error: {str(e)}" if db_error else f"Schema Error: {str(e)}"
         
         # Check FFmpeg
-        ffmpeg_status = 'healthy'
-        ffmpeg_error = None
-        try:
-            # Use utility if possible, or direct path
-            from apps.core.utils import get_ffmpeg_path
-            result = subprocess.run(
-                [get_ffmpeg_path(), '-version'],
-                capture_output=True,
-                timeout=5
-            )
-            if result.returncode != 0:
-                ffmpeg_status = 'unhealthy'
-                ffmpeg_error = 'FFmpeg process returned non-zero exit code'
-        except Exception as e:
-            ffmpeg_status = 'unhealthy'
-            ffmpeg_error = str(e)
+        ffmpeg_status, ffmpeg_error = get_cached_ffmpeg_status()
             
         # Check Storage (Disk space)
         storage_status = 'healthy'
@@ -182,9 +220,16 @@ class ConversionJobListView(APIView):
         from .utils import get_client_ip
         
         client_ip = get_client_ip(request)
+        # Served by the (client_ip, created_at) index, scanned backwards.
+        # Only the serialized columns are loaded, and every job's
+        # converted_files (for download_url) in one extra query, not 20.
         jobs = ConversionJob.objects.filter(
             client_ip=client_ip
-        ).order_by('-created_at')[:20]
+        ).order_by('-created_at').only(
+            'id', 'tool_type', 'operation_type', 'status',
+            'input_format', 'output_format', 'file_size', 'duration',
+            'options', 'created_at', 'completed_at', 'error_message'
+        ).prefetch_related('converted_files')[:20]
         
         serializer = ConversionJobSerializer(
             jobs, many=True, context={'request': request}
@@ -214,10 +259,13 @@ class DownloadFileView(APIView):
     def get(self, request, file_id):
         """Download file by ID."""
         from django.http import FileResponse
-        import os
         
         try:
-            converted_file = ConvertedFile.objects.get(id=file_id)
+            # Only what the download and record_download() touch
+            converted_file = ConvertedFile.objects.only(
+                'id', 'output_file', 'original_filename', 'expires_at',
+                'download_count', 'last_downloaded_at'
+            ).get(id=file_id)
             
             if converted_file.is_expired:
                 return Response(
@@ -225,26 +273,25 @@ class DownloadFileView(APIView):
                     status=status.HTTP_410_GONE
                 )
             
-            # Get file path and clean filename
-            file_path = converted_file.output_file.path
-            
             # Use original_filename if set, otherwise extract from file path
             file_name = converted_file.original_filename or converted_file.output_file.name.split('/')[-1]
             
-            if not os.path.exists(file_path):
+            try:
+                # Use FileResponse for efficient streaming (sendfile-capable fd)
+                # This is cloud-safe and memory-efficient
+                response = file_download_response(converted_file.output_file.path, file_name)
+            except NotImplementedError:
+                # Remote storage has no local path: stream it through the storage API
+                output_file = converted_file.output_file
+                response = FileResponse(output_file.open('rb'), as_attachment=True, filename=file_name)
+                response['Content-Length'] = output_file.size
+            except FileNotFoundError:
+                # Opening the file doubles as the existence check
                 return Response(
                     {'error': 'File not found on server'},
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            # Use FileResponse for efficient streaming
-            # This is cloud-safe and memory-efficient
-            response = FileResponse(
-                open(file_path, 'rb'),
-                as_attachment=True,
-                filename=file_name
-            )
-            
             # Add CORS header to expose Content-Disposition for blob downloads
             response['Access-Control-Expose-Headers'] =  'Content-Disposition, Content-Type, Content-Length'
             
@@ -260,6 +307,58 @@ class DownloadFileView(APIView):
             )
 
 
+# Leading bytes that identify each accepted input kind
+FILE_SIGNATURES = {
+    'pdf': (b'%PDF-',),
+    'image': (
+        b'\xff\xd8\xff',         # JPEG
+        b'\x89PNG\r\n\x1a\n',     # PNG
+        b'GIF87a', b'GIF89a',    # GIF
+        b'BM',                   # BMP
+        b'II*\x00', b'MM\x00*',  # TIFF
+        b'\x00\x00\x01\x00',     # ICO
+        b'P1', b'P2', b'P3', b'P4', b'P5', b'P6',  # PBM/PGM/PPM
+        b'8BPS',                 # PSD
+        b'\x00\x00\x00\x0cjP  ',  # JPEG 2000
+    ),
+}
+
+# Image containers identified by a tag at an offset: RIFF....WEBP, and
+# ISO-BMFF (....ftyp<brand>) for HEIC/HEIF and AVIF
+IMAGE_RIFF_FORM = b'WEBP'
+IMAGE_FTYP_BRANDS = (b'heic', b'heix', b'hevc', b'heim', b'heis', b'mif1', b'msf1', b'avif', b'avis')
+
+
+def is_image_header(head: bytes, upload) -> bool:
+    """
+    Whether an upload's leading bytes are an image Pillow or libvips can read.
+    
+    Known signatures are checked first; anything else is accepted only if
+    Pillow can identify it (e.g. TGA or PCX, which have no magic bytes).
+    """
+    if head.startswith(FILE_SIGNATURES['image']):
+        return True
+    if head[:4] == b'RIFF':
+        return head[8:12] == IMAGE_RIFF_FORM
+    if head[4:8] == b'ftyp':
+        return head[8:12] in IMAGE_FTYP_BRANDS
+    
+    from PIL import Image, UnidentifiedImageError
+    
+    try:
+        # Only parses the header; pixel data is not decoded
+        with Image.open(upload):
+            return True
+    except (UnidentifiedImageError, OSError):
+        return False
+    finally:
+        upload.seek(0)
+
+
+# PDF readers accept a header anywhere in the first KiB
+SIGNATURE_SNIFF_BYTES = 1024
+
+
 class BaseConversionView(APIView):
     """Base class for conversion views."""
     
@@ -269,6 +368,12 @@ class BaseConversionView(APIView):
     operation_type = None
     tool_name = None
     
+    # Content digest of the upload, set by check_duplicate_job()
+    upload_digest = None
+    
+    # Expected upload content ('pdf', 'image'); checked by validate_file_size()
+    input_kind = None
+    
     def get_client_info(self, request):
         """Get client IP and user agent."""
         from .utils import get_client_ip, get_user_agent
@@ -277,25 +382,14 @@ class BaseConversionView(APIView):
             'user_agent': get_user_agent(request)
         }
     
-    def check_rate_limit(self, request):
-        """Check rate limit for client."""
-        from .utils import check_rate_limit, get_client_ip
-        
-        client_ip = get_client_ip(request)
-        is_allowed, remaining = check_rate_limit(client_ip)
-        
-        if not is_allowed:
-            return Response(
-                {
-                    'error': 'Rate limit exceeded. Please try again later.',
-                    'remaining_requests': remaining
-                },
-                status=status.HTTP_429_TOO_MANY_REQUESTS
-            )
-        return None
-        
     def validate_file_size(self, input_file):
-        """Validate file size against settings."""
+        """
+        Validate file size against settings, and the content signature when
+        the view sets input_kind.
+        
+        Runs before anything is hashed or staged, so oversized or mislabeled
+        uploads are rejected without being copied to disk.
+        """
         from django.conf import settings
         max_size = getattr(settings, 'MAX_UPLOAD_SIZE', 500 * 1024 * 1024)
         
@@ -308,29 +402,57 @@ class BaseConversionView(APIView):
                 },
                 status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
             )
+        
+        if self.input_kind:
+            head = input_file.read(SIGNATURE_SNIFF_BYTES)
+            input_file.seek(0)
+            
+            if self.input_kind == 'pdf':
+                matched = FILE_SIGNATURES['pdf'][0] in head
+            else:
+                matched = is_image_header(head, input_file)
+            
+            if not matched:
+                return Response(
+                    {'error': f'{input_file.name} is not a valid {self.input_kind.upper()} file.'},
+                    status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+                )
         return None
 
     def check_duplicate_job(self, request, input_file):
         """
         Check if an identical job is already processing for this IP.
         Prevents accidental double-clicks from spawning multiple tasks.
+        
+        The upload is hashed once; the digest is stored on the job by
+        create_job() so later requests can compare content, not just size.
         """
-        from .utils import get_client_ip
+        from .utils import get_client_ip, compute_upload_digest
         from .models import ConversionJob, JobStatus
         
         client_ip = get_client_ip(request)
+        self.upload_digest = compute_upload_digest(input_file)
         
         # Look for jobs with same IP, same tool, same size, and PENDING/PROCESSING status
         # within the last 5 minutes
         five_minutes_ago = timezone.now() - timedelta(minutes=5)
         
-        duplicate = ConversionJob.objects.filter(
+        candidates = ConversionJob.objects.filter(
             client_ip=client_ip,
             tool_type=self.tool_type,
             file_size=input_file.size,
             status__in=[JobStatus.PENDING, JobStatus.PROCESSING],
             created_at__gte=five_minutes_ago
-        ).first()
+        ).only('id', 'options')
+        
+        # Jobs created before digests were recorded fall back to the size match
+        duplicate = next(
+            (
+                job for job in candidates
+                if job.options.get('content_hash') in (None, self.upload_digest)
+            ),
+            None
+        )
         
         if duplicate:
             return Response(
@@ -342,10 +464,45 @@ class BaseConversionView(APIView):
             )
         return None
     
-    def create_job(self, request, input_file, input_format, output_format, options=None):
-        """Create a conversion job."""
+    def should_queue(self, file_size=0, duration=None):
+        """
+        Whether to queue a job for a Celery worker instead of running it inline.
+        
+        Always with USE_ASYNC_CONVERSION. In sync mode, jobs larger than
+        SYNC_MAX_BYTES or longer than SYNC_MAX_DURATION seconds are queued
+        too, if a broker is reachable.
+        """
+        from django.conf import settings
+        from apps.core.celery_compat import broker_reachable
+        
+        if settings.USE_ASYNC_CONVERSION:
+            return True
+        too_long = (
+            file_size > settings.SYNC_MAX_BYTES
+            or (duration or 0) > settings.SYNC_MAX_DURATION
+        )
+        return too_long and broker_reachable()
+    
+    def create_job(
+        self, request, input_file, input_format, output_format,
+        options=None, duration=None, initial_status=JobStatus.PENDING
+    ):
+        """
+        Create a conversion job.
+        
+        Synchronous views pass initial_status=JobStatus.PROCESSING so the
+        INSERT already records it, saving a mark_processing() UPDATE.
+        """
         client_info = self.get_client_info(request)
         
+        options = dict(options or {})
+        if self.upload_digest:
+            options.setdefault('content_hash', self.upload_digest)
+        # Slot taken by RateLimitMiddleware; a queued job's task releases it
+        slot = getattr(request, 'concurrency_slot', None)
+        if slot:
+            options['concurrency_slot'] = slot
+        
         job = ConversionJob.objects.create(
             tool_type=self.tool_type,
             operation_type=self.operation_type,
@@ -353,21 +510,49 @@ class BaseConversionView(APIView):
             input_format=input_format,
             output_format=output_format,
             file_size=input_file.size,
-            options=options or {},
+            duration=duration,
+            status=initial_status,
+            options=options,
             **client_info
         )
         
         return job
     
+    def hand_off_slot(self, request):
+        """
+        Record that the task just dispatched now owns the request's
+        concurrency slot; its after_return releases it, not the middleware.
+        """
+        # Set on the Django request, which the middleware sees
+        getattr(request, '_request', request).concurrency_slot_handed_off = True
+    
     def log_usage(self, request, success=True, job=None, processing_time_ms=None):
-        """Log tool usage."""
+        """
+        Log tool usage.
+        
+        With a broker available the row is written by log_tool_usage_task,
+        so the response doesn't wait on the INSERT; otherwise inline.
+        """
+        from apps.core.celery_compat import async_conversion_enabled, send_task_nowait
+        from .tasks import log_tool_usage_task
         from .utils import log_tool_usage, get_client_ip, get_user_agent
         
-        log_tool_usage(
-            tool_name=self.tool_name,
-            client_ip=get_client_ip(request),
-            success=success,
-            conversion_job=job,
-            processing_time_ms=processing_time_ms,
-            user_agent=get_user_agent(request)
-        )
+        entry = {
+            'tool_name': self.tool_name,
+            'client_ip': get_client_ip(request),
+            'success': success,
+            'processing_time_ms': processing_time_ms,
+            'user_agent': get_user_agent(request),
+        }
+        
+        if async_conversion_enabled():
+            try:
+                send_task_nowait(
+                    log_tool_usage_task,
+                    kwargs=dict(entry, job_id=str(job.pk) if job else None)
+                )
+                return
+            except Exception as e:
+                logger.warning(f"Could not queue usage log, writing it inline: {e}")
+        
+        log_tool_usage(conversion_job=job, **entry)
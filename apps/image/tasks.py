@@ -4,17 +4,17 @@ Celery tasks for image conversion using Pillow.
 """
 
 import os
-import time
 from django.conf import settings
-from django.core.files import File
 from apps.core.celery_compat import shared_task
 
-from apps.core.models import ConversionJob, ConvertedFile
-from apps.core.tasks import BaseConversionTask, update_job_processing
+from apps.core.models import ConversionJob
+from apps.core.tasks import BaseConversionTask, RETRY_POLICY, update_job_processing
 from apps.core.utils import (
     get_file_extension,
     generate_output_filename,
     get_file_size,
+    persist_output,
+    remove_file,
 )
 from apps.image.utils import (
     convert_image,
@@ -23,7 +23,11 @@ from apps.image.utils import (
     ImageConversionError,
 )
 
-@shared_task(base=BaseConversionTask, bind=True, autoretry_for=(Exception,), retry_backoff=True, max_retries=3)
+# Resolved once per worker process instead of per task
+IMAGE_OUTPUT_DIR = settings.OUTPUT_DIR / 'image'
+IMAGE_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+@shared_task(base=BaseConversionTask, bind=True, ignore_result=True, **RETRY_POLICY)
 def convert_image_task(self, job_id, output_format, options):
     """Background task for image conversion."""
     job = update_job_processing(job_id)
@@ -35,9 +39,7 @@ def convert_image_task(self, job_id, output_format, options):
         input_format = get_file_extension(job.input_file.name)
         
         output_filename = generate_output_filename(os.path.basename(job.input_file.name), output_format)
-        output_dir = settings.OUTPUT_DIR / 'image'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = str(output_dir / output_filename)
+        output_path = str(IMAGE_OUTPUT_DIR / output_filename)
         
         # Convert based on input format (replicate view logic)
         if input_format.lower() == 'svg':
@@ -47,20 +49,12 @@ def convert_image_task(self, job_id, output_format, options):
         else:
             convert_image(input_path, output_path, output_format, options)
             
-        with open(output_path, 'rb') as f:
-            job.output_file.save(output_filename, File(f), save=False)
-            
-        job.mark_completed(job.output_file.name)
-        
-        ConvertedFile.objects.create(
-            conversion_job=job,
-            output_file=job.output_file,
-            output_format=output_format,
-            file_size=get_file_size(output_path)
-        )
+        # Save result and mark completed in one transaction
+        file_size = get_file_size(output_path)
+        persist_output(job, output_path, output_filename, move=True)
+        job.complete_with_output(output_format=output_format, file_size=file_size)
         
-        if os.path.exists(output_path):
-            os.remove(output_path)
+        remove_file(output_path)
             
         return True
     except Exception as e:
@@ -3,26 +3,51 @@ from django.views.generic import TemplateView
 from django.conf import settings
 
 
+# Tool cards on the image home page
+IMAGE_TOOLS = (
+    {
+        'name': 'Image Converter',
+        'description': 'Convert images between 17+ formats',
+        'url': '/image/convert/',
+        'icon': '🔄'
+    },
+    {
+        'name': 'Batch Converter',
+        'description': 'Convert multiple images at once with drag & drop',
+        'url': '/image/batch/',
+        'icon': '📦'
+    },
+)
+
+
+# Output format choices on the convert page
+IMAGE_OUTPUT_FORMATS = (
+    {'value': 'jpg', 'label': 'JPEG'},
+    {'value': 'png', 'label': 'PNG'},
+    {'value': 'webp', 'label': 'WEBP'},
+    {'value': 'gif', 'label': 'GIF'},
+    {'value': 'bmp', 'label': 'BMP'},
+    {'value': 'tiff', 'label': 'TIFF'},
+    {'value': 'ico', 'label': 'ICO'},
+)
+
+
+# Quality choices on the convert page
+IMAGE_QUALITY_OPTIONS = (
+    {'value': 60, 'label': 'Low (60%)'},
+    {'value': 75, 'label': 'Medium (75%)'},
+    {'value': 85, 'label': 'High (85%)'},
+    {'value': 95, 'label': 'Best (95%)'},
+)
+
+
 class ImageHomeView(TemplateView):
     template_name = 'image/home.html'
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['title'] = 'Image Tools'
-        context['tools'] = [
-            {
-                'name': 'Image Converter',
-                'description': 'Convert images between 17+ formats',
-                'url': '/image/convert/',
-                'icon': '🔄'
-            },
-            {
-                'name': 'Batch Converter',
-                'description': 'Convert multiple images at once with drag & drop',
-                'url': '/image/batch/',
-                'icon': '📦'
-            },
-        ]
+        context['tools'] = IMAGE_TOOLS
         return context
 
 
@@ -33,21 +58,8 @@ class ImageConvertPageView(TemplateView):
         context = super().get_context_data(**kwargs)
         context['title'] = 'Image Converter'
         context['input_formats'] = settings.SUPPORTED_IMAGE_FORMATS
-        context['output_formats'] = [
-            {'value': 'jpg', 'label': 'JPEG'},
-            {'value': 'png', 'label': 'PNG'},
-            {'value': 'webp', 'label': 'WEBP'},
-            {'value': 'gif', 'label': 'GIF'},
-            {'value': 'bmp', 'label': 'BMP'},
-            {'value': 'tiff', 'label': 'TIFF'},
-            {'value': 'ico', 'label': 'ICO'},
-        ]
-        context['quality_options'] = [
-            {'value': 60, 'label': 'Low (60%)'},
-            {'value': 75, 'label': 'Medium (75%)'},
-            {'value': 85, 'label': 'High (85%)'},
-            {'value': 95, 'label': 'Best (95%)'},
-        ]
+        context['output_formats'] = IMAGE_OUTPUT_FORMATS
+        context['quality_options'] = IMAGE_QUALITY_OPTIONS
         return context
 
 
@@ -5,7 +5,7 @@ Pillow-based image conversion functions.
 
 import os
 from pathlib import Path
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, Tuple, BinaryIO
 
 from PIL import Image
 from django.conf import settings
@@ -41,6 +41,33 @@ def get_pillow_format(extension: str) -> str:
     return PILLOW_FORMAT_MAP.get(extension.lower(), extension.upper())
 
 
+def get_target_size(
+    source_size: Tuple[int, int],
+    options: Dict[str, Any]
+) -> Optional[Tuple[int, int]]:
+    """
+    Calculate resize dimensions from width/height options.
+    
+    Args:
+        source_size: (width, height) of the source image
+        options: Conversion options with optional 'width'/'height'
+    
+    Returns:
+        (width, height) tuple, or None if no resize was requested
+    """
+    width = options.get('width')
+    height = options.get('height')
+    src_width, src_height = source_size
+    
+    if width and height:
+        return width, height
+    if width:
+        return width, int(src_height * (width / src_width))
+    if height:
+        return int(src_width * (height / src_height)), height
+    return None
+
+
 def convert_image(
     input_path: str,
     output_path: str,
@@ -67,6 +94,18 @@ def convert_image(
             # Get target format
             pillow_format = get_pillow_format(output_format)
             
+            target_size = get_target_size(img.size, options)
+            
+            # PERFORMANCE: For JPEG downscales, let libjpeg decode at 1/2..1/8
+            # scale in the DCT domain. Keep 2x headroom for the final resize.
+            drafted = False
+            if target_size and img.format == 'JPEG':
+                draft_size = (target_size[0] * 2, target_size[1] * 2)
+                if draft_size[0] < img.width and draft_size[1] < img.height:
+                    original_size = img.size
+                    img.draft(img.mode, draft_size)
+                    drafted = img.size != original_size
+            
             # Handle transparency for formats that don't support it
             if output_format.lower() in ['jpg', 'jpeg', 'bmp']:
                 if img.mode in ('RGBA', 'LA', 'P'):
@@ -81,26 +120,14 @@ def convert_image(
             
             # PERFORMANCE: Handle resize with BILINEAR (faster) for large images
             # Use LANCZOS only for small final sizes where quality matters
-            if 'width' in options or 'height' in options:
-                width = options.get('width')
-                height = options.get('height')
-                
-                # Calculate target dimensions
-                if width and height:
-                    new_width, new_height = width, height
-                elif width:
-                    ratio = width / img.width
-                    new_width = width
-                    new_height = int(img.height * ratio)
-                elif height:
-                    ratio = height / img.height
-                    new_width = int(img.width * ratio)
-                    new_height = height
-                else:
-                    new_width, new_height = img.width, img.height
+            if target_size:
+                new_width, new_height = target_size
                 
                 # PERFORMANCE: Use BILINEAR for large images (2x faster), LANCZOS for small
-                if new_width * new_height < 500000:  # Less than ~700x700
+                # Drafted images are already close to target, BICUBIC is enough
+                if drafted:
+                    resample = Image.Resampling.BICUBIC
+                elif new_width * new_height < 500000:  # Less than ~700x700
                     resample = Image.Resampling.LANCZOS
                 else:
                     resample = Image.Resampling.BILINEAR
@@ -225,6 +252,19 @@ def convert_heic_to_image(
         raise ImageConversionError(f'HEIC conversion failed: {str(e)}')
 
 
+def _describe_image(img) -> Dict[str, Any]:
+    """Build the image metadata dictionary for an opened Pillow image."""
+    return {
+        'format': img.format,
+        'mode': img.mode,
+        'width': img.width,
+        'height': img.height,
+        'has_transparency': img.mode in ('RGBA', 'LA', 'P'),
+        'is_animated': getattr(img, 'is_animated', False),
+        'n_frames': getattr(img, 'n_frames', 1),
+    }
+
+
 def get_image_info(file_path: str) -> Dict[str, Any]:
     """
     Get image file information.
@@ -237,14 +277,27 @@ def get_image_info(file_path: str) -> Dict[str, Any]:
     """
     try:
         with Image.open(file_path) as img:
-            return {
-                'format': img.format,
-                'mode': img.mode,
-                'width': img.width,
-                'height': img.height,
-                'has_transparency': img.mode in ('RGBA', 'LA', 'P'),
-                'is_animated': getattr(img, 'is_animated', False),
-                'n_frames': getattr(img, 'n_frames', 1),
-            }
+            return _describe_image(img)
+    except Exception as e:
+        raise ImageConversionError(f'Failed to get image info: {str(e)}')
+
+
+def get_image_info_fileobj(fileobj: BinaryIO) -> Dict[str, Any]:
+    """
+    Get image information from an open binary file object.
+    
+    Used for in-memory uploads so the bytes don't have to be written to
+    disk first. Pillow only reads the header for these fields.
+    
+    Args:
+        fileobj: Seekable binary file object
+    
+    Returns:
+        Dictionary with image metadata
+    """
+    try:
+        fileobj.seek(0)
+        with Image.open(fileobj) as img:
+            return _describe_image(img)
     except Exception as e:
         raise ImageConversionError(f'Failed to get image info: {str(e)}')
@@ -8,13 +8,13 @@ import time
 from pathlib import Path
 
 from django.conf import settings
-from django.core.files import File
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.views import APIView
 from rest_framework import serializers
 
+from apps.core.celery_compat import send_task_nowait
 from apps.core.models import ConversionJob, ConvertedFile, ToolType, OperationType
 from apps.core.views import BaseConversionView
 from apps.core.serializers import ConversionJobSerializer
@@ -22,17 +22,23 @@ from apps.core.utils import (
     get_file_extension,
     generate_output_filename,
     get_file_size,
+    persist_output,
 )
 from .utils import (
     convert_image,
     convert_svg_to_image,
     convert_heic_to_image,
     get_image_info,
+    get_image_info_fileobj,
     ImageConversionError,
 )
 from .tasks import convert_image_task
 
 
+# Resolved once per process instead of per request
+_IMG_OUT = str(settings.OUTPUT_DIR / 'image')
+os.makedirs(_IMG_OUT, exist_ok=True)
+
 
 class ImageConvertSerializer(serializers.Serializer):
     """Serializer for image conversion requests."""
@@ -66,11 +72,6 @@ class ImageConvertView(BaseConversionView):
     def post(self, request):
         """Convert image file to specified format."""
         
-        # Check rate limit
-        rate_limit_response = self.check_rate_limit(request)
-        if rate_limit_response:
-            return rate_limit_response
-        
         # Validate input
         serializer = ImageConvertSerializer(data=request.data)
         if not serializer.is_valid():
@@ -116,7 +117,11 @@ class ImageConvertView(BaseConversionView):
         
         # Async mode dispatch
         if settings.USE_ASYNC_CONVERSION:
-            convert_image_task.delay(job.id, output_format, options)
+            send_task_nowait(
+                convert_image_task,
+                kwargs={'job_id': str(job.id), 'output_format': output_format, 'options': options}
+            )
+            self.hand_off_slot(request)
             self.log_usage(request, success=True, job=job)
             response_serializer = ConversionJobSerializer(job, context={'request': request})
             return Response(response_serializer.data, status=status.HTTP_200_OK)
@@ -130,9 +135,7 @@ class ImageConvertView(BaseConversionView):
             
             # Generate output filename and path
             output_filename = generate_output_filename(uploaded_file.name, output_format)
-            output_dir = settings.OUTPUT_DIR / 'image'
-            output_dir.mkdir(parents=True, exist_ok=True)
-            output_path = str(output_dir / output_filename)
+            output_path = os.path.join(_IMG_OUT, output_filename)
             
             # Convert based on input format
             if input_format.lower() == 'svg':
@@ -143,8 +146,7 @@ class ImageConvertView(BaseConversionView):
                 convert_image(input_path, output_path, output_format, options)
             
             # Save output file to job
-            with open(output_path, 'rb') as f:
-                job.output_file.save(output_filename, File(f), save=False)
+            persist_output(job, output_path, output_filename)
             
             job.mark_completed(job.output_file.name)
             
@@ -201,18 +203,12 @@ class ImageInfoView(APIView):
         
         uploaded_file = request.data['file']
         
-        # Save temporarily
-        temp_dir = settings.UPLOAD_DIR / 'temp'
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        temp_path = str(temp_dir / uploaded_file.name)
-        
         try:
-            with open(temp_path, 'wb') as f:
-                for chunk in uploaded_file.chunks():
-                    f.write(chunk)
-            
-            # Get image info
-            info = get_image_info(temp_path)
+            # Read the upload where it already lives instead of copying it
+            if hasattr(uploaded_file, 'temporary_file_path'):
+                info = get_image_info(uploaded_file.temporary_file_path())
+            else:
+                info = get_image_info_fileobj(uploaded_file.file)
             info['filename'] = uploaded_file.name
             info['file_size'] = uploaded_file.size
             
@@ -223,8 +219,3 @@ class ImageInfoView(APIView):
                 {'error': f'Failed to get file info: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-        
-        finally:
-            # Clean up temp file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
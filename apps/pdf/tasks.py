@@ -5,31 +5,46 @@ Celery tasks for PDF conversion, merging, splitting, compression, and more.
 
 import os
 import time
-import zipfile
 import shutil
 from django.conf import settings
-from django.core.files import File
-from apps.core.celery_compat import shared_task
+from apps.core.celery_compat import shared_task, CELERY_AVAILABLE
 
-from apps.core.models import ConversionJob, ConvertedFile
-from apps.core.tasks import BaseConversionTask, update_job_processing
+from apps.core.models import ConversionJob
+from apps.core.tasks import (
+    BaseConversionTask,
+    JOB_HANDED_OFF,
+    RETRY_POLICY,
+    release_memory,
+    update_job_processing,
+)
+from apps.core.ratelimit import release_job_slot
 from apps.core.utils import (
+    generate_clean_output_filename,
     generate_output_filename,
     get_file_size,
+    persist_output,
+    remove_file,
 )
 from apps.pdf.utils import (
     merge_pdfs,
-    split_pdf,
+    split_pdf_to_zip,
     compress_pdf,
     rotate_pdf,
     protect_pdf,
     unlock_pdf,
     images_to_pdf,
     pdf_to_images,
+    render_page_range,
+    get_pdf_info,
+    zip_outputs,
     PDFError,
 )
 
-@shared_task(base=BaseConversionTask, bind=True, autoretry_for=(Exception,), retry_backoff=True, max_retries=3)
+# Resolved once per worker process instead of per task
+_PDF_OUT = str(settings.OUTPUT_DIR / 'pdf')
+os.makedirs(_PDF_OUT, exist_ok=True)
+
+@shared_task(base=BaseConversionTask, bind=True, ignore_result=True, **RETRY_POLICY)
 def convert_to_pdf_task(self, job_id, options):
     """Background task for PDF conversion."""
     job = update_job_processing(job_id)
@@ -40,9 +55,7 @@ def convert_to_pdf_task(self, job_id, options):
         input_path = job.input_file.path
         
         output_filename = generate_output_filename(os.path.basename(job.input_file.name), 'pdf')
-        output_dir = settings.OUTPUT_DIR / 'pdf'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = str(output_dir / output_filename)
+        output_path = os.path.join(_PDF_OUT, output_filename)
         
         # We need convert_to_pdf in utils, let's verify if it exists. 
         # Actually it's often named differently or handled via other tools.
@@ -52,34 +65,27 @@ def convert_to_pdf_task(self, job_id, options):
         from apps.pdf.utils import convert_to_pdf
         convert_to_pdf(input_path, output_path, options)
         
-        with open(output_path, 'rb') as f:
-            job.output_file.save(output_filename, File(f), save=False)
+        persist_output(job, output_path, output_filename)
             
-        job.mark_completed(job.output_file.name)
-        
-        
-        # Generate clean filename for user
-        from apps.core.utils import generate_clean_output_filename
-        clean_filename = generate_clean_output_filename(
-            original_name=job.input_file.name.split('/')[-1],
-            output_format='pdf'
-        )
-        ConvertedFile.objects.create(
-            conversion_job=job,
-            output_file=job.output_file,
+        # Generate clean filename for user
+        clean_filename = generate_clean_output_filename(
+            original_name=job.input_file.name.split('/')[-1],
+            output_format='pdf'
+        )
+        
+        job.complete_with_output(
             output_format='pdf',
-            original_filename=clean_filename,
+            original_filename=clean_filename,
             file_size=get_file_size(output_path)
         )
         
-        if os.path.exists(output_path):
-            os.remove(output_path)
+        remove_file(output_path)
             
         return True
     except Exception as e:
         raise e
 
-@shared_task(base=BaseConversionTask, bind=True)
+@shared_task(base=BaseConversionTask, bind=True, ignore_result=True)
 def merge_pdfs_task(self, job_id, options):
     """Background task for merging PDFs."""
     job = update_job_processing(job_id)
@@ -89,46 +95,35 @@ def merge_pdfs_task(self, job_id, options):
     try:
         input_paths = options.get('input_paths', [])
         output_filename = options.get('output_filename', 'merged.pdf')
-        output_dir = settings.OUTPUT_DIR / 'pdf'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = str(output_dir / output_filename)
+        output_path = os.path.join(_PDF_OUT, output_filename)
         
-        merge_pdfs(input_paths, output_path)
+        written = merge_pdfs(input_paths, output_path)
         
-        with open(output_path, 'rb') as f:
-            job.output_file.save(output_filename, File(f), save=False)
+        persist_output(job, output_path, output_filename)
             
-        job.mark_completed(job.output_file.name)
-        
-        
         # Generate clean filename for user
-        from apps.core.utils import generate_clean_output_filename
         clean_filename = generate_clean_output_filename(
             original_name='merged',
             output_format='pdf'
         )
         
-        ConvertedFile.objects.create(
-            conversion_job=job,
-            output_file=job.output_file,
+        job.complete_with_output(
             original_filename=clean_filename,
             output_format='pdf',
-            file_size=get_file_size(output_path)
+            file_size=written
         )
         
         if options.get('cleanup_inputs'):
             for path in input_paths:
-                if os.path.exists(path):
-                    os.remove(path)
+                remove_file(path)
                     
-        if os.path.exists(output_path):
-            os.remove(output_path)
+        remove_file(output_path)
             
         return True
     except Exception as e:
         raise e
 
-@shared_task(base=BaseConversionTask, bind=True)
+@shared_task(base=BaseConversionTask, bind=True, ignore_result=True)
 def split_pdf_task(self, job_id, page_ranges):
     """Background task for splitting PDFs."""
     job = update_job_processing(job_id)
@@ -137,48 +132,34 @@ def split_pdf_task(self, job_id, page_ranges):
         
     try:
         input_path = job.input_file.path
-        output_dir = settings.OUTPUT_DIR / 'pdf' / f'split_{job.id.hex[:8]}'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        output_paths = split_pdf(input_path, str(output_dir), page_ranges)
         
         zip_filename = f'split_{job.id.hex[:8]}.zip'
-        zip_path = str(settings.OUTPUT_DIR / 'pdf' / zip_filename)
+        zip_path = os.path.join(_PDF_OUT, zip_filename)
         
-        with zipfile.ZipFile(zip_path, 'w') as zipf:
-            for path in output_paths:
-                zipf.write(path, os.path.basename(path))
+        # Parts go straight into the archive; no per-part files
+        written = split_pdf_to_zip(input_path, zip_path, page_ranges)
         
-        with open(zip_path, 'rb') as f:
-            job.output_file.save(zip_filename, File(f), save=False)
+        persist_output(job, zip_path, zip_filename)
             
-        job.mark_completed(job.output_file.name)
-        
-        
-        # Generate clean filename for user
-        from apps.core.utils import generate_clean_output_filename
-        clean_filename = generate_clean_output_filename(
-            original_name=job.input_file.name.split('/')[-1],
-            output_format='pdf'
-        )
-        ConvertedFile.objects.create(
-            conversion_job=job,
-            output_file=job.output_file,
+        # Generate clean filename for user
+        clean_filename = generate_clean_output_filename(
+            original_name=job.input_file.name.split('/')[-1],
+            output_format='pdf'
+        )
+        
+        job.complete_with_output(
             output_format='zip',
-            original_filename=clean_filename,
-            file_size=get_file_size(zip_path)
+            original_filename=clean_filename,
+            file_size=written
         )
         
-        if os.path.exists(str(output_dir)):
-            shutil.rmtree(str(output_dir))
-        if os.path.exists(zip_path):
-            os.remove(zip_path)
+        remove_file(zip_path)
             
         return True
     except Exception as e:
         raise e
 
-@shared_task(base=BaseConversionTask, bind=True)
+@shared_task(base=BaseConversionTask, bind=True, ignore_result=True)
 def compress_pdf_task(self, job_id, quality):
     """Background task for compressing PDFs."""
     job = update_job_processing(job_id)
@@ -188,40 +169,31 @@ def compress_pdf_task(self, job_id, quality):
     try:
         input_path = job.input_file.path
         output_filename = f'compressed_{os.path.basename(job.input_file.name)}'
-        output_dir = settings.OUTPUT_DIR / 'pdf'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = str(output_dir / output_filename)
+        output_path = os.path.join(_PDF_OUT, output_filename)
         
-        compress_pdf(input_path, output_path, quality)
+        written = compress_pdf(input_path, output_path, quality)
         
-        with open(output_path, 'rb') as f:
-            job.output_file.save(output_filename, File(f), save=False)
+        persist_output(job, output_path, output_filename)
             
-        job.mark_completed(job.output_file.name)
-        
-        
-        # Generate clean filename for user
-        from apps.core.utils import generate_clean_output_filename
-        clean_filename = generate_clean_output_filename(
-            original_name=job.input_file.name.split('/')[-1],
-            output_format='pdf'
-        )
-        ConvertedFile.objects.create(
-            conversion_job=job,
-            output_file=job.output_file,
+        # Generate clean filename for user
+        clean_filename = generate_clean_output_filename(
+            original_name=job.input_file.name.split('/')[-1],
+            output_format='pdf'
+        )
+        
+        job.complete_with_output(
             output_format='pdf',
-            original_filename=clean_filename,
-            file_size=get_file_size(output_path)
+            original_filename=clean_filename,
+            file_size=written
         )
         
-        if os.path.exists(output_path):
-            os.remove(output_path)
+        remove_file(output_path)
             
         return True
     except Exception as e:
         raise e
 
-@shared_task(base=BaseConversionTask, bind=True)
+@shared_task(base=BaseConversionTask, bind=True, ignore_result=True)
 def rotate_pdf_task(self, job_id, rotation, pages):
     """Background task for rotating PDFs."""
     job = update_job_processing(job_id)
@@ -231,40 +203,31 @@ def rotate_pdf_task(self, job_id, rotation, pages):
     try:
         input_path = job.input_file.path
         output_filename = f'rotated_{os.path.basename(job.input_file.name)}'
-        output_dir = settings.OUTPUT_DIR / 'pdf'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = str(output_dir / output_filename)
+        output_path = os.path.join(_PDF_OUT, output_filename)
         
-        rotate_pdf(input_path, output_path, rotation, pages)
+        written = rotate_pdf(input_path, output_path, rotation, pages)
         
-        with open(output_path, 'rb') as f:
-            job.output_file.save(output_filename, File(f), save=False)
+        persist_output(job, output_path, output_filename)
             
-        job.mark_completed(job.output_file.name)
-        
-        
-        # Generate clean filename for user
-        from apps.core.utils import generate_clean_output_filename
-        clean_filename = generate_clean_output_filename(
-            original_name=job.input_file.name.split('/')[-1],
-            output_format='pdf'
-        )
-        ConvertedFile.objects.create(
-            conversion_job=job,
-            output_file=job.output_file,
+        # Generate clean filename for user
+        clean_filename = generate_clean_output_filename(
+            original_name=job.input_file.name.split('/')[-1],
+            output_format='pdf'
+        )
+        
+        job.complete_with_output(
             output_format='pdf',
-            original_filename=clean_filename,
-            file_size=get_file_size(output_path)
+            original_filename=clean_filename,
+            file_size=written
         )
         
-        if os.path.exists(output_path):
-            os.remove(output_path)
+        remove_file(output_path)
             
         return True
     except Exception as e:
         raise e
 
-@shared_task(base=BaseConversionTask, bind=True)
+@shared_task(base=BaseConversionTask, bind=True, ignore_result=True)
 def protect_pdf_task(self, job_id, password, owner_password):
     """Background task for protecting PDFs."""
     job = update_job_processing(job_id)
@@ -274,40 +237,31 @@ def protect_pdf_task(self, job_id, password, owner_password):
     try:
         input_path = job.input_file.path
         output_filename = f'protected_{os.path.basename(job.input_file.name)}'
-        output_dir = settings.OUTPUT_DIR / 'pdf'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = str(output_dir / output_filename)
+        output_path = os.path.join(_PDF_OUT, output_filename)
         
-        protect_pdf(input_path, output_path, password, owner_password)
+        written = protect_pdf(input_path, output_path, password, owner_password)
         
-        with open(output_path, 'rb') as f:
-            job.output_file.save(output_filename, File(f), save=False)
+        persist_output(job, output_path, output_filename)
             
-        job.mark_completed(job.output_file.name)
-        
-        
-        # Generate clean filename for user
-        from apps.core.utils import generate_clean_output_filename
-        clean_filename = generate_clean_output_filename(
-            original_name=job.input_file.name.split('/')[-1],
-            output_format='pdf'
-        )
-        ConvertedFile.objects.create(
-            conversion_job=job,
-            output_file=job.output_file,
+        # Generate clean filename for user
+        clean_filename = generate_clean_output_filename(
+            original_name=job.input_file.name.split('/')[-1],
+            output_format='pdf'
+        )
+        
+        job.complete_with_output(
             output_format='pdf',
-            original_filename=clean_filename,
-            file_size=get_file_size(output_path)
+            original_filename=clean_filename,
+            file_size=written
         )
         
-        if os.path.exists(output_path):
-            os.remove(output_path)
+        remove_file(output_path)
             
         return True
     except Exception as e:
         raise e
 
-@shared_task(base=BaseConversionTask, bind=True)
+@shared_task(base=BaseConversionTask, bind=True, ignore_result=True)
 def unlock_pdf_task(self, job_id, password):
     """Background task for unlocking PDFs."""
     job = update_job_processing(job_id)
@@ -317,40 +271,31 @@ def unlock_pdf_task(self, job_id, password):
     try:
         input_path = job.input_file.path
         output_filename = f'unlocked_{os.path.basename(job.input_file.name)}'
-        output_dir = settings.OUTPUT_DIR / 'pdf'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = str(output_dir / output_filename)
+        output_path = os.path.join(_PDF_OUT, output_filename)
         
-        unlock_pdf(input_path, output_path, password)
+        written = unlock_pdf(input_path, output_path, password)
         
-        with open(output_path, 'rb') as f:
-            job.output_file.save(output_filename, File(f), save=False)
+        persist_output(job, output_path, output_filename)
             
-        job.mark_completed(job.output_file.name)
-        
-        
-        # Generate clean filename for user
-        from apps.core.utils import generate_clean_output_filename
-        clean_filename = generate_clean_output_filename(
-            original_name=job.input_file.name.split('/')[-1],
-            output_format='pdf'
-        )
-        ConvertedFile.objects.create(
-            conversion_job=job,
-            output_file=job.output_file,
+        # Generate clean filename for user
+        clean_filename = generate_clean_output_filename(
+            original_name=job.input_file.name.split('/')[-1],
+            output_format='pdf'
+        )
+        
+        job.complete_with_output(
             output_format='pdf',
-            original_filename=clean_filename,
-            file_size=get_file_size(output_path)
+            original_filename=clean_filename,
+            file_size=written
         )
         
-        if os.path.exists(output_path):
-            os.remove(output_path)
+        remove_file(output_path)
             
         return True
     except Exception as e:
         raise e
 
-@shared_task(base=BaseConversionTask, bind=True)
+@shared_task(base=BaseConversionTask, bind=True, ignore_result=True)
 def images_to_pdf_task(self, job_id, options):
     """Background task for images to PDF."""
     job = update_job_processing(job_id)
@@ -362,90 +307,171 @@ def images_to_pdf_task(self, job_id, options):
         page_size = options.get('page_size', 'A4')
         
         output_filename = f'images_{job.id.hex[:8]}.pdf'
-        output_dir = settings.OUTPUT_DIR / 'pdf'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = str(output_dir / output_filename)
+        output_path = os.path.join(_PDF_OUT, output_filename)
         
-        images_to_pdf(input_paths, output_path, page_size)
+        written = images_to_pdf(input_paths, output_path, page_size)
         
-        with open(output_path, 'rb') as f:
-            job.output_file.save(output_filename, File(f), save=False)
+        persist_output(job, output_path, output_filename)
             
-        job.mark_completed(job.output_file.name)
-        
-        
-        # Generate clean filename for user
-        from apps.core.utils import generate_clean_output_filename
-        clean_filename = generate_clean_output_filename(
-            original_name=job.input_file.name.split('/')[-1],
-            output_format='pdf'
-        )
-        ConvertedFile.objects.create(
-            conversion_job=job,
-            output_file=job.output_file,
+        # Generate clean filename for user
+        clean_filename = generate_clean_output_filename(
+            original_name=job.input_file.name.split('/')[-1],
+            output_format='pdf'
+        )
+        
+        job.complete_with_output(
             output_format='pdf',
-            original_filename=clean_filename,
-            file_size=get_file_size(output_path)
+            original_filename=clean_filename,
+            file_size=written
         )
         
         if options.get('cleanup_inputs'):
             for path in input_paths:
-                if os.path.exists(path):
-                    os.remove(path)
+                remove_file(path)
                     
-        if os.path.exists(output_path):
-            os.remove(output_path)
+        remove_file(output_path)
             
         return True
     except Exception as e:
         raise e
 
-@shared_task(base=BaseConversionTask, bind=True)
+def _finish_pdf_to_images(job, output_dir, output_paths):
+    """Zip rendered pages, attach the archive to the job and clean up."""
+    zip_filename = f'pdf_images_{job.id.hex[:8]}.zip'
+    zip_path = os.path.join(_PDF_OUT, zip_filename)
+    
+    written = zip_outputs(output_paths, zip_path)
+    
+    persist_output(job, zip_path, zip_filename)
+        
+    # Generate clean filename for user
+    clean_filename = generate_clean_output_filename(
+        original_name=job.input_file.name.split('/')[-1],
+        output_format='pdf'
+    )
+    
+    job.complete_with_output(
+        output_format='zip',
+        original_filename=clean_filename,
+        file_size=written
+    )
+    
+    shutil.rmtree(output_dir, ignore_errors=True)
+    remove_file(zip_path)
+
+
+@shared_task(base=BaseConversionTask, bind=True, ignore_result=True)
 def pdf_to_images_task(self, job_id, output_format, dpi):
-    """Background task for PDF to images."""
+    """
+    Background task for PDF to images.
+    
+    Documents longer than PDF_PARALLEL_THRESHOLD pages are fanned out as a
+    chord: each page range renders on its own worker and the callback
+    zips the combined output.
+    """
     job = update_job_processing(job_id)
     if not job:
         return False
         
     try:
         input_path = job.input_file.path
-        output_dir = settings.OUTPUT_DIR / 'pdf' / f'pdf2img_{job.id.hex[:8]}'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        output_paths = pdf_to_images(input_path, str(output_dir), output_format, dpi)
-        
-        zip_filename = f'pdf_images_{job.id.hex[:8]}.zip'
-        zip_path = str(settings.OUTPUT_DIR / 'pdf' / zip_filename)
+        output_dir = os.path.join(_PDF_OUT, f'pdf2img_{job.id.hex[:8]}')
+        os.makedirs(output_dir, exist_ok=True)
         
-        with zipfile.ZipFile(zip_path, 'w') as zipf:
-            for path in output_paths:
-                zipf.write(path, os.path.basename(path))
+        page_count = get_pdf_info(input_path)['num_pages']
+        chunk = settings.PDF_PARALLEL_CHUNK_PAGES
         
-        with open(zip_path, 'rb') as f:
-            job.output_file.save(zip_filename, File(f), save=False)
+        if CELERY_AVAILABLE and page_count > settings.PDF_PARALLEL_THRESHOLD:
+            from celery import chord
             
-        job.mark_completed(job.output_file.name)
-        
-        
-        # Generate clean filename for user
-        from apps.core.utils import generate_clean_output_filename
-        clean_filename = generate_clean_output_filename(
-            original_name=job.input_file.name.split('/')[-1],
-            output_format='pdf'
-        )
-        ConvertedFile.objects.create(
-            conversion_job=job,
-            output_file=job.output_file,
-            output_format='zip',
-            original_filename=clean_filename,
-            file_size=get_file_size(zip_path)
-        )
-        
-        if os.path.exists(str(output_dir)):
-            shutil.rmtree(str(output_dir))
-        if os.path.exists(zip_path):
-            os.remove(zip_path)
+            header = [
+                render_pdf_range_task.s(
+                    input_path, output_dir, output_format, dpi,
+                    start, min(start + chunk, page_count)
+                )
+                for start in range(0, page_count, chunk)
+            ]
+            callback = zip_pdf_images_task.s(job_id=str(job.id), output_dir=output_dir)
+            # Runs if any range (or the callback itself) fails
+            callback.link_error(pdf_to_images_failed_task.s(job_id=str(job.id), output_dir=output_dir))
+            chord(header)(callback)
+            # The slot stays taken until the callback or errback finishes
+            return JOB_HANDED_OFF
+        
+        output_paths = pdf_to_images(input_path, output_dir, output_format, dpi)
+        _finish_pdf_to_images(job, output_dir, output_paths)
             
         return True
     except Exception as e:
         raise e
+
+
+@shared_task
+def render_pdf_range_task(input_path, output_dir, output_format, dpi, start, stop):
+    """
+    Render pages [start, stop) for a fanned-out PDF to images job.
+    
+    Not a BaseConversionTask: it doesn't own the job; failures are handled
+    by the chord's error callback.
+    """
+    # Result is consumed by the chord callback, so it must be stored
+    try:
+        return render_page_range(input_path, output_dir, output_format, dpi, start, stop)
+    finally:
+        release_memory()
+
+
+@shared_task(base=BaseConversionTask, bind=True, ignore_result=True)
+def zip_pdf_images_task(self, range_results, job_id=None, output_dir=None):
+    """Chord callback: zip all rendered ranges and complete the job."""
+    job = ConversionJob.objects.get(id=job_id)
+    
+    # Header results arrive in submission (page) order
+    output_paths = [path for paths in range_results for path in paths]
+    _finish_pdf_to_images(job, output_dir, output_paths)
+    return True
+
+
+@shared_task(ignore_result=True)
+def pdf_to_images_failed_task(request, exc, traceback, job_id=None, output_dir=None):
+    """
+    Chord error callback: fail the job and remove the partial renders.
+    
+    Also gives back the job's concurrency slot, since the chord callback
+    that would have released it never runs.
+    """
+    job = ConversionJob.objects.filter(id=job_id).first()
+    if job:
+        job.mark_failed(str(exc))
+    shutil.rmtree(output_dir, ignore_errors=True)
+    release_job_slot(job_id)
+
+
+@shared_task
+def cleanup_pdf_outputs():
+    """
+    Remove stale scratch outputs under OUTPUT_DIR/pdf.
+    
+    Sync responses unlink their output once it is open, but files served
+    through X-Accel-Redirect, and leftovers from failed requests or
+    tasks, stay behind. Anything older than OUTPUT_TTL_SEC is deleted.
+    Scheduled every 5 minutes by Celery beat.
+    """
+    cutoff = time.time() - getattr(settings, 'OUTPUT_TTL_SEC', 3600)
+    removed = 0
+    
+    with os.scandir(_PDF_OUT) as entries:
+        for entry in entries:
+            try:
+                if entry.stat(follow_symlinks=False).st_mtime >= cutoff:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                else:
+                    os.remove(entry.path)
+                removed += 1
+            except FileNotFoundError:
+                # Already cleaned up by its request or task
+                pass
+    
+    return removed
@@ -2,22 +2,26 @@
 from django.views.generic import TemplateView
 
 
+# Tool cards on the PDF home page
+PDF_TOOLS = (
+    {'name': 'Merge PDF', 'description': 'Combine multiple PDFs into one', 'url': '/pdf/merge/', 'icon': '📎'},
+    {'name': 'Split PDF', 'description': 'Split PDF into multiple files', 'url': '/pdf/split/', 'icon': '✂️'},
+    {'name': 'Compress PDF', 'description': 'Reduce PDF file size', 'url': '/pdf/compress/', 'icon': '📦'},
+    {'name': 'Rotate PDF', 'description': 'Rotate PDF pages', 'url': '/pdf/rotate/', 'icon': '🔄'},
+    {'name': 'Protect PDF', 'description': 'Add password to PDF', 'url': '/pdf/protect/', 'icon': '🔒'},
+    {'name': 'Unlock PDF', 'description': 'Remove password from PDF', 'url': '/pdf/unlock/', 'icon': '🔓'},
+    {'name': 'Images to PDF', 'description': 'Convert images to PDF', 'url': '/pdf/images-to-pdf/', 'icon': '🖼️'},
+    {'name': 'PDF to Images', 'description': 'Convert PDF to images', 'url': '/pdf/pdf-to-images/', 'icon': '📸'},
+)
+
+
 class PDFHomeView(TemplateView):
     template_name = 'pdf/home.html'
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['title'] = 'PDF Tools'
-        context['tools'] = [
-            {'name': 'Merge PDF', 'description': 'Combine multiple PDFs into one', 'url': '/pdf/merge/', 'icon': '📎'},
-            {'name': 'Split PDF', 'description': 'Split PDF into multiple files', 'url': '/pdf/split/', 'icon': '✂️'},
-            {'name': 'Compress PDF', 'description': 'Reduce PDF file size', 'url': '/pdf/compress/', 'icon': '📦'},
-            {'name': 'Rotate PDF', 'description': 'Rotate PDF pages', 'url': '/pdf/rotate/', 'icon': '🔄'},
-            {'name': 'Protect PDF', 'description': 'Add password to PDF', 'url': '/pdf/protect/', 'icon': '🔒'},
-            {'name': 'Unlock PDF', 'description': 'Remove password from PDF', 'url': '/pdf/unlock/', 'icon': '🔓'},
-            {'name': 'Images to PDF', 'description': 'Convert images to PDF', 'url': '/pdf/images-to-pdf/', 'icon': '🖼️'},
-            {'name': 'PDF to Images', 'description': 'Convert PDF to images', 'url': '/pdf/pdf-to-images/', 'icon': '📸'},
-        ]
+        context['tools'] = PDF_TOOLS
         return context
 
 
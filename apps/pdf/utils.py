@@ -5,14 +5,38 @@ PDF manipulation functions using PyPDF2, ReportLab, etc.
 
 import os
 import io
+import mmap
+import re
+import shutil
+import subprocess
+import time
+import zipfile
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterator, List, Tuple, TYPE_CHECKING
 
-from PIL import Image
-from PyPDF2 import PdfReader, PdfWriter, PdfMerger
-from apps.core.dependency_guard import REPORTLAB_AVAILABLE, get_reportlab_canvas, get_reportlab_pagesizes
+from apps.core.utils import (
+    get_file_size,
+    preallocate_file,
+    copy_file_kernel,
+    get_ghostscript_path,
+    get_pdftoppm_path,
+    zip_outputs,
+)
+from apps.core.dependency_guard import (
+    REPORTLAB_AVAILABLE,
+    PYMUPDF_AVAILABLE,
+    PYVIPS_AVAILABLE,
+    get_reportlab_canvas,
+    get_reportlab_pagesizes,
+)
 
-# Lazy ReportLab imports handled inside functions
+if TYPE_CHECKING:
+    from PyPDF2 import PdfWriter
+
+# PIL, PyPDF2 and ReportLab are imported inside the functions that use
+# them, so importing this module (views, workers) doesn't load them all
 canvas = None
 A4 = None
 letter = None
@@ -33,31 +57,265 @@ class PDFError(Exception):
     pass
 
 
-def merge_pdfs(input_paths: List[str], output_path: str) -> str:
+class PDFContext:
+    """
+    An open PyMuPDF document shared across several operations.
+    
+    The PyMuPDF-backed utilities accept a PDFContext wherever they take an
+    input path. They then work on (and mutate) the shared document instead
+    of re-reading and re-parsing the file, so chained steps such as
+    delete -> rotate -> compress parse the input once.
+    
+    Usage:
+        with PDFContext(path) as ctx:
+            delete_pages(ctx, tmp_path, [2])
+            rotate_pdf(ctx, out_path, 90)
+    """
+    
+    def __init__(self, path: str):
+        import fitz  # PyMuPDF
+        
+        self.path = str(path)
+        self.doc = fitz.open(self.path)
+    
+    def close(self):
+        self.doc.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+@contextmanager
+def _open_pymupdf(src):
+    """Yield a fitz.Document for a path or PDFContext; only paths are closed."""
+    if isinstance(src, PDFContext):
+        yield src.doc
+        return
+    
+    import fitz  # PyMuPDF
+    
+    with fitz.open(src) as doc:
+        yield doc
+
+
+@contextmanager
+def _open_pypdf2(path: str, **kwargs):
+    """
+    Yield a PyPDF2 PdfReader over a read-only memory map of path.
+    
+    PdfReader parses with many small seek()/read() calls; against an
+    mmap these are slices of the page cache rather than buffered-file
+    read syscalls. Objects are loaded lazily, so anything written from
+    the reader's pages must be written before the block exits.
+    """
+    from PyPDF2 import PdfReader
+    
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        yield PdfReader(buf, **kwargs)
+
+
+@lru_cache(maxsize=None)
+def _tool_available(executable: str) -> bool:
+    """Whether a command-line tool resolves on PATH (checked once per process)."""
+    return shutil.which(executable) is not None
+
+
+def _run_tool(cmd: List[str], name: str, timeout: int = 600) -> None:
+    """Run a PDF command-line tool, raising PDFError on failure."""
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise PDFError(f'{name} timeout after {timeout} seconds')
+    
+    if result.returncode != 0:
+        error_msg = result.stderr[-500:] if result.stderr else 'Unknown error'
+        raise PDFError(f'{name} failed: {error_msg}')
+
+
+@lru_cache(maxsize=None)
+def _pymupdf_can_linearize() -> bool:
+    """MuPDF dropped linearized output in 1.26."""
+    import fitz  # PyMuPDF
+    
+    major, minor = (int(part) for part in fitz.VersionBind.split('.')[:2])
+    return (major, minor) < (1, 26)
+
+
+def _save_pymupdf(
+    doc,
+    output_path: str,
+    upper_bound: int = 0,
+    linearize: bool = True,
+    **options
+) -> int:
+    """
+    Save a PyMuPDF document and return the number of bytes written.
+    
+    Output is linearized ("fast web view") when the installed MuPDF
+    supports it, so browsers can show page 1 before the download ends.
+    
+    Args:
+        doc: Open fitz.Document
+        output_path: Path for output PDF
+        upper_bound: Optional size estimate to preallocate
+        linearize: Linearize when supported (skip for files that are
+            never viewed directly, e.g. ZIP members)
+        **options: Extra fitz.Document.save options
+    """
+    options.setdefault('garbage', 3)
+    options.setdefault('deflate', True)
+    options.setdefault('clean', True)
+    
+    if linearize and _pymupdf_can_linearize():
+        # Linearization needs a real file path, not a stream
+        doc.save(output_path, linear=True, **options)
+        return get_file_size(output_path)
+    
+    with open(output_path, 'wb') as f:
+        preallocate_file(f, upper_bound)
+        doc.save(f, **options)
+        written = f.tell()
+        f.truncate(written)
+    return written
+
+
+def _write_pypdf2(writer: 'PdfWriter', output_path: str, upper_bound: int = 0) -> int:
+    """
+    Flate-compress page content streams and write a PyPDF2 document.
+    
+    Args:
+        writer: Populated PdfWriter
+        output_path: Path for output PDF
+        upper_bound: Optional size estimate to preallocate
+    
+    Returns:
+        Number of bytes written
+    """
+    for page in writer.pages:
+        page.compress_content_streams()
+    
+    with open(output_path, 'wb') as f:
+        preallocate_file(f, upper_bound)
+        writer.write(f)
+        written = f.tell()
+        f.truncate(written)
+    return written
+
+
+def merge_pdfs(input_paths: List[str], output_path: str) -> int:
     """
     Merge multiple PDF files into one.
     
+    Uses PyMuPDF page copies when available, otherwise PyPDF2.
+    
     Args:
         input_paths: List of paths to PDF files
         output_path: Path for output PDF
     
     Returns:
-        Output file path
+        Number of bytes written
     """
     try:
-        merger = PdfMerger()
+        # The merged size is bounded by the sum of the inputs
+        upper_bound = sum(get_file_size(path) for path in input_paths)
+        
+        if PYMUPDF_AVAILABLE:
+            import fitz  # PyMuPDF
+            
+            out = fitz.open()
+            try:
+                for path in input_paths:
+                    with fitz.open(path) as src:
+                        out.insert_pdf(src)
+                return _save_pymupdf(out, output_path, upper_bound)
+            finally:
+                out.close()
         
-        for path in input_paths:
-            merger.append(path)
+        from PyPDF2 import PdfWriter
         
-        merger.write(output_path)
-        merger.close()
+        # Single writer instead of PdfMerger: no per-file outline/bookmark
+        # bookkeeping
+        writer = PdfWriter()
         
-        return output_path
+        # Page objects are read from their source while the writer is
+        # serialized, so every input stays mapped until the write is done
+        with ExitStack() as stack:
+            for path in input_paths:
+                reader = stack.enter_context(_open_pypdf2(path, strict=False))
+                for page in reader.pages:
+                    writer.add_page(page)
+            
+            # Newer pypdf releases can fold duplicated fonts/images
+            if hasattr(writer, 'compress_identical_objects'):
+                writer.compress_identical_objects()
+            
+            return _write_pypdf2(writer, output_path, upper_bound)
     except Exception as e:
         raise PDFError(f'PDF merge failed: {str(e)}')
 
 
+def _iter_split_parts(input_path, page_ranges: List[tuple] = None) -> Iterator[Tuple[str, bytes]]:
+    """
+    Yield (filename, pdf_bytes) for each part of a split, one at a time.
+    
+    Parts are serialized in memory so callers can write them wherever
+    they go (a directory, or straight into a ZIP) without a scratch file.
+    """
+    if PYMUPDF_AVAILABLE or isinstance(input_path, PDFContext):
+        import fitz  # PyMuPDF
+        
+        with _open_pymupdf(input_path) as src:
+            page_count = len(src)
+            
+            if page_ranges is None:
+                # Split into individual pages
+                jobs = [(i, i, f'page_{i+1}.pdf') for i in range(page_count)]
+            else:
+                # Split by page ranges
+                jobs = [
+                    (start - 1, min(end, page_count) - 1, f'split_{i+1}.pdf')
+                    for i, (start, end) in enumerate(page_ranges)
+                ]
+            
+            for from_page, to_page, name in jobs:
+                out = fitz.open()
+                try:
+                    out.insert_pdf(src, from_page=from_page, to_page=to_page)
+                    # Parts are shipped inside a ZIP, so they aren't linearized
+                    data = out.tobytes(garbage=4, deflate=True, clean=True)
+                finally:
+                    out.close()
+                yield name, data
+        return
+    
+    from PyPDF2 import PdfWriter
+    
+    with _open_pypdf2(input_path) as reader:
+        page_count = len(reader.pages)
+        
+        if page_ranges is None:
+            jobs = [(i, i + 1, f'page_{i+1}.pdf') for i in range(page_count)]
+        else:
+            jobs = [
+                (start - 1, min(end, page_count), f'split_{i+1}.pdf')
+                for i, (start, end) in enumerate(page_ranges)
+            ]
+        
+        for start, stop, name in jobs:
+            writer = PdfWriter()
+            for page_num in range(start, stop):
+                writer.add_page(reader.pages[page_num])
+            for page in writer.pages:
+                page.compress_content_streams()
+            
+            buf = io.BytesIO()
+            writer.write(buf)
+            yield name, buf.getvalue()
+
+
 def split_pdf(
     input_path: str,
     output_dir: str,
@@ -67,7 +325,7 @@ def split_pdf(
     Split PDF into multiple files.
     
     Args:
-        input_path: Path to input PDF
+        input_path: Path to input PDF (or a shared PDFContext)
         output_dir: Directory for output files
         page_ranges: List of (start, end) tuples. If None, split into individual pages.
     
@@ -75,101 +333,233 @@ def split_pdf(
         List of output file paths
     """
     try:
-        reader = PdfReader(input_path)
         output_paths = []
+        # Join the directory once; per-part paths are plain concatenation
+        prefix = os.path.join(output_dir, '')
         
-        if page_ranges is None:
-            # Split into individual pages
-            for i, page in enumerate(reader.pages):
-                writer = PdfWriter()
-                writer.add_page(page)
-                
-                output_path = os.path.join(output_dir, f'page_{i+1}.pdf')
-                with open(output_path, 'wb') as f:
-                    writer.write(f)
-                output_paths.append(output_path)
-        else:
-            # Split by page ranges
-            for i, (start, end) in enumerate(page_ranges):
-                writer = PdfWriter()
-                
-                for page_num in range(start - 1, min(end, len(reader.pages))):
-                    writer.add_page(reader.pages[page_num])
-                
-                output_path = os.path.join(output_dir, f'split_{i+1}.pdf')
-                with open(output_path, 'wb') as f:
-                    writer.write(f)
-                output_paths.append(output_path)
+        for name, data in _iter_split_parts(input_path, page_ranges):
+            output_path = prefix + name
+            _write_bytes(output_path, data)
+            output_paths.append(output_path)
         
         return output_paths
     except Exception as e:
         raise PDFError(f'PDF split failed: {str(e)}')
 
 
-def compress_pdf(input_path: str, output_path: str, quality: str = 'medium') -> str:
+def split_pdf_to_zip(
+    input_path: str,
+    zip_path: str,
+    page_ranges: List[tuple] = None
+) -> int:
     """
-    Compress PDF file by reducing image quality using PyMuPDF.
+    Split a PDF straight into a ZIP archive.
+    
+    Each part is serialized in memory and stored (ZIP_STORED) as its own
+    member, so no per-part file is written to disk and read back.
     
     Args:
-        input_path: Path to input PDF
+        input_path: Path to input PDF (or a shared PDFContext)
+        zip_path: Path of the archive to write
+        page_ranges: List of (start, end) tuples. If None, split into individual pages.
+    
+    Returns:
+        Size of the archive in bytes
+    """
+    try:
+        date_time = time.localtime()[:6]
+        
+        with zipfile.ZipFile(
+            zip_path, 'w', compression=zipfile.ZIP_STORED, allowZip64=True
+        ) as zipf:
+            for name, data in _iter_split_parts(input_path, page_ranges):
+                info = zipfile.ZipInfo(name, date_time=date_time)
+                info.compress_type = zipfile.ZIP_STORED
+                info.external_attr = 0o644 << 16
+                zipf.writestr(info, data)
+        
+        return get_file_size(zip_path)
+    except Exception as e:
+        raise PDFError(f'PDF split failed: {str(e)}')
+
+
+# Streams smaller than this aren't worth a decode/encode round trip
+COMPRESS_MIN_IMAGE_BYTES = 4096
+
+# Keep the original stream unless re-encoding saves at least 10%
+COMPRESS_MIN_SAVING = 0.9
+
+# At or above this quality, JPEGs that need no downsampling are kept as-is
+# (re-encoding would only add generation loss)
+JPEG_PASSTHROUGH_MIN_QUALITY = 80
+
+
+def _recompress_image(doc, xref: int, max_pixels: int, jpeg_quality: int) -> bool:
+    """
+    Re-encode a single image XObject as JPEG in place.
+    
+    The image is downsampled by powers of two while it exceeds max_pixels.
+    Stencil masks, images with soft masks and non-gray/RGB colorspaces
+    (e.g. CMYK) are left untouched, as are tiny images and any image the
+    re-encode would not shrink by at least 10%. Existing JPEGs within the
+    pixel budget are kept verbatim at high quality settings.
+    
+    Returns:
+        True if the image stream was replaced
+    """
+    import fitz  # PyMuPDF
+    
+    # Check the encoded size first so small images are never decoded
+    orig_size = len(doc.xref_stream_raw(xref) or b'')
+    if orig_size < COMPRESS_MIN_IMAGE_BYTES:
+        return False
+    
+    if jpeg_quality >= JPEG_PASSTHROUGH_MIN_QUALITY:
+        _, filter_name = doc.xref_get_key(xref, 'Filter')
+        _, width = doc.xref_get_key(xref, 'Width')
+        _, height = doc.xref_get_key(xref, 'Height')
+        if (
+            filter_name == '/DCTDecode'
+            and width.isdigit() and height.isdigit()
+            and int(width) * int(height) <= max_pixels
+        ):
+            return False
+    
+    pix = fitz.Pixmap(doc, xref)
+    if pix.alpha:
+        pix = fitz.Pixmap(pix, 0)
+    if pix.n not in (1, 3):
+        return False
+    
+    # Pixmap.shrink() halves both dimensions per step
+    steps = 0
+    while (pix.width >> steps) * (pix.height >> steps) > max_pixels and (pix.width >> steps) > 1:
+        steps += 1
+    if steps:
+        pix.shrink(steps)
+    
+    new_bytes = pix.tobytes("jpeg", jpg_quality=jpeg_quality)
+    if len(new_bytes) >= orig_size * COMPRESS_MIN_SAVING:
+        return False
+    
+    doc.update_stream(xref, new_bytes, compress=False)
+    doc.xref_set_key(xref, 'Filter', '/DCTDecode')
+    doc.xref_set_key(xref, 'DecodeParms', 'null')
+    doc.xref_set_key(xref, 'Decode', 'null')
+    doc.xref_set_key(xref, 'Width', str(pix.width))
+    doc.xref_set_key(xref, 'Height', str(pix.height))
+    doc.xref_set_key(xref, 'BitsPerComponent', '8')
+    doc.xref_set_key(xref, 'ColorSpace', '/DeviceGray' if pix.n == 1 else '/DeviceRGB')
+    return True
+
+
+# Ghostscript presets closest to compress_pdf's target DPIs (72/100/150)
+GHOSTSCRIPT_PDF_SETTINGS = {
+    'high': '/screen',
+    'medium': '/ebook',
+    'low': '/printer',
+}
+
+
+def _compress_pdf_ghostscript(input_path: str, output_path: str, quality: str) -> int:
+    """
+    Compress a PDF by re-distilling it with Ghostscript's pdfwrite device.
+    
+    Runs in a separate process, so the worker's interpreter is free while
+    it works. The input is passed by path: Ghostscript needs random access
+    and would spool a piped PDF to its own temp file first.
+    """
+    preset = GHOSTSCRIPT_PDF_SETTINGS.get(quality, GHOSTSCRIPT_PDF_SETTINGS['medium'])
+    cmd = [
+        get_ghostscript_path(),
+        '-q', '-dSAFER', '-dNOPAUSE', '-dBATCH',
+        '-sDEVICE=pdfwrite',
+        '-dCompatibilityLevel=1.5',
+        f'-dPDFSETTINGS={preset}',
+        f'-sOutputFile={output_path}',
+        input_path,
+    ]
+    _run_tool(cmd, 'Ghostscript')
+    
+    # Already-optimized inputs can come out larger; keep the original then
+    written = get_file_size(output_path)
+    if written >= get_file_size(input_path):
+        written = copy_file_kernel(input_path, output_path)
+    return written
+
+
+def compress_pdf(input_path: str, output_path: str, quality: str = 'medium') -> int:
+    """
+    Compress PDF file by recompressing embedded images using PyMuPDF.
+    
+    Only bitmap images are re-encoded; text and vector content are kept
+    as-is, so the output stays searchable and sharp.
+    
+    Args:
+        input_path: Path to input PDF (or a shared PDFContext)
         output_path: Path for output PDF
         quality: Compression level ('low', 'medium', 'high')
     
     Returns:
-        Output file path
+        Number of bytes written
     """
     try:
+        if (
+            not PYMUPDF_AVAILABLE
+            and not isinstance(input_path, PDFContext)
+            and _tool_available(get_ghostscript_path())
+        ):
+            return _compress_pdf_ghostscript(input_path, output_path, quality)
+        
         import fitz  # PyMuPDF
         
         # Quality settings - COMPRESSION level (not quality level)
         # 'low' compression = best quality, larger file
         # 'high' compression = lowest quality, smallest file
         quality_settings = {
-            'high': {'dpi': 72, 'jpeg_quality': 40},    # Maximum compression, smallest file
-            'medium': {'dpi': 100, 'jpeg_quality': 60}, # Balanced
-            'low': {'dpi': 150, 'jpeg_quality': 80}     # Minimum compression, best quality
+            'high': {'target_dpi': 72, 'jpeg_quality': 40},    # Maximum compression, smallest file
+            'medium': {'target_dpi': 100, 'jpeg_quality': 60}, # Balanced
+            'low': {'target_dpi': 150, 'jpeg_quality': 80}     # Minimum compression, best quality
         }
         
         settings = quality_settings.get(quality, quality_settings['medium'])
+        dpi = settings['target_dpi']
         
-        # Open source PDF
-        src_doc = fitz.open(input_path)
-        
-        # Create new PDF for output
-        dst_doc = fitz.open()
+        seen = set()
         
-        for page_num in range(len(src_doc)):
-            page = src_doc[page_num]
-            
-            # Get page as pixmap at reduced resolution
-            zoom = settings['dpi'] / 72.0
-            mat = fitz.Matrix(zoom, zoom)
-            pix = page.get_pixmap(matrix=mat, colorspace=fitz.csRGB, alpha=False)
-            
-            # Convert to JPEG bytes with compression
-            img_bytes = pix.tobytes("jpeg", jpg_quality=settings['jpeg_quality'])
-            
-            # Create new page with same dimensions as original
-            rect = page.rect
-            new_page = dst_doc.new_page(width=rect.width, height=rect.height)
+        with _open_pymupdf(input_path) as doc:
+            for page in doc:
+                # Pixel budget for an image covering the whole page at target DPI
+                max_pixels = int((page.rect.width / 72) * (page.rect.height / 72) * dpi * dpi)
+                
+                for xref, smask, _, _, bpc, *_ in doc.get_page_images(page.number, full=True):
+                    # Shared images are listed once per page that uses them
+                    if xref in seen:
+                        continue
+                    seen.add(xref)
+                    
+                    # JPEG can't carry transparency or 1-bit stencil masks
+                    if smask or bpc == 1:
+                        continue
+                    
+                    try:
+                        _recompress_image(doc, xref, max_pixels, settings['jpeg_quality'])
+                    except RuntimeError:
+                        # Undecodable image: keep the original stream
+                        continue
             
-            # Insert compressed image
-            new_page.insert_image(rect, stream=img_bytes)
-        
-        # Save with compression options
-        dst_doc.save(
-            output_path,
-            garbage=4,  # Maximum garbage collection
-            deflate=True,  # Compress streams
-            clean=True,  # Clean redundant data
-        )
-        
-        dst_doc.close()
-        src_doc.close()
+            # Save with compression options
+            written = _save_pymupdf(
+                doc,
+                output_path,
+                garbage=4,  # Maximum garbage collection
+                deflate_images=True,
+                deflate_fonts=True,
+            )
         
-        return output_path
+        return written
     except ImportError:
-        raise PDFError('PyMuPDF is required for compression. Install with: pip install PyMuPDF')
+        raise PDFError('PyMuPDF (or Ghostscript) is required for compression. Install with: pip install PyMuPDF')
     except Exception as e:
         raise PDFError(f'PDF compression failed: {str(e)}')
 
@@ -179,32 +569,52 @@ def rotate_pdf(
     output_path: str,
     rotation: int,
     pages: List[int] = None
-) -> str:
+) -> int:
     """
     Rotate PDF pages.
     
     Args:
-        input_path: Path to input PDF
+        input_path: Path to input PDF (or a shared PDFContext)
         output_path: Path for output PDF
         rotation: Rotation angle (90, 180, 270)
         pages: List of page numbers to rotate (1-indexed). None for all pages.
     
     Returns:
-        Output file path
+        Number of bytes written
     """
     try:
-        reader = PdfReader(input_path)
-        writer = PdfWriter()
+        # Set lookups keep per-page membership checks O(1) for long page lists
+        if pages is not None:
+            pages = set(pages)
         
-        for i, page in enumerate(reader.pages):
-            if pages is None or (i + 1) in pages:
-                page.rotate(rotation)
-            writer.add_page(page)
+        if PYMUPDF_AVAILABLE or isinstance(input_path, PDFContext):
+            with _open_pymupdf(input_path) as doc:
+                if pages is None:
+                    targets = range(doc.page_count)
+                else:
+                    targets = sorted(n - 1 for n in pages if 1 <= n <= doc.page_count)
+                
+                # A full turn leaves the document as-is
+                if rotation % 360:
+                    for page_num in targets:
+                        page = doc[page_num]
+                        # Rotation is relative to the page's current rotation
+                        page.set_rotation((page.rotation + rotation) % 360)
+                
+                # Only /Rotate entries changed: copy content streams verbatim
+                return _save_pymupdf(doc, output_path, garbage=1, clean=False)
         
-        with open(output_path, 'wb') as f:
-            writer.write(f)
+        from PyPDF2 import PdfWriter
         
-        return output_path
+        with _open_pypdf2(input_path) as reader:
+            writer = PdfWriter()
+            
+            for i, page in enumerate(reader.pages):
+                if pages is None or (i + 1) in pages:
+                    page.rotate(rotation)
+                writer.add_page(page)
+            
+            return _write_pypdf2(writer, output_path)
     except Exception as e:
         raise PDFError(f'PDF rotation failed: {str(e)}')
 
@@ -213,30 +623,37 @@ def delete_pages(
     input_path: str,
     output_path: str,
     pages_to_delete: List[int]
-) -> str:
+) -> int:
     """
     Delete specific pages from PDF.
     
     Args:
-        input_path: Path to input PDF
+        input_path: Path to input PDF (or a shared PDFContext)
         output_path: Path for output PDF
         pages_to_delete: List of page numbers to delete (1-indexed)
     
     Returns:
-        Output file path
+        Number of bytes written
     """
     try:
-        reader = PdfReader(input_path)
-        writer = PdfWriter()
+        # Set lookups keep per-page membership checks O(1) for long page lists
+        pages_to_delete = set(pages_to_delete)
         
-        for i, page in enumerate(reader.pages):
-            if (i + 1) not in pages_to_delete:
-                writer.add_page(page)
+        if PYMUPDF_AVAILABLE or isinstance(input_path, PDFContext):
+            with _open_pymupdf(input_path) as doc:
+                doc.select([i for i in range(len(doc)) if (i + 1) not in pages_to_delete])
+                return _save_pymupdf(doc, output_path)
         
-        with open(output_path, 'wb') as f:
-            writer.write(f)
+        from PyPDF2 import PdfWriter
         
-        return output_path
+        with _open_pypdf2(input_path) as reader:
+            writer = PdfWriter()
+            
+            for i, page in enumerate(reader.pages):
+                if (i + 1) not in pages_to_delete:
+                    writer.add_page(page)
+            
+            return _write_pypdf2(writer, output_path)
     except Exception as e:
         raise PDFError(f'PDF page deletion failed: {str(e)}')
 
@@ -245,30 +662,34 @@ def reorder_pages(
     input_path: str,
     output_path: str,
     new_order: List[int]
-) -> str:
+) -> int:
     """
     Reorder PDF pages.
     
     Args:
-        input_path: Path to input PDF
+        input_path: Path to input PDF (or a shared PDFContext)
         output_path: Path for output PDF
         new_order: List of page numbers in new order (1-indexed)
     
     Returns:
-        Output file path
+        Number of bytes written
     """
     try:
-        reader = PdfReader(input_path)
-        writer = PdfWriter()
-        
-        for page_num in new_order:
-            if 1 <= page_num <= len(reader.pages):
-                writer.add_page(reader.pages[page_num - 1])
+        if PYMUPDF_AVAILABLE or isinstance(input_path, PDFContext):
+            with _open_pymupdf(input_path) as doc:
+                doc.select([n - 1 for n in new_order if 1 <= n <= len(doc)])
+                return _save_pymupdf(doc, output_path)
         
-        with open(output_path, 'wb') as f:
-            writer.write(f)
+        from PyPDF2 import PdfWriter
         
-        return output_path
+        with _open_pypdf2(input_path) as reader:
+            writer = PdfWriter()
+            
+            for page_num in new_order:
+                if 1 <= page_num <= len(reader.pages):
+                    writer.add_page(reader.pages[page_num - 1])
+            
+            return _write_pypdf2(writer, output_path)
     except Exception as e:
         raise PDFError(f'PDF reorder failed: {str(e)}')
 
@@ -278,7 +699,7 @@ def protect_pdf(
     output_path: str,
     password: str,
     owner_password: str = None
-) -> str:
+) -> int:
     """
     Add password protection to PDF.
     
@@ -289,24 +710,23 @@ def protect_pdf(
         owner_password: Owner password (required to edit)
     
     Returns:
-        Output file path
+        Number of bytes written
     """
     try:
-        reader = PdfReader(input_path)
-        writer = PdfWriter()
-        
-        for page in reader.pages:
-            writer.add_page(page)
-        
-        writer.encrypt(
-            user_password=password,
-            owner_password=owner_password or password
-        )
+        from PyPDF2 import PdfWriter
         
-        with open(output_path, 'wb') as f:
-            writer.write(f)
-        
-        return output_path
+        with _open_pypdf2(input_path) as reader:
+            writer = PdfWriter()
+            
+            for page in reader.pages:
+                writer.add_page(page)
+            
+            writer.encrypt(
+                user_password=password,
+                owner_password=owner_password or password
+            )
+            
+            return _write_pypdf2(writer, output_path)
     except Exception as e:
         raise PDFError(f'PDF protection failed: {str(e)}')
 
@@ -315,7 +735,7 @@ def unlock_pdf(
     input_path: str,
     output_path: str,
     password: str
-) -> str:
+) -> int:
     """
     Remove password protection from PDF.
     
@@ -325,50 +745,145 @@ def unlock_pdf(
         password: Password to unlock
     
     Returns:
-        Output file path
+        Number of bytes written
     """
     try:
-        reader = PdfReader(input_path)
-        
-        if reader.is_encrypted:
-            reader.decrypt(password)
+        from PyPDF2 import PdfWriter
         
-        writer = PdfWriter()
-        
-        for page in reader.pages:
-            writer.add_page(page)
-        
-        with open(output_path, 'wb') as f:
-            writer.write(f)
-        
-        return output_path
+        with _open_pypdf2(input_path) as reader:
+            if reader.is_encrypted:
+                reader.decrypt(password)
+            
+            writer = PdfWriter()
+            
+            for page in reader.pages:
+                writer.add_page(page)
+            
+            return _write_pypdf2(writer, output_path)
     except Exception as e:
         raise PDFError(f'PDF unlock failed: {str(e)}')
 
 
+# Page sizes in points, matching reportlab.lib.pagesizes (A4 is 210x297 mm)
+PAGE_SIZES_PT = {
+    'A4': (595.2755905511812, 841.8897637795277),
+    'Letter': (612.0, 792.0),
+}
+
+
+def _images_to_pdf_vips(image_paths: List[str], output_path: str, page_size: str = 'A4') -> int:
+    """
+    Build an image PDF with libvips decoding and PyMuPDF page assembly.
+    
+    Each image is opened with sequential access so only a few scanlines
+    are resident at a time, encoded straight to JPEG and fitted, centered
+    and with its aspect ratio kept, onto a page_size page (the same layout
+    as the ReportLab path). Gray/RGB JPEG inputs are embedded byte-for-byte
+    without decoding.
+    """
+    import pyvips
+    import fitz  # PyMuPDF
+    
+    width, height = PAGE_SIZES_PT.get(page_size, PAGE_SIZES_PT['A4'])
+    
+    doc = fitz.open()
+    written = 0
+    try:
+        for path in image_paths:
+            # Header-only open: pixels aren't decoded until an operation needs them
+            img = pyvips.Image.new_from_file(path, access='sequential')
+            # insert_image keeps the aspect ratio and centers within the rect
+            page = doc.new_page(width=width, height=height)
+            
+            if (
+                img.get('vips-loader') == 'jpegload'
+                and img.interpretation in ('srgb', 'b-w')
+                and img.bands in (1, 3)
+            ):
+                # MuPDF stores JPEG streams as-is (DCTDecode)
+                page.insert_image(page.rect, filename=path)
+                continue
+            
+            if img.hasalpha():
+                img = img.flatten(background=[255, 255, 255])
+            if img.interpretation != 'srgb':
+                img = img.colourspace('srgb')
+            
+            page.insert_image(page.rect, stream=img.jpegsave_buffer(Q=90))
+        
+        if len(doc):
+            written = _save_pymupdf(doc, output_path)
+    finally:
+        doc.close()
+    
+    return written
+
+
+def _images_to_pdf_reportlab(image_paths: List[str], output_path: str, size) -> int:
+    """
+    Build an image PDF one page at a time with ReportLab.
+    
+    Each image is decoded, drawn and released before the next is opened.
+    Baseline JPEGs are passed by path so ReportLab embeds them without
+    re-encoding.
+    """
+    from PIL import Image
+    from reportlab.lib.utils import ImageReader
+    
+    width, height = size
+    
+    with open(output_path, 'wb') as f:
+        pdf = canvas.Canvas(f, pagesize=size)
+        for path in image_paths:
+            with Image.open(path) as img:
+                if img.format == 'JPEG' and img.mode in ('RGB', 'L'):
+                    source = path
+                else:
+                    source = ImageReader(img if img.mode in ('RGB', 'L') else img.convert('RGB'))
+                pdf.drawImage(source, 0, 0, width=width, height=height, preserveAspectRatio=True, anchor='c')
+            pdf.showPage()
+        pdf.save()
+        written = f.tell()
+    
+    return written
+
+
 def images_to_pdf(
     image_paths: List[str],
     output_path: str,
     page_size: str = 'A4'
-) -> str:
+) -> int:
     """
     Convert images to PDF.
     
+    Uses libvips when available (bounded memory per image), then
+    ReportLab (one decoded image at a time); both fit each image to
+    page_size. Pillow is the last resort.
+    
     Args:
         image_paths: List of image file paths
         output_path: Path for output PDF
         page_size: Page size ('A4' or 'Letter')
     
     Returns:
-        Output file path
+        Number of bytes written
     """
     try:
+        if PYVIPS_AVAILABLE and PYMUPDF_AVAILABLE:
+            return _images_to_pdf_vips(image_paths, output_path, page_size)
+        
         _ensure_reportlab()
         
         # Get page size (only if ReportLab available, otherwise PIL handles it differently)
         size = A4 if page_size == 'A4' else letter
         
+        if canvas is not None and image_paths:
+            return _images_to_pdf_reportlab(image_paths, output_path, size)
+        
+        from PIL import Image
+        
         images = []
+        written = 0
         for path in image_paths:
             img = Image.open(path)
             if img.mode == 'RGBA':
@@ -376,66 +891,247 @@ def images_to_pdf(
             images.append(img)
         
         if images:
-            images[0].save(
-                output_path,
-                save_all=True,
-                append_images=images[1:] if len(images) > 1 else [],
-                format='PDF'
-            )
+            with open(output_path, 'wb') as f:
+                images[0].save(
+                    f,
+                    save_all=True,
+                    append_images=images[1:] if len(images) > 1 else [],
+                    format='PDF'
+                )
+                written = f.tell()
         
-        return output_path
+        return written
     except Exception as e:
         raise PDFError(f'Image to PDF conversion failed: {str(e)}')
 
 
+# Below this page count the pool start-up cost outweighs the parallel gain
+PDF_PARALLEL_MIN_PAGES = 4
+
+# Rendering gains flatten out past a few processes; leave cores for other jobs
+PDF_MAX_WORKERS = 4
+
+
+# Pages above this many pixels are drawn in horizontal bands (like
+# `mutool draw -B`) so MuPDF's scratch buffers stay band-sized
+PDF_RENDER_BAND_MIN_PIXELS = 16_000_000
+PDF_RENDER_BAND_PIXELS = 2_000_000
+
+
+def _get_pixmap_banded(page, matrix, colorspace=None, alpha: bool = False):
+    """
+    Render a page like page.get_pixmap(), drawing large pages band by band.
+    
+    The output pixmap is still full size, but transparency groups, masks
+    and other intermediate buffers are only allocated per band instead of
+    per page, which bounds peak memory at high DPI.
+    """
+    import fitz  # PyMuPDF
+    
+    colorspace = colorspace or fitz.csRGB
+    irect = (page.rect * matrix).irect
+    if irect.width * irect.height <= PDF_RENDER_BAND_MIN_PIXELS:
+        return page.get_pixmap(matrix=matrix, colorspace=colorspace, alpha=alpha)
+    
+    target = fitz.Pixmap(colorspace, irect, alpha)
+    band_height = max(1, PDF_RENDER_BAND_PIXELS // irect.width)
+    scale_y = matrix.d
+    
+    for y in range(irect.y0, irect.y1, band_height):
+        # Clip is in page space; overlap by a pixel so rounding leaves no seams
+        clip = fitz.Rect(page.rect.x0, y / scale_y, page.rect.x1, min(y + band_height + 1, irect.y1) / scale_y)
+        band = page.get_pixmap(matrix=matrix, colorspace=colorspace, alpha=alpha, clip=clip)
+        target.copy(band, band.irect)
+    
+    return target
+
+
+def _write_bytes(path: str, data: bytes) -> None:
+    """Write a bytes payload to path."""
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def _render_pages(
+    input_path: str,
+    output_dir: str,
+    output_format: str,
+    dpi: int,
+    start: int,
+    stop: int
+) -> List[str]:
+    """
+    Render pages [start, stop) of a PDF to image files.
+    
+    Opens its own document handle so it can run inside a worker process.
+    Encoded pages are written by a background thread so disk I/O overlaps
+    rendering of the next page; all MuPDF calls stay on this thread.
+    """
+    import fitz  # PyMuPDF
+    from concurrent.futures import ThreadPoolExecutor
+    
+    doc = fitz.open(input_path)
+    writer = ThreadPoolExecutor(max_workers=1)
+    writes = []
+    output_paths = []
+    
+    # Calculate zoom factor from DPI (default PDF is 72 DPI)
+    zoom = dpi / 72
+    matrix = fitz.Matrix(zoom, zoom)
+    
+    # Loop invariants: format, extension and directory prefix
+    fmt = output_format.lower()
+    ext = 'jpg' if fmt in ['jpg', 'jpeg'] else fmt
+    prefix = os.path.join(output_dir, 'page_')
+    
+    try:
+        for i in range(start, stop):
+            page = doc[i]
+            output_path = f'{prefix}{i+1}.{ext}'
+            
+            if fmt == 'png':
+                # PNG: Encoded from pixmap
+                pix = _get_pixmap_banded(page, matrix)
+                data = pix.tobytes("png")
+            else:
+                # JPEG: Use RGB colorspace (no alpha), encoded by MuPDF directly
+                pix = _get_pixmap_banded(page, matrix, fitz.csRGB, alpha=False)
+                data = pix.tobytes("jpeg", jpg_quality=95)
+            
+            writes.append(writer.submit(_write_bytes, output_path, data))
+            output_paths.append(output_path)
+        
+        # Surface any write error
+        for write in writes:
+            write.result()
+    finally:
+        writer.shutdown()
+        doc.close()
+    
+    return output_paths
+
+
+def render_page_range(
+    input_path: str,
+    output_dir: str,
+    output_format: str = 'png',
+    dpi: int = 200,
+    start: int = 0,
+    stop: Optional[int] = None
+) -> List[str]:
+    """
+    Render a slice of a PDF's pages to images (0-indexed, stop exclusive).
+    
+    Used to fan a long document out across several Celery workers; output
+    names match pdf_to_images so the slices can be zipped together.
+    
+    Returns:
+        List of output image paths
+    """
+    try:
+        if stop is None:
+            stop = get_pdf_info(input_path)['num_pages']
+        return _render_pages(input_path, output_dir, output_format, dpi, start, stop)
+    except ImportError:
+        raise PDFError('PyMuPDF (or poppler-utils) is required for PDF to image conversion. Install with: pip install PyMuPDF')
+    except Exception as e:
+        raise PDFError(f'PDF to image conversion failed: {str(e)}')
+
+
+# pdftoppm names pages <prefix>-<zero-padded number>.<ext>
+_PDFTOPPM_NAME_RE = re.compile(r'^ppm-(\d+)\.(png|jpg)$')
+
+
+def _pdf_to_images_pdftoppm(input_path: str, output_dir: str, output_format: str, dpi: int) -> List[str]:
+    """
+    Rasterize every page with poppler's pdftoppm in a single subprocess.
+    
+    Pages are renamed to the page_<n>.<ext> scheme used by _render_pages.
+    """
+    fmt = output_format.lower()
+    ext = 'jpg' if fmt in ['jpg', 'jpeg'] else 'png'
+    device = ['-jpeg', '-jpegopt', 'quality=95'] if ext == 'jpg' else ['-png']
+    
+    cmd = [get_pdftoppm_path(), '-r', str(dpi), *device, input_path, os.path.join(output_dir, 'ppm')]
+    _run_tool(cmd, 'pdftoppm')
+    
+    numbered = []
+    for name in os.listdir(output_dir):
+        m = _PDFTOPPM_NAME_RE.match(name)
+        if m:
+            numbered.append((int(m.group(1)), name))
+    numbered.sort()
+    
+    output_paths = []
+    prefix = os.path.join(output_dir, '')
+    for number, name in numbered:
+        output_path = f'{prefix}page_{number}.{ext}'
+        os.replace(prefix + name, output_path)
+        output_paths.append(output_path)
+    return output_paths
+
+
 def pdf_to_images(
     input_path: str,
     output_dir: str,
     output_format: str = 'png',
-    dpi: int = 200
+    dpi: int = 200,
+    num_workers: Optional[int] = None
 ) -> List[str]:
     """
     Convert PDF pages to images using PyMuPDF.
     
+    Multi-page documents are split into contiguous page ranges that are
+    rasterized in parallel across CPU cores.
+    
     Args:
         input_path: Path to input PDF
         output_dir: Directory for output images
         output_format: Output image format
         dpi: Resolution in DPI
+        num_workers: Render processes to use (default: min(CPU count, 4))
     
     Returns:
         List of output image paths
     """
     try:
-        import fitz  # PyMuPDF
+        if not PYMUPDF_AVAILABLE and _tool_available(get_pdftoppm_path()):
+            return _pdf_to_images_pdftoppm(input_path, output_dir, output_format, dpi)
         
-        doc = fitz.open(input_path)
-        output_paths = []
+        import fitz  # PyMuPDF - imported up front so a missing install gets the hint below
+        import math
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
         
-        # Calculate zoom factor from DPI (default PDF is 72 DPI)
-        zoom = dpi / 72
-        matrix = fitz.Matrix(zoom, zoom)
+        # Memoized per file version: the task's own page-count lookup (and
+        # retries of the same job) already parsed this document's xref
+        page_count = get_pdf_info(input_path)['num_pages']
         
-        for i, page in enumerate(doc):
-            # Determine file extension
-            ext = 'jpg' if output_format.lower() in ['jpg', 'jpeg'] else output_format.lower()
-            output_path = os.path.join(output_dir, f'page_{i+1}.{ext}')
-            
-            if output_format.lower() == 'png':
-                # PNG: Direct save from pixmap
-                pix = page.get_pixmap(matrix=matrix)
-                pix.save(output_path)
-            else:
-                # JPEG: Use RGB colorspace (no alpha), convert via PIL
-                pix = page.get_pixmap(matrix=matrix, colorspace=fitz.csRGB, alpha=False)
-                
-                # Convert to PIL Image
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                img.save(output_path, "JPEG", quality=95)
-            
-            output_paths.append(output_path)
+        if num_workers is None:
+            num_workers = min(os.cpu_count() or 1, PDF_MAX_WORKERS)
+        workers = min(num_workers, page_count)
+        
+        # Daemonic processes (e.g. some worker pools) cannot fork children
+        if (
+            workers < 2
+            or page_count < PDF_PARALLEL_MIN_PAGES
+            or multiprocessing.current_process().daemon
+        ):
+            return _render_pages(input_path, output_dir, output_format, dpi, 0, page_count)
+        
+        chunk = math.ceil(page_count / workers)
+        ranges = [(start, min(start + chunk, page_count)) for start in range(0, page_count, chunk)]
+        
+        output_paths = []
+        with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+            futures = [
+                pool.submit(_render_pages, input_path, output_dir, output_format, dpi, start, stop)
+                for start, stop in ranges
+            ]
+            # Ranges are submitted in page order, so results stay sorted
+            for future in futures:
+                output_paths.extend(future.result())
         
-        doc.close()
         return output_paths
         
     except ImportError:
@@ -448,6 +1144,9 @@ def get_pdf_info(file_path: str) -> Dict[str, Any]:
     """
     Get PDF file information.
     
+    Results are memoized per file version (inode, mtime, size), so
+    repeated lookups of an unchanged file don't re-open the PDF.
+    
     Args:
         file_path: Path to PDF file
     
@@ -455,17 +1154,92 @@ def get_pdf_info(file_path: str) -> Dict[str, Any]:
         Dictionary with PDF metadata
     """
     try:
-        reader = PdfReader(file_path)
-        
-        return {
-            'num_pages': len(reader.pages),
-            'is_encrypted': reader.is_encrypted,
-            'metadata': {
-                'title': reader.metadata.title if reader.metadata else None,
-                'author': reader.metadata.author if reader.metadata else None,
-                'subject': reader.metadata.subject if reader.metadata else None,
-                'creator': reader.metadata.creator if reader.metadata else None,
-            }
-        }
+        st = os.stat(file_path)
+    except OSError as e:
+        raise PDFError(f'Failed to get PDF info: {str(e)}')
+    
+    info = _read_pdf_info(file_path, st.st_ino, st.st_mtime_ns, st.st_size)
+    # Hand out copies so callers can't mutate the cached entry
+    return {**info, 'metadata': dict(info['metadata'])}
+
+
+def get_pdf_info_from_upload(uploaded_file) -> Dict[str, Any]:
+    """
+    Get PDF file information straight from an uploaded file.
+    
+    Uploads Django spooled to disk are read from their temp file; in-memory
+    uploads are parsed from memory, so nothing is staged to disk.
+    
+    Args:
+        uploaded_file: Django UploadedFile
+    
+    Returns:
+        Dictionary with PDF metadata
+    """
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        return get_pdf_info(uploaded_file.temporary_file_path())
+    
+    source = getattr(uploaded_file, 'file', uploaded_file)
+    if hasattr(source, 'getvalue'):
+        data = source.getvalue()
+    else:
+        uploaded_file.seek(0)
+        data = uploaded_file.read()
+    
+    try:
+        if PYMUPDF_AVAILABLE:
+            import fitz  # PyMuPDF
+            
+            with fitz.open(stream=data, filetype='pdf') as doc:
+                return _pymupdf_info(doc)
+        
+        from PyPDF2 import PdfReader
+        
+        return _pypdf2_info(PdfReader(io.BytesIO(data)))
     except Exception as e:
         raise PDFError(f'Failed to get PDF info: {str(e)}')
+
+
+@lru_cache(maxsize=1024)
+def _read_pdf_info(file_path: str, ino: int, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Read PDF info; the stat fields only serve as the cache key."""
+    try:
+        if PYMUPDF_AVAILABLE:
+            import fitz  # PyMuPDF
+            
+            with fitz.open(file_path) as doc:
+                return _pymupdf_info(doc)
+        
+        with _open_pypdf2(file_path) as reader:
+            return _pypdf2_info(reader)
+    except Exception as e:
+        raise PDFError(f'Failed to get PDF info: {str(e)}')
+
+
+def _pymupdf_info(doc) -> Dict[str, Any]:
+    """Info dict for an open fitz.Document."""
+    # Page count and Info dict come straight from MuPDF's xref/trailer
+    metadata = doc.metadata or {}
+    return {
+        'num_pages': doc.page_count,
+        'is_encrypted': doc.is_encrypted,
+        'metadata': {
+            # MuPDF reports missing fields as ''
+            key: metadata.get(key) or None
+            for key in ('title', 'author', 'subject', 'creator')
+        }
+    }
+
+
+def _pypdf2_info(reader) -> Dict[str, Any]:
+    """Info dict for a PyPDF2 PdfReader."""
+    return {
+        'num_pages': len(reader.pages),
+        'is_encrypted': reader.is_encrypted,
+        'metadata': {
+            'title': reader.metadata.title if reader.metadata else None,
+            'author': reader.metadata.author if reader.metadata else None,
+            'subject': reader.metadata.subject if reader.metadata else None,
+            'creator': reader.metadata.creator if reader.metadata else None,
+        }
+    }
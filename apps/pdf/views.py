@@ -4,13 +4,17 @@ PDF conversion and manipulation API endpoints.
 """
 
 import os
+import re
+import shutil
+import tempfile
 import time
-import zipfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 from django.conf import settings
 from django.core.files import File
-from django.http import FileResponse
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
@@ -19,18 +23,24 @@ from rest_framework import serializers
 
 from apps.core.models import ConversionJob, ConvertedFile, ToolType, OperationType
 from apps.core.views import BaseConversionView
+from apps.core.celery_compat import send_task_nowait, async_conversion_enabled
 from apps.core.serializers import ConversionJobSerializer
 from apps.core.utils import (
     get_file_extension,
+    generate_clean_output_filename,
     generate_output_filename,
     get_file_size,
     get_client_ip,
     get_user_agent,
     log_tool_usage,
+    save_upload,
+    upload_input_path,
+    open_scratch_file,
+    file_download_response,
 )
 from .utils import (
     merge_pdfs,
-    split_pdf,
+    split_pdf_to_zip,
     compress_pdf,
     rotate_pdf,
     delete_pages,
@@ -39,7 +49,8 @@ from .utils import (
     unlock_pdf,
     images_to_pdf,
     pdf_to_images,
-    get_pdf_info,
+    get_pdf_info_from_upload,
+    zip_outputs,
     PDFError,
 )
 from .tasks import (
@@ -55,6 +66,91 @@ from .tasks import (
 )
 
 
+# Working directories, created once per process instead of per request
+TEMP_DIR = settings.UPLOAD_DIR / 'temp'
+MERGE_TEMP_DIR = TEMP_DIR / 'merge'
+SPLIT_TEMP_DIR = TEMP_DIR / 'split'
+IMG2PDF_TEMP_DIR = TEMP_DIR / 'img2pdf'
+PDF_OUTPUT_DIR = settings.OUTPUT_DIR / 'pdf'
+
+for _dir in (MERGE_TEMP_DIR, SPLIT_TEMP_DIR, IMG2PDF_TEMP_DIR, PDF_OUTPUT_DIR):
+    _dir.mkdir(parents=True, exist_ok=True)
+
+
+def scratch_output_path(filename: str) -> str:
+    """
+    Unique path under PDF_OUTPUT_DIR for a sync-mode output.
+    
+    Concurrent requests for same-named uploads must not write to (or
+    delete) each other's file; the download keeps the clean filename.
+    """
+    return str(PDF_OUTPUT_DIR / f'{uuid.uuid4().hex[:8]}_{filename}')
+
+
+# ============================================
+# PAGE LIST PARSING
+# ============================================
+
+# One "N" or "N-M" item; the whole-string pattern validates the list
+_RANGE_RE = re.compile(r'(\d+)\s*(?:-\s*(\d+))?')
+_RANGE_LIST_RE = re.compile(r'\s*\d+\s*(?:-\s*\d+\s*)?(?:,\s*\d+\s*(?:-\s*\d+\s*)?)*')
+
+
+@lru_cache(maxsize=1024)
+def parse_page_ranges(value: str) -> tuple:
+    """
+    Parse a page list like "1-3,5,7-9" into (start, end) tuples.
+    
+    Results are memoized on the raw string (clients tend to resend the
+    same few lists), so the result is an immutable tuple.
+    
+    Raises:
+        ValueError: If the string is not a comma-separated list of pages/ranges
+    """
+    if not _RANGE_LIST_RE.fullmatch(value):
+        raise ValueError(f'Invalid page list: {value!r}')
+    return tuple(
+        (int(m.group(1)), int(m.group(2) or m.group(1)))
+        for m in _RANGE_RE.finditer(value)
+    )
+
+
+# Parallel copies for multi-file uploads (merge, images-to-PDF)
+UPLOAD_COPY_WORKERS = 8
+
+
+def stage_uploads(files, temp_dir, in_place: bool) -> tuple:
+    """
+    Get a filesystem path for each uploaded file.
+    
+    With in_place, uploads Django already spooled to disk are used where
+    they are instead of being copied again; only in-memory uploads are
+    written to temp_dir. Queued jobs need in_place=False because Django
+    deletes its temp files when the request ends. Copies run on a small
+    thread pool since each one is an independent, I/O-bound write.
+    
+    Returns:
+        (input_paths, owned_paths) - owned_paths are the files written
+        here, which the caller must clean up
+    """
+    input_paths = [None] * len(files)
+    copies = []
+    for i, f in enumerate(files):
+        if in_place and hasattr(f, 'temporary_file_path'):
+            input_paths[i] = f.temporary_file_path()
+        else:
+            copies.append((i, f, str(temp_dir / f'{i}_{f.name}')))
+    
+    if len(copies) > 1:
+        with ThreadPoolExecutor(max_workers=min(UPLOAD_COPY_WORKERS, len(copies))) as pool:
+            owned_paths = list(pool.map(lambda copy: save_upload(copy[1], copy[2]), copies))
+    else:
+        owned_paths = [save_upload(f, path) for _, f, path in copies]
+    
+    for (i, _, _), path in zip(copies, owned_paths):
+        input_paths[i] = path
+    return input_paths, owned_paths
+
 
 # ============================================
 # SERIALIZERS
@@ -164,14 +260,11 @@ class PDFMergeView(BaseConversionView):
     tool_type = ToolType.PDF
     operation_type = OperationType.MERGE
     tool_name = 'pdf_merge'
+    input_kind = 'pdf'
     
     def post(self, request):
         """Merge PDF files."""
         
-        rate_limit_response = self.check_rate_limit(request)
-        if rate_limit_response:
-            return rate_limit_response
-        
         serializer = PDFMergeSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(
@@ -194,23 +287,17 @@ class PDFMergeView(BaseConversionView):
             return duplicate_response
         
         # Save files temporarily
-        temp_dir = settings.UPLOAD_DIR / 'temp' / 'merge'
-        temp_dir.mkdir(parents=True, exist_ok=True)
+        temp_dir = MERGE_TEMP_DIR
         
         # Define output path and filename BEFORE try block to ensure scope
         output_filename = f'merged_{int(time.time())}.pdf'
-        output_dir = settings.OUTPUT_DIR / 'pdf'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = str(output_dir / output_filename)
+        output_path = scratch_output_path(output_filename)
         
-        input_paths = []
+        owned_paths = []
         try:
-            for i, f in enumerate(files):
-                temp_path = str(temp_dir / f'{i}_{f.name}')
-                with open(temp_path, 'wb') as out:
-                    for chunk in f.chunks():
-                        out.write(chunk)
-                input_paths.append(temp_path)
+            # Sync merges read Django's spooled uploads in place
+            use_async = async_conversion_enabled()
+            input_paths, owned_paths = stage_uploads(files, temp_dir, in_place=not use_async)
             
             # Create job for tracking
             job = self.create_job(
@@ -222,11 +309,14 @@ class PDFMergeView(BaseConversionView):
             )
             
             # Async mode dispatch
-            if settings.USE_ASYNC_CONVERSION:
-                merge_pdfs_task.delay(job.id, {'input_paths': input_paths, 'output_filename': output_filename})
+            if use_async:
+                send_task_nowait(merge_pdfs_task, args=[str(job.id), {'input_paths': input_paths, 'output_filename': output_filename, 'cleanup_inputs': True}])
+                self.hand_off_slot(request)
+                # The task owns (and deletes) the uploaded inputs from here on
+                owned_paths = []
                 self.log_usage(request, success=True, job=job)
                 response_serializer = ConversionJobSerializer(job, context={'request': request})
-                return Response(response_serializer.data, status=status.HTTP_200_OK)
+                return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
             
             # Sync mode (Existing logic)
             job.mark_processing()
@@ -235,8 +325,6 @@ class PDFMergeView(BaseConversionView):
             merge_pdfs(input_paths, output_path)
             
             # Save to job and create ConvertedFile
-            from apps.core.utils import generate_clean_output_filename
-            
             with open(output_path, 'rb') as f:
                 job.output_file.save(output_filename, File(f), save=False)
             
@@ -272,7 +360,7 @@ class PDFMergeView(BaseConversionView):
         
         finally:
             # Clean up temp files
-            for path in input_paths:
+            for path in owned_paths:
                 if os.path.exists(path):
                     os.remove(path)
             # Clean up output temp file
@@ -286,14 +374,11 @@ class PDFSplitView(BaseConversionView):
     tool_type = ToolType.PDF
     operation_type = OperationType.SPLIT
     tool_name = 'pdf_split'
+    input_kind = 'pdf'
     
     def post(self, request):
         """Split PDF file."""
         
-        rate_limit_response = self.check_rate_limit(request)
-        if rate_limit_response:
-            return rate_limit_response
-        
         serializer = PDFSplitSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(
@@ -320,14 +405,7 @@ class PDFSplitView(BaseConversionView):
         page_ranges = None
         if page_ranges_str:
             try:
-                page_ranges = []
-                for part in page_ranges_str.split(','):
-                    if '-' in part:
-                        start, end = part.split('-')
-                        page_ranges.append((int(start.strip()), int(end.strip())))
-                    else:
-                        page_num = int(part.strip())
-                        page_ranges.append((page_num, page_num))
+                page_ranges = parse_page_ranges(page_ranges_str)
             except ValueError:
                 return Response(
                     {'error': 'Invalid page ranges format'},
@@ -335,18 +413,10 @@ class PDFSplitView(BaseConversionView):
                 )
         
         # Save file temporarily
-        temp_dir = settings.UPLOAD_DIR / 'temp' / 'split'
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        temp_path = str(temp_dir / uploaded_file.name)
-        
-        output_dir = settings.OUTPUT_DIR / 'pdf' / f'split_{int(time.time())}'
-        output_dir.mkdir(parents=True, exist_ok=True)
+        temp_dir = SPLIT_TEMP_DIR
+        temp_path, release_temp = open_scratch_file(temp_dir)
         
         try:
-            with open(temp_path, 'wb') as f:
-                for chunk in uploaded_file.chunks():
-                    f.write(chunk)
-            
             # Create job for tracking
             job = self.create_job(
                 request=request,
@@ -357,36 +427,29 @@ class PDFSplitView(BaseConversionView):
             )
             
             # Async mode dispatch
-            if settings.USE_ASYNC_CONVERSION:
-                split_pdf_task.delay(job.id, page_ranges)
+            if async_conversion_enabled():
+                send_task_nowait(split_pdf_task, args=[str(job.id), page_ranges])
+                self.hand_off_slot(request)
                 self.log_usage(request, success=True, job=job)
                 response_serializer = ConversionJobSerializer(job, context={'request': request})
-                return Response(response_serializer.data, status=status.HTTP_200_OK)
+                return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
             
             # Sync mode
             job.mark_processing()
+            input_path = upload_input_path(job, uploaded_file, temp_path)
             
-            # Split PDF
-            output_paths = split_pdf(temp_path, str(output_dir), page_ranges)
-            
-            # Create ZIP file
+            # Split PDF straight into a ZIP file (no per-part files)
             zip_filename = f'split_{int(time.time())}.zip'
-            zip_path = str(settings.OUTPUT_DIR / 'pdf' / zip_filename)
+            zip_path = scratch_output_path(zip_filename)
             
-            with zipfile.ZipFile(zip_path, 'w') as zipf:
-                for path in output_paths:
-                    zipf.write(path, os.path.basename(path))
+            split_pdf_to_zip(input_path, zip_path, page_ranges)
             
             # Log usage
             processing_time_ms = int((time.time() - start_time) * 1000)
             self.log_usage(request, success=True, job=job, processing_time_ms=processing_time_ms)
             
             # Return ZIP file
-            response = FileResponse(
-                open(zip_path, 'rb'),
-                as_attachment=True,
-                filename=zip_filename
-            )
+            response = file_download_response(zip_path, zip_filename, delete_after=True)
             return response
         
         except PDFError as e:
@@ -397,8 +460,7 @@ class PDFSplitView(BaseConversionView):
         
         finally:
             # Clean up
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            release_temp()
 
 
 class PDFCompressView(BaseConversionView):
@@ -407,14 +469,11 @@ class PDFCompressView(BaseConversionView):
     tool_type = ToolType.PDF
     operation_type = OperationType.COMPRESS
     tool_name = 'pdf_compress'
+    input_kind = 'pdf'
     
     def post(self, request):
         """Compress PDF file."""
         
-        rate_limit_response = self.check_rate_limit(request)
-        if rate_limit_response:
-            return rate_limit_response
-        
         serializer = PDFCompressSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(
@@ -438,14 +497,11 @@ class PDFCompressView(BaseConversionView):
         quality = serializer.validated_data['quality']
         
         # Save file temporarily
-        temp_dir = settings.UPLOAD_DIR / 'temp'
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        temp_path = str(temp_dir / uploaded_file.name)
+        temp_dir = TEMP_DIR
+        temp_path, release_temp = open_scratch_file(temp_dir)
         
         output_filename = f'compressed_{uploaded_file.name}'
-        output_dir = settings.OUTPUT_DIR / 'pdf'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = str(output_dir / output_filename)
+        output_path = scratch_output_path(output_filename)
         
         try:
             # Create job for tracking
@@ -458,28 +514,26 @@ class PDFCompressView(BaseConversionView):
             )
             
             # Async mode dispatch
-            if settings.USE_ASYNC_CONVERSION:
-                compress_pdf_task.delay(job.id, quality)
+            if async_conversion_enabled():
+                send_task_nowait(compress_pdf_task, args=[str(job.id), quality])
+                self.hand_off_slot(request)
                 self.log_usage(request, success=True, job=job)
                 response_serializer = ConversionJobSerializer(job, context={'request': request})
-                return Response(response_serializer.data, status=status.HTTP_200_OK)
+                return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
             
             # Sync mode
             job.mark_processing()
+            input_path = upload_input_path(job, uploaded_file, temp_path)
             
             # Compress PDF
-            compress_pdf(temp_path, output_path, quality)
+            compress_pdf(input_path, output_path, quality)
             
             # Log usage
             processing_time_ms = int((time.time() - start_time) * 1000)
             self.log_usage(request, success=True, job=job, processing_time_ms=processing_time_ms)
             
             # Return file
-            response = FileResponse(
-                open(output_path, 'rb'),
-                as_attachment=True,
-                filename=output_filename
-            )
+            response = file_download_response(output_path, output_filename, delete_after=True)
             return response
         
         except PDFError as e:
@@ -489,8 +543,7 @@ class PDFCompressView(BaseConversionView):
             )
         
         finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            release_temp()
 
 
 class PDFRotateView(BaseConversionView):
@@ -499,14 +552,11 @@ class PDFRotateView(BaseConversionView):
     tool_type = ToolType.PDF
     operation_type = OperationType.ROTATE
     tool_name = 'pdf_rotate'
+    input_kind = 'pdf'
     
     def post(self, request):
         """Rotate PDF pages."""
         
-        rate_limit_response = self.check_rate_limit(request)
-        if rate_limit_response:
-            return rate_limit_response
-        
         serializer = PDFRotateSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(
@@ -534,7 +584,11 @@ class PDFRotateView(BaseConversionView):
         pages = None
         if pages_str:
             try:
-                pages = [int(p.strip()) for p in pages_str.split(',')]
+                pages = [
+                    page
+                    for start, end in parse_page_ranges(pages_str)
+                    for page in range(start, end + 1)
+                ]
             except ValueError:
                 return Response(
                     {'error': 'Invalid pages format'},
@@ -542,14 +596,11 @@ class PDFRotateView(BaseConversionView):
                 )
         
         # Save file temporarily
-        temp_dir = settings.UPLOAD_DIR / 'temp'
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        temp_path = str(temp_dir / uploaded_file.name)
+        temp_dir = TEMP_DIR
+        temp_path, release_temp = open_scratch_file(temp_dir)
         
         output_filename = f'rotated_{uploaded_file.name}'
-        output_dir = settings.OUTPUT_DIR / 'pdf'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = str(output_dir / output_filename)
+        output_path = scratch_output_path(output_filename)
         
         try:
             # Create job for tracking
@@ -562,27 +613,25 @@ class PDFRotateView(BaseConversionView):
             )
             
             # Async mode dispatch
-            if settings.USE_ASYNC_CONVERSION:
-                rotate_pdf_task.delay(job.id, rotation, pages)
+            if async_conversion_enabled():
+                send_task_nowait(rotate_pdf_task, args=[str(job.id), rotation, pages])
+                self.hand_off_slot(request)
                 self.log_usage(request, success=True, job=job)
                 response_serializer = ConversionJobSerializer(job, context={'request': request})
-                return Response(response_serializer.data, status=status.HTTP_200_OK)
+                return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
             
             # Sync mode
             job.mark_processing()
+            input_path = upload_input_path(job, uploaded_file, temp_path)
             
             # Rotate PDF
-            rotate_pdf(temp_path, output_path, rotation, pages)
+            rotate_pdf(input_path, output_path, rotation, pages)
             
             # Log usage
             processing_time_ms = int((time.time() - start_time) * 1000)
             self.log_usage(request, success=True, job=job, processing_time_ms=processing_time_ms)
             
-            response = FileResponse(
-                open(output_path, 'rb'),
-                as_attachment=True,
-                filename=output_filename
-            )
+            response = file_download_response(output_path, output_filename, delete_after=True)
             return response
         
         except PDFError as e:
@@ -592,8 +641,7 @@ class PDFRotateView(BaseConversionView):
             )
         
         finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            release_temp()
 
 
 class PDFProtectView(BaseConversionView):
@@ -602,14 +650,11 @@ class PDFProtectView(BaseConversionView):
     tool_type = ToolType.PDF
     operation_type = OperationType.PROTECT
     tool_name = 'pdf_protect'
+    input_kind = 'pdf'
     
     def post(self, request):
         """Protect PDF with password."""
         
-        rate_limit_response = self.check_rate_limit(request)
-        if rate_limit_response:
-            return rate_limit_response
-        
         serializer = PDFProtectSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(
@@ -634,14 +679,11 @@ class PDFProtectView(BaseConversionView):
         owner_password = serializer.validated_data.get('owner_password')
         
         # Save file temporarily
-        temp_dir = settings.UPLOAD_DIR / 'temp'
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        temp_path = str(temp_dir / uploaded_file.name)
+        temp_dir = TEMP_DIR
+        temp_path, release_temp = open_scratch_file(temp_dir)
         
         output_filename = f'protected_{uploaded_file.name}'
-        output_dir = settings.OUTPUT_DIR / 'pdf'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = str(output_dir / output_filename)
+        output_path = scratch_output_path(output_filename)
         
         try:
             # Create job for tracking
@@ -654,27 +696,25 @@ class PDFProtectView(BaseConversionView):
             )
             
             # Async mode dispatch
-            if settings.USE_ASYNC_CONVERSION:
-                protect_pdf_task.delay(job.id, password, owner_password)
+            if async_conversion_enabled():
+                send_task_nowait(protect_pdf_task, args=[str(job.id), password, owner_password])
+                self.hand_off_slot(request)
                 self.log_usage(request, success=True, job=job)
                 response_serializer = ConversionJobSerializer(job, context={'request': request})
-                return Response(response_serializer.data, status=status.HTTP_200_OK)
+                return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
             
             # Sync mode
             job.mark_processing()
+            input_path = upload_input_path(job, uploaded_file, temp_path)
             
             # Protect PDF
-            protect_pdf(temp_path, output_path, password, owner_password)
+            protect_pdf(input_path, output_path, password, owner_password)
             
             # Log usage
             processing_time_ms = int((time.time() - start_time) * 1000)
             self.log_usage(request, success=True, job=job, processing_time_ms=processing_time_ms)
             
-            response = FileResponse(
-                open(output_path, 'rb'),
-                as_attachment=True,
-                filename=output_filename
-            )
+            response = file_download_response(output_path, output_filename, delete_after=True)
             return response
         
         except PDFError as e:
@@ -684,8 +724,7 @@ class PDFProtectView(BaseConversionView):
             )
         
         finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            release_temp()
 
 
 class PDFUnlockView(BaseConversionView):
@@ -694,14 +733,11 @@ class PDFUnlockView(BaseConversionView):
     tool_type = ToolType.PDF
     operation_type = OperationType.UNLOCK
     tool_name = 'pdf_unlock'
+    input_kind = 'pdf'
     
     def post(self, request):
         """Unlock protected PDF."""
         
-        rate_limit_response = self.check_rate_limit(request)
-        if rate_limit_response:
-            return rate_limit_response
-        
         serializer = PDFUnlockSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(
@@ -725,14 +761,11 @@ class PDFUnlockView(BaseConversionView):
         password = serializer.validated_data['password']
         
         # Save file temporarily
-        temp_dir = settings.UPLOAD_DIR / 'temp'
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        temp_path = str(temp_dir / uploaded_file.name)
+        temp_dir = TEMP_DIR
+        temp_path, release_temp = open_scratch_file(temp_dir)
         
         output_filename = f'unlocked_{uploaded_file.name}'
-        output_dir = settings.OUTPUT_DIR / 'pdf'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = str(output_dir / output_filename)
+        output_path = scratch_output_path(output_filename)
         
         try:
             # Create job for tracking
@@ -745,27 +778,25 @@ class PDFUnlockView(BaseConversionView):
             )
             
             # Async mode dispatch
-            if settings.USE_ASYNC_CONVERSION:
-                unlock_pdf_task.delay(job.id, password)
+            if async_conversion_enabled():
+                send_task_nowait(unlock_pdf_task, args=[str(job.id), password])
+                self.hand_off_slot(request)
                 self.log_usage(request, success=True, job=job)
                 response_serializer = ConversionJobSerializer(job, context={'request': request})
-                return Response(response_serializer.data, status=status.HTTP_200_OK)
+                return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
             
             # Sync mode
             job.mark_processing()
+            input_path = upload_input_path(job, uploaded_file, temp_path)
             
             # Unlock PDF
-            unlock_pdf(temp_path, output_path, password)
+            unlock_pdf(input_path, output_path, password)
             
             # Log usage
             processing_time_ms = int((time.time() - start_time) * 1000)
             self.log_usage(request, success=True, job=job, processing_time_ms=processing_time_ms)
             
-            response = FileResponse(
-                open(output_path, 'rb'),
-                as_attachment=True,
-                filename=output_filename
-            )
+            response = file_download_response(output_path, output_filename, delete_after=True)
             return response
         
         except PDFError as e:
@@ -775,8 +806,7 @@ class PDFUnlockView(BaseConversionView):
             )
         
         finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            release_temp()
 
 
 class ImagesToPDFView(BaseConversionView):
@@ -785,14 +815,11 @@ class ImagesToPDFView(BaseConversionView):
     tool_type = ToolType.PDF
     operation_type = OperationType.CONVERT
     tool_name = 'images_to_pdf'
+    input_kind = 'image'
     
     def post(self, request):
         """Convert images to PDF."""
         
-        rate_limit_response = self.check_rate_limit(request)
-        if rate_limit_response:
-            return rate_limit_response
-        
         serializer = ImagesToPDFSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(
@@ -817,23 +844,17 @@ class ImagesToPDFView(BaseConversionView):
         page_size = serializer.validated_data['page_size']
         
         # Save files temporarily
-        temp_dir = settings.UPLOAD_DIR / 'temp' / 'img2pdf'
-        temp_dir.mkdir(parents=True, exist_ok=True)
+        temp_dir = IMG2PDF_TEMP_DIR
         
-        input_paths = []
+        owned_paths = []
         try:
-            for i, f in enumerate(files):
-                temp_path = str(temp_dir / f'{i}_{f.name}')
-                with open(temp_path, 'wb') as out:
-                    for chunk in f.chunks():
-                        out.write(chunk)
-                input_paths.append(temp_path)
+            # Sync conversions read Django's spooled uploads in place
+            use_async = async_conversion_enabled()
+            input_paths, owned_paths = stage_uploads(files, temp_dir, in_place=not use_async)
             
             # Generate output
             output_filename = f'images_{int(time.time())}.pdf'
-            output_dir = settings.OUTPUT_DIR / 'pdf'
-            output_dir.mkdir(parents=True, exist_ok=True)
-            output_path = str(output_dir / output_filename)
+            output_path = scratch_output_path(output_filename)
             
             # Create job for tracking
             job = self.create_job(
@@ -845,11 +866,14 @@ class ImagesToPDFView(BaseConversionView):
             )
             
             # Async mode dispatch
-            if settings.USE_ASYNC_CONVERSION:
-                images_to_pdf_task.delay(job.id, {'input_paths': input_paths, 'page_size': page_size})
+            if use_async:
+                send_task_nowait(images_to_pdf_task, args=[str(job.id), {'input_paths': input_paths, 'page_size': page_size, 'cleanup_inputs': True}])
+                self.hand_off_slot(request)
+                # The task owns (and deletes) the uploaded inputs from here on
+                owned_paths = []
                 self.log_usage(request, success=True, job=job)
                 response_serializer = ConversionJobSerializer(job, context={'request': request})
-                return Response(response_serializer.data, status=status.HTTP_200_OK)
+                return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
             
             # Sync mode
             job.mark_processing()
@@ -861,11 +885,7 @@ class ImagesToPDFView(BaseConversionView):
             processing_time_ms = int((time.time() - start_time) * 1000)
             self.log_usage(request, success=True, job=job, processing_time_ms=processing_time_ms)
             
-            response = FileResponse(
-                open(output_path, 'rb'),
-                as_attachment=True,
-                filename=output_filename
-            )
+            response = file_download_response(output_path, output_filename, delete_after=True)
             return response
         
         except PDFError as e:
@@ -875,7 +895,7 @@ class ImagesToPDFView(BaseConversionView):
             )
         
         finally:
-            for path in input_paths:
+            for path in owned_paths:
                 if os.path.exists(path):
                     os.remove(path)
 
@@ -886,14 +906,11 @@ class PDFToImagesView(BaseConversionView):
     tool_type = ToolType.PDF
     operation_type = OperationType.CONVERT
     tool_name = 'pdf_to_images'
+    input_kind = 'pdf'
     
     def post(self, request):
         """Convert PDF to images."""
         
-        rate_limit_response = self.check_rate_limit(request)
-        if rate_limit_response:
-            return rate_limit_response
-        
         serializer = PDFToImagesSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(
@@ -918,18 +935,12 @@ class PDFToImagesView(BaseConversionView):
         dpi = serializer.validated_data['dpi']
         
         # Save file temporarily
-        temp_dir = settings.UPLOAD_DIR / 'temp'
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        temp_path = str(temp_dir / uploaded_file.name)
+        temp_dir = TEMP_DIR
+        temp_path, release_temp = open_scratch_file(temp_dir)
         
-        output_dir = settings.OUTPUT_DIR / 'pdf' / f'pdf2img_{int(time.time())}'
-        output_dir.mkdir(parents=True, exist_ok=True)
+        output_dir = Path(tempfile.mkdtemp(prefix='pdf2img_', dir=PDF_OUTPUT_DIR))
         
         try:
-            with open(temp_path, 'wb') as f:
-                for chunk in uploaded_file.chunks():
-                    f.write(chunk)
-            
             # Create job for tracking
             job = self.create_job(
                 request=request,
@@ -940,35 +951,31 @@ class PDFToImagesView(BaseConversionView):
             )
             
             # Async mode dispatch
-            if settings.USE_ASYNC_CONVERSION:
-                pdf_to_images_task.delay(job.id, output_format, dpi)
+            if async_conversion_enabled():
+                send_task_nowait(pdf_to_images_task, args=[str(job.id), output_format, dpi])
+                self.hand_off_slot(request)
                 self.log_usage(request, success=True, job=job)
                 response_serializer = ConversionJobSerializer(job, context={'request': request})
-                return Response(response_serializer.data, status=status.HTTP_200_OK)
+                return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
             
             # Sync mode
             job.mark_processing()
+            input_path = upload_input_path(job, uploaded_file, temp_path)
             
             # Convert to images
-            output_paths = pdf_to_images(temp_path, str(output_dir), output_format, dpi)
+            output_paths = pdf_to_images(input_path, str(output_dir), output_format, dpi)
             
             # Create ZIP file
             zip_filename = f'pdf_images_{int(time.time())}.zip'
-            zip_path = str(settings.OUTPUT_DIR / 'pdf' / zip_filename)
+            zip_path = f'{output_dir}.zip'
             
-            with zipfile.ZipFile(zip_path, 'w') as zipf:
-                for path in output_paths:
-                    zipf.write(path, os.path.basename(path))
+            zip_outputs(output_paths, zip_path)
             
             # Log usage
             processing_time_ms = int((time.time() - start_time) * 1000)
             self.log_usage(request, success=True, job=job, processing_time_ms=processing_time_ms)
             
-            response = FileResponse(
-                open(zip_path, 'rb'),
-                as_attachment=True,
-                filename=zip_filename
-            )
+            response = file_download_response(zip_path, zip_filename, delete_after=True)
             return response
         
         except PDFError as e:
@@ -978,8 +985,8 @@ class PDFToImagesView(BaseConversionView):
             )
         
         finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            release_temp()
+            shutil.rmtree(output_dir, ignore_errors=True)
 
 
 class PDFInfoView(APIView):
@@ -998,18 +1005,9 @@ class PDFInfoView(APIView):
         
         uploaded_file = request.data['file']
         
-        # Save temporarily
-        temp_dir = settings.UPLOAD_DIR / 'temp'
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        temp_path = str(temp_dir / uploaded_file.name)
-        
         try:
-            with open(temp_path, 'wb') as f:
-                for chunk in uploaded_file.chunks():
-                    f.write(chunk)
-            
-            # Get PDF info
-            info = get_pdf_info(temp_path)
+            # Parsed from the upload itself; nothing is staged to disk
+            info = get_pdf_info_from_upload(uploaded_file)
             info['filename'] = uploaded_file.name
             info['file_size'] = uploaded_file.size
             
@@ -1020,7 +1018,3 @@ class PDFInfoView(APIView):
                 {'error': f'Failed to get file info: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-        
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
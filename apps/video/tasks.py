@@ -4,59 +4,54 @@ Celery tasks for video conversion and trimming.
 """
 
 import os
-import time
+import shutil
+import tempfile
 from django.conf import settings
-from django.core.files import File
 from apps.core.celery_compat import shared_task
 
-from apps.core.models import ConversionJob, ConvertedFile
-from apps.core.tasks import BaseConversionTask, update_job_processing
+from apps.core.models import ConversionJob
+from apps.core.tasks import BaseConversionTask, RETRY_POLICY, update_job_processing
 from apps.core.utils import (
     convert_video,
     trim_video,
-    get_duration,
+    trim_video_segments,
+    zip_outputs,
     generate_output_filename,
-    get_file_size,
+    ffmpeg_output_size,
+    persist_output,
+    storage_output_path,
+    remove_file,
 )
 
-@shared_task(base=BaseConversionTask, bind=True, autoretry_for=(Exception,), retry_backoff=True, max_retries=3)
+# Resolved once per worker process instead of per task
+VIDEO_OUTPUT_DIR = settings.OUTPUT_DIR / 'video'
+VIDEO_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+@shared_task(base=BaseConversionTask, bind=True, **RETRY_POLICY)
 def convert_video_task(self, job_id, output_format, options):
     """Background task for video conversion."""
-    job = update_job_processing(job_id)
+    job = update_job_processing(job_id, probe_duration=True)
     if not job:
         return False
-        
+    
+    output_path = None
     try:
         input_path = job.input_file.path
         
-        if not job.duration:
-            job.duration = get_duration(input_path)
-            job.save(update_fields=['duration'])
-            
         output_filename = generate_output_filename(os.path.basename(job.input_file.name), output_format)
-        output_dir = settings.OUTPUT_DIR / 'video'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = str(output_dir / output_filename)
+        # FFmpeg writes straight to the output's storage path when it can
+        output_path, stored_name = storage_output_path(job, output_filename, VIDEO_OUTPUT_DIR)
         
-        convert_video(input_path, output_path, output_format, options)
+        stats = convert_video(input_path, output_path, output_format, options)
         
-        with open(output_path, 'rb') as f:
-            job.output_file.save(output_filename, File(f), save=False)
-            
-        job.mark_completed(job.output_file.name)
-        
-        ConvertedFile.objects.create(
-            conversion_job=job,
-            output_file=job.output_file,
-            output_format=output_format,
-            file_size=get_file_size(output_path)
-        )
-        
-        if os.path.exists(output_path):
-            os.remove(output_path)
+        file_size = ffmpeg_output_size(stats, output_path)
+        persist_output(job, output_path, output_filename, move=True, stored_name=stored_name)
+        job.complete_with_output(output_format=output_format, file_size=file_size)
             
         return True
     except Exception as e:
+        if output_path:
+            remove_file(output_path)
         raise e
 
 @shared_task(base=BaseConversionTask, bind=True)
@@ -65,32 +60,64 @@ def trim_video_task(self, job_id, trim_start, trim_end, copy_mode, output_format
     job = update_job_processing(job_id)
     if not job:
         return False
-        
+    
+    output_path = None
     try:
         input_path = job.input_file.path
         
         output_filename = generate_output_filename(os.path.basename(job.input_file.name), output_format)
-        output_dir = settings.OUTPUT_DIR / 'video'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = str(output_dir / output_filename)
-        
-        trim_video(input_path, output_path, trim_start, trim_end, copy_mode)
-        
-        with open(output_path, 'rb') as f:
-            job.output_file.save(output_filename, File(f), save=False)
-            
-        job.mark_completed(job.output_file.name)
+        # FFmpeg writes straight to the output's storage path when it can
+        output_path, stored_name = storage_output_path(job, output_filename, VIDEO_OUTPUT_DIR)
         
-        ConvertedFile.objects.create(
-            conversion_job=job,
-            output_file=job.output_file,
-            output_format=output_format,
-            file_size=get_file_size(output_path)
-        )
+        stats = trim_video(input_path, output_path, trim_start, trim_end, copy_mode, output_format)
         
-        if os.path.exists(output_path):
-            os.remove(output_path)
+        file_size = ffmpeg_output_size(stats, output_path)
+        persist_output(job, output_path, output_filename, move=True, stored_name=stored_name)
+        job.complete_with_output(output_format=output_format, file_size=file_size)
             
         return True
     except Exception as e:
+        if output_path:
+            remove_file(output_path)
         raise e
+
+
+def trim_segments_to_zip(job, segments, copy_mode, output_format):
+    """
+    Cut all segments of a job in one FFmpeg run and store them as a ZIP.
+    
+    Shared by trim_video_multi_task and the synchronous VideoMultiTrimView.
+    """
+    input_path = job.input_file.path
+    base_name = os.path.basename(job.input_file.name).rsplit('.', 1)[0]
+    
+    clip_dir = tempfile.mkdtemp(prefix='clips_', dir=VIDEO_OUTPUT_DIR)
+    try:
+        clip_paths = [
+            os.path.join(clip_dir, f'{base_name}_clip{index:02d}.{output_format}')
+            for index in range(1, len(segments) + 1)
+        ]
+        trim_video_segments(input_path, clip_paths, segments, copy_mode)
+        
+        zip_filename = generate_output_filename(os.path.basename(job.input_file.name), 'zip')
+        zip_path = f'{clip_dir}.zip'
+        file_size = zip_outputs(clip_paths, zip_path)
+        
+        persist_output(job, zip_path, zip_filename, move=True)
+        job.complete_with_output(output_format='zip', file_size=file_size)
+        remove_file(zip_path)
+    finally:
+        shutil.rmtree(clip_dir, ignore_errors=True)
+    
+    return job
+
+
+@shared_task(base=BaseConversionTask, bind=True)
+def trim_video_multi_task(self, job_id, segments, copy_mode, output_format):
+    """Background task for cutting several clips from one video."""
+    job = update_job_processing(job_id)
+    if not job:
+        return False
+    
+    trim_segments_to_zip(job, segments, copy_mode, output_format)
+    return True
@@ -3,12 +3,13 @@ Video Module API URLs.
 """
 
 from django.urls import path
-from .views import VideoConvertView, VideoTrimView, VideoInfoView
+from .views import VideoConvertView, VideoTrimView, VideoMultiTrimView, VideoInfoView
 
 app_name = 'video'
 
 urlpatterns = [
     path('convert/', VideoConvertView.as_view(), name='convert'),
     path('trim/', VideoTrimView.as_view(), name='trim'),
+    path('trim-multi/', VideoMultiTrimView.as_view(), name='trim-multi'),
     path('info/', VideoInfoView.as_view(), name='info'),
 ]
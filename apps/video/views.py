@@ -3,35 +3,49 @@ Video Module Views.
 Video conversion and trimming API endpoints.
 """
 
-import os
 import time
 from pathlib import Path
 
 from django.conf import settings
-from django.core.files import File
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.views import APIView
 
-from apps.core.models import ConversionJob, ConvertedFile, ToolType, OperationType
+from apps.core.models import ConversionJob, JobStatus, ToolType, OperationType
 from apps.core.views import BaseConversionView
 from apps.core.serializers import (
     VideoConvertSerializer,
     VideoTrimSerializer,
+    VideoMultiTrimSerializer,
     ConversionJobSerializer,
 )
 from apps.core.utils import (
     convert_video,
     trim_video,
     get_duration,
+    get_upload_duration,
     get_file_extension,
     generate_output_filename,
-    get_file_size,
+    ffmpeg_output_size,
+    save_upload,
+    open_scratch_file,
+    persist_output,
+    remove_file,
+    storage_output_path,
     FFmpegError,
 )
-from .tasks import convert_video_task, trim_video_task
+from .tasks import (
+    convert_video_task,
+    trim_video_task,
+    trim_video_multi_task,
+    trim_segments_to_zip,
+    VIDEO_OUTPUT_DIR,
+)
 
+# Staging directory for uploads that are only probed, created once per process
+INFO_TEMP_DIR = settings.UPLOAD_DIR / 'temp'
+INFO_TEMP_DIR.mkdir(parents=True, exist_ok=True)
 
 
 class VideoConvertView(BaseConversionView):
@@ -49,11 +63,6 @@ class VideoConvertView(BaseConversionView):
     def post(self, request):
         """Convert video file to specified format."""
         
-        # Check rate limit
-        rate_limit_response = self.check_rate_limit(request)
-        if rate_limit_response:
-            return rate_limit_response
-        
         # Validate input
         serializer = VideoConvertSerializer(data=request.data)
         if not serializer.is_valid():
@@ -86,63 +95,57 @@ class VideoConvertView(BaseConversionView):
             options['video_bitrate'] = serializer.validated_data['video_bitrate']
         if serializer.validated_data.get('audio_bitrate'):
             options['audio_bitrate'] = serializer.validated_data['audio_bitrate']
+        if serializer.validated_data.get('preset'):
+            options['preset'] = serializer.validated_data['preset']
         
         # Get input format
         input_format = get_file_extension(uploaded_file.name)
         
+        # Probe duration while the upload is still in its temp file
+        duration = get_upload_duration(uploaded_file)
+        
+        # Large or long inputs are queued even in sync mode
+        queue_job = self.should_queue(uploaded_file.size, duration)
+        
         # Create job
         job = self.create_job(
             request=request,
             input_file=uploaded_file,
             input_format=input_format,
             output_format=output_format,
-            options=options
+            options=options,
+            duration=duration,
+            initial_status=JobStatus.PENDING if queue_job else JobStatus.PROCESSING
         )
         
-        # Async mode dispatch
-        if settings.USE_ASYNC_CONVERSION:
+        # Async dispatch: the client polls the job
+        if queue_job:
             convert_video_task.delay(job.id, output_format, options)
+            self.hand_off_slot(request)
             self.log_usage(request, success=True, job=job)
             response_serializer = ConversionJobSerializer(job, context={'request': request})
-            return Response(response_serializer.data, status=status.HTTP_200_OK)
+            return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
         
+        output_path = None
         try:
-            # Mark as processing
-            job.mark_processing()
-            
             # Get input path
             input_path = job.input_file.path
             
-            # Get duration
-            job.duration = get_duration(input_path)
-            job.save(update_fields=['duration'])
+            # Created as processing; probe duration if the upload couldn't be
+            if duration is None:
+                job.mark_processing(duration=get_duration(input_path))
             
             # Generate output filename and path
             output_filename = generate_output_filename(uploaded_file.name, output_format)
-            output_dir = settings.OUTPUT_DIR / 'video'
-            output_dir.mkdir(parents=True, exist_ok=True)
-            output_path = str(output_dir / output_filename)
+            # FFmpeg writes straight to the output's storage path when it can
+            output_path, stored_name = storage_output_path(job, output_filename, VIDEO_OUTPUT_DIR)
             
             # Convert video
-            convert_video(input_path, output_path, output_format, options)
+            stats = convert_video(input_path, output_path, output_format, options)
             
-            # Save output file to job
-            with open(output_path, 'rb') as f:
-                job.output_file.save(output_filename, File(f), save=False)
-            
-            job.mark_completed(job.output_file.name)
-            
-            # Create ConvertedFile record
-            ConvertedFile.objects.create(
-                conversion_job=job,
-                output_file=job.output_file,
-                output_format=output_format,
-                file_size=get_file_size(output_path)
-            )
-            
-            # Clean up temp output file
-            if os.path.exists(output_path):
-                os.remove(output_path)
+            file_size = ffmpeg_output_size(stats, output_path)
+            persist_output(job, output_path, output_filename, move=True, stored_name=stored_name)
+            job.complete_with_output(output_format=output_format, file_size=file_size)
             
             # Log usage
             processing_time_ms = int((time.time() - start_time) * 1000)
@@ -153,6 +156,9 @@ class VideoConvertView(BaseConversionView):
             return Response(response_serializer.data, status=status.HTTP_200_OK)
         
         except FFmpegError as e:
+            # A failed or killed encode leaves a partial file at the storage path
+            if output_path:
+                remove_file(output_path)
             job.mark_failed(str(e))
             self.log_usage(request, success=False, job=job)
             return Response(
@@ -161,6 +167,8 @@ class VideoConvertView(BaseConversionView):
             )
         
         except Exception as e:
+            if output_path:
+                remove_file(output_path)
             job.mark_failed(str(e))
             self.log_usage(request, success=False, job=job)
             return Response(
@@ -186,11 +194,6 @@ class VideoTrimView(BaseConversionView):
     def post(self, request):
         """Trim video file between start and end times."""
         
-        # Check rate limit
-        rate_limit_response = self.check_rate_limit(request)
-        if rate_limit_response:
-            return rate_limit_response
-        
         # Validate input
         serializer = VideoTrimSerializer(data=request.data)
         if not serializer.is_valid():
@@ -229,72 +232,73 @@ class VideoTrimView(BaseConversionView):
             'copy_mode': copy_mode
         }
         
+        # Probe duration while the upload is still in its temp file
+        duration = get_upload_duration(uploaded_file)
+        
+        # Long re-encodes are queued even in sync mode; stream copies only
+        # read the clip's bytes and stay inline
+        queue_job = self.should_queue(duration=None if copy_mode else trim_end - trim_start)
+        
         # Create job
         job = self.create_job(
             request=request,
             input_file=uploaded_file,
             input_format=input_format,
             output_format=output_format,
-            options=options
+            options=options,
+            duration=duration,
+            initial_status=JobStatus.PENDING if queue_job else JobStatus.PROCESSING
         )
         
-        # Async mode dispatch
-        if settings.USE_ASYNC_CONVERSION:
-            trim_video_task.delay(job.id, trim_start, trim_end, copy_mode, output_format)
+        # Async dispatch: the client polls the job
+        if queue_job:
+            # Stream copies are I/O-bound and go to the high-concurrency trim
+            # queue; re-encodes are CPU work like any other conversion
+            trim_video_task.apply_async(
+                args=[job.id, trim_start, trim_end, copy_mode, output_format],
+                queue='video_trim' if copy_mode else 'video_cpu'
+            )
+            self.hand_off_slot(request)
             self.log_usage(request, success=True, job=job)
             response_serializer = ConversionJobSerializer(job, context={'request': request})
-            return Response(response_serializer.data, status=status.HTTP_200_OK)
+            return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
         
+        output_path = None
         try:
-            # Mark as processing
-            job.mark_processing()
-            
             # Get input path
             input_path = job.input_file.path
             
-            # Get duration and validate times
-            duration = get_duration(input_path)
-            if duration:
-                job.duration = duration
-                job.save(update_fields=['duration'])
-                
-                if trim_end > duration:
-                    job.mark_failed(f'End time ({trim_end}s) exceeds file duration ({duration}s)')
-                    return Response(
-                        {'error': f'End time exceeds file duration ({duration}s)'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
+            # Created as processing; probe duration if the upload couldn't be
+            if duration is None:
+                duration = get_duration(input_path)
+                job.mark_processing(duration=duration)
+            
+            # Validate times
+            if duration and trim_end > duration:
+                job.mark_failed(f'End time ({trim_end}s) exceeds file duration ({duration}s)')
+                return Response(
+                    {'error': f'End time exceeds file duration ({duration}s)'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
             # Generate output filename and path
             output_filename = generate_output_filename(
                 uploaded_file.name,
                 output_format if output_format else input_format
             )
-            output_dir = settings.OUTPUT_DIR / 'video'
-            output_dir.mkdir(parents=True, exist_ok=True)
-            output_path = str(output_dir / output_filename)
+            # FFmpeg writes straight to the output's storage path when it can
+            output_path, stored_name = storage_output_path(job, output_filename, VIDEO_OUTPUT_DIR)
             
             # Trim video
-            trim_video(input_path, output_path, trim_start, trim_end, copy_mode)
+            stats = trim_video(input_path, output_path, trim_start, trim_end, copy_mode, output_format)
             
-            # Save output file to job
-            with open(output_path, 'rb') as f:
-                job.output_file.save(output_filename, File(f), save=False)
-            
-            job.mark_completed(job.output_file.name)
-            
-            # Create ConvertedFile record
-            ConvertedFile.objects.create(
-                conversion_job=job,
-                output_file=job.output_file,
+            file_size = ffmpeg_output_size(stats, output_path)
+            persist_output(job, output_path, output_filename, move=True, stored_name=stored_name)
+            job.complete_with_output(
                 output_format=output_format if output_format else input_format,
-                file_size=get_file_size(output_path)
+                file_size=file_size
             )
             
-            # Clean up temp output file
-            if os.path.exists(output_path):
-                os.remove(output_path)
-            
             # Log usage
             processing_time_ms = int((time.time() - start_time) * 1000)
             self.log_usage(request, success=True, job=job, processing_time_ms=processing_time_ms)
@@ -303,6 +307,102 @@ class VideoTrimView(BaseConversionView):
             response_serializer = ConversionJobSerializer(job, context={'request': request})
             return Response(response_serializer.data, status=status.HTTP_200_OK)
         
+        except FFmpegError as e:
+            # A failed or killed encode leaves a partial file at the storage path
+            if output_path:
+                remove_file(output_path)
+            job.mark_failed(str(e))
+            self.log_usage(request, success=False, job=job)
+            return Response(
+                {'error': 'Trimming failed', 'details': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        except Exception as e:
+            if output_path:
+                remove_file(output_path)
+            job.mark_failed(str(e))
+            self.log_usage(request, success=False, job=job)
+            return Response(
+                {'error': 'An unexpected error occurred', 'details': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class VideoMultiTrimView(BaseConversionView):
+    """
+    Cut several clips from one video in a single pass.
+    
+    All segments are outputs of one FFmpeg run (the input is read once);
+    the clips are returned together as a ZIP archive.
+    """
+    
+    tool_type = ToolType.VIDEO
+    operation_type = OperationType.TRIM
+    tool_name = 'video_trim_multi'
+    
+    def post(self, request):
+        """Trim video file into several clips."""
+        
+        serializer = VideoMultiTrimSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {'error': 'Invalid input', 'details': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        start_time = time.time()
+        
+        uploaded_file = serializer.validated_data['file']
+        
+        size_response = self.validate_file_size(uploaded_file)
+        if size_response:
+            return size_response
+        
+        duplicate_response = self.check_duplicate_job(request, uploaded_file)
+        if duplicate_response:
+            return duplicate_response
+        
+        segments = serializer.validated_data['segments']
+        copy_mode = serializer.validated_data.get('copy_mode', True)
+        
+        input_format = get_file_extension(uploaded_file.name)
+        output_format = serializer.validated_data.get('output_format') or input_format
+        
+        # As in VideoTrimView: long re-encodes (judged by the total length
+        # of the clips) are queued even in sync mode; stream copies stay inline
+        clips_duration = sum(end - start for start, end in segments)
+        queue_job = self.should_queue(duration=None if copy_mode else clips_duration)
+        
+        job = self.create_job(
+            request=request,
+            input_file=uploaded_file,
+            input_format=input_format,
+            output_format='zip',
+            options={'segments': segments, 'copy_mode': copy_mode, 'clip_format': output_format},
+            initial_status=JobStatus.PENDING if queue_job else JobStatus.PROCESSING
+        )
+        
+        # Async dispatch (same queue choice as VideoTrimView): the client polls the job
+        if queue_job:
+            trim_video_multi_task.apply_async(
+                args=[job.id, segments, copy_mode, output_format],
+                queue='video_trim' if copy_mode else 'video_cpu'
+            )
+            self.hand_off_slot(request)
+            self.log_usage(request, success=True, job=job)
+            response_serializer = ConversionJobSerializer(job, context={'request': request})
+            return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
+        
+        try:
+            trim_segments_to_zip(job, segments, copy_mode, output_format)
+            
+            processing_time_ms = int((time.time() - start_time) * 1000)
+            self.log_usage(request, success=True, job=job, processing_time_ms=processing_time_ms)
+            
+            response_serializer = ConversionJobSerializer(job, context={'request': request})
+            return Response(response_serializer.data, status=status.HTTP_200_OK)
+        
         except FFmpegError as e:
             job.mark_failed(str(e))
             self.log_usage(request, success=False, job=job)
@@ -327,7 +427,7 @@ class VideoInfoView(APIView):
     
     def post(self, request):
         """Get video file metadata."""
-        from apps.core.utils import get_media_info
+        from apps.core.utils import get_media_info, parse_frame_rate
         
         if 'file' not in request.data:
             return Response(
@@ -337,18 +437,19 @@ class VideoInfoView(APIView):
         
         uploaded_file = request.data['file']
         
-        # Save temporarily
-        temp_dir = settings.UPLOAD_DIR / 'temp'
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        temp_path = str(temp_dir / uploaded_file.name)
+        release_temp = None
         
         try:
-            with open(temp_path, 'wb') as f:
-                for chunk in uploaded_file.chunks():
-                    f.write(chunk)
+            # Uploads Django spooled to disk are probed in place; in-memory
+            # ones are written to an anonymous scratch file with one write()
+            if hasattr(uploaded_file, 'temporary_file_path'):
+                probe_path = uploaded_file.temporary_file_path()
+            else:
+                temp_path, release_temp = open_scratch_file(INFO_TEMP_DIR)
+                probe_path = save_upload(uploaded_file, temp_path)
             
             # Get media info
-            info = get_media_info(temp_path)
+            info = get_media_info(probe_path)
             
             # Extract relevant data
             format_info = info.get('format', {})
@@ -374,7 +475,7 @@ class VideoInfoView(APIView):
                     'codec': video_stream.get('codec_name'),
                     'width': video_stream.get('width'),
                     'height': video_stream.get('height'),
-                    'fps': eval(video_stream.get('r_frame_rate', '0/1')) if '/' in str(video_stream.get('r_frame_rate', '0')) else 0,
+                    'fps': parse_frame_rate(video_stream.get('r_frame_rate')),
                 }
             
             if audio_stream:
@@ -394,5 +495,5 @@ class VideoInfoView(APIView):
         
         finally:
             # Clean up temp file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            if release_temp:
+                release_temp()
@@ -1,5 +1,6 @@
 import os
 from celery import Celery
+from celery.signals import worker_init, worker_process_init
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
@@ -15,6 +16,36 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
 
+# Database connections between tasks: Celery's Django fixup already calls
+# close_if_unusable_or_obsolete() on every connection before and after each
+# task (the task_prerun/task_postrun equivalent of Django's request
+# signals), so CONN_MAX_AGE and CONN_HEALTH_CHECKS from settings apply to
+# tasks just as they do to requests. No extra signal handlers are needed.
+
+
+@worker_process_init.connect
+def close_inherited_db_connections(**kwargs):
+    """
+    Drop database connections inherited from the prefork parent.
+    
+    A forked child shares the parent's socket, so with CONN_MAX_AGE the
+    first task after an idle period hits "server closed the connection
+    unexpectedly". Closing here makes each child open its own connection.
+    """
+    from django.db import connections
+    
+    connections.close_all()
+
+
+@worker_init.connect
+def prepare_ffmpeg(**kwargs):
+    """Resolve FFmpeg and probe NVENC once, before the pool forks."""
+    from apps.core.utils import warm_ffmpeg_caches
+    
+    warm_ffmpeg_caches()
+
+
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
+
@@ -3,6 +3,7 @@ Django settings for converter-saas project.
 Production-ready configuration for file converter SaaS.
 """
 
+import importlib.util
 import os
 from pathlib import Path
 
@@ -52,6 +53,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.core.middleware.RateLimitMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -78,14 +80,39 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database Configuration - Unified SQLite/Postgres support
 import dj_database_url
 
+# Connections are persistent per thread (CONN_MAX_AGE), so requests reuse
+# a warm connection instead of reconnecting. With many web/worker processes,
+# put pgbouncer (transaction pooling) in front of Postgres, point
+# DATABASE_URL at it and set DB_POOLER=pgbouncer. ATOMIC_REQUESTS stays off
+# so no request holds a transaction open while FFmpeg runs.
 DATABASES = {
     'default': dj_database_url.config(
         default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}",
-        conn_max_age=600,
+        conn_max_age=int(os.environ.get('DB_CONN_MAX_AGE', '600')),
         conn_health_checks=True,
     )
 }
 
+# Transaction pooling hands each transaction a different server connection,
+# which breaks server-side (named) cursors used by QuerySet.iterator()
+if os.environ.get('DB_POOLER', '').lower() == 'pgbouncer':
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# SQLite (local/dev default): wait up to 20s for the write lock instead of
+# failing with "database is locked"; WAL mode is switched on per connection
+# in CoreConfig.ready() so readers don't block the writer. Postgres is the
+# production database (docker-compose) for concurrent writes.
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default'].setdefault('OPTIONS', {})['timeout'] = 20
+
+# Postgres: cap runaway queries so a stuck statement can't pin a worker.
+# Behind pgbouncer in transaction-pool mode, add statement_timeout to
+# pgbouncer's ignore_startup_parameters or set it on the database role.
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['default'].setdefault('OPTIONS', {})['options'] = (
+        f"-c statement_timeout={os.environ.get('DB_STATEMENT_TIMEOUT_MS', '60000')}"
+    )
+
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -108,17 +135,29 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# WhiteNoise serves the collected files from gunicorn: collectstatic writes
+# hashed names (cacheable forever) plus gzip/brotli copies it sends as-is
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+}
+
 # Media files (uploads and outputs)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
 # Upload/Output directories
-UPLOAD_DIR = MEDIA_ROOT / 'uploads'
+# Scratch space for staged uploads. On a single host this can point at a
+# tmpfs (e.g. /dev/shm/converter/uploads) so staging never touches disk.
+UPLOAD_DIR = Path(os.environ.get('UPLOAD_DIR', str(MEDIA_ROOT / 'uploads')))
 OUTPUT_DIR = MEDIA_ROOT / 'outputs'
 
-# Create directories if they don't exist
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+# Serve downloads through nginx (X-Accel-Redirect) instead of the worker.
+# X_ACCEL_LOCATION must be an `internal` nginx location aliased to MEDIA_ROOT.
+USE_X_ACCEL = os.environ.get('USE_X_ACCEL', 'False').lower() == 'true'
+X_ACCEL_LOCATION = os.environ.get('X_ACCEL_LOCATION', '/_internal/')
+
+# Directories are created in CoreConfig.ready(), not when settings load
 
 
 # Default primary key field type
@@ -135,10 +174,11 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.MultiPartParser',
         'rest_framework.parsers.FormParser',
     ],
-    'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
-    ],
+    # The browsable API is a development aid; in production an
+    # Accept: text/html request gets JSON instead of a rendered page
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'] + (
+        ['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
 }
@@ -164,48 +204,105 @@ CSRF_TRUSTED_ORIGINS = ['https://*.ngrok.io', 'https://*.ngrok-free.app', 'https
 
 
 # File Upload Configuration
-# Increased to 500MB to support large video files
-FILE_UPLOAD_MAX_MEMORY_SIZE = 500 * 1024 * 1024  # 500MB
+# Uploads are streamed to disk in chunks, so a worker holds a few MB per
+# request however large the file (up to MAX_UPLOAD_SIZE) is
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.environ.get('FILE_UPLOAD_MAX_MEMORY_SIZE', 2621440))  # 2.5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 500 * 1024 * 1024  # 500MB
 MAX_UPLOAD_SIZE = 500 * 1024 * 1024  # 500MB max file size
 
+# Every upload goes straight to a temp file (ideally on tmpfs, e.g.
+# /dev/shm, via FILE_UPLOAD_TEMP_DIR) instead of the worker's heap. The
+# upload then has a path that ffprobe, hashing and storage can read in place.
+FILE_UPLOAD_HANDLERS = ['django.core.files.uploadhandler.TemporaryFileUploadHandler']
+FILE_UPLOAD_TEMP_DIR = os.environ.get('FILE_UPLOAD_TEMP_DIR') or None
+
 
 # Supported Formats Configuration
-SUPPORTED_AUDIO_FORMATS = [
+# Frozensets: only used for membership checks, and safe to share across threads
+SUPPORTED_AUDIO_FORMATS = frozenset({
     'mp3', 'wav', 'aac', 'm4a', 'flac', 'ogg', 'opus',
     'aiff', 'alac', 'wma', 'amr', 'ac3', 'pcm', 'ape', 'caf'
-]
+})
 
-SUPPORTED_VIDEO_FORMATS = [
+SUPPORTED_VIDEO_FORMATS = frozenset({
     'mp4', 'mkv', 'avi', 'mov', 'webm', 'flv', 'wmv',
     '3gp', 'mpg', 'mpeg', 'ts', 'm4v', 'ogv',
     'f4v', 'vob', 'rm', 'rmvb'
-]
+})
 
-SUPPORTED_IMAGE_FORMATS = [
+SUPPORTED_IMAGE_FORMATS = frozenset({
     'jpg', 'jpeg', 'png', 'webp', 'gif', 'svg', 'bmp', 'tiff', 'tif',
     'ico', 'heic', 'heif', 'raw', 'psd', 'ai', 'eps', 'avif',
     'ppm', 'pgm'
-]
+})
 
-SUPPORTED_DOCUMENT_FORMATS = [
+SUPPORTED_DOCUMENT_FORMATS = frozenset({
     'doc', 'docx', 'xls', 'xlsx', 'ppt', 'pptx',
     'txt', 'html', 'md', 'csv', 'pdf'
-]
+})
+
+SUPPORTED_ALL_FORMATS = (
+    SUPPORTED_AUDIO_FORMATS | SUPPORTED_VIDEO_FORMATS
+    | SUPPORTED_IMAGE_FORMATS | SUPPORTED_DOCUMENT_FORMATS
+)
 
 
 # FFmpeg Configuration
 FFMPEG_PATH = os.environ.get('FFMPEG_PATH', 'ffmpeg')
 FFPROBE_PATH = os.environ.get('FFPROBE_PATH', 'ffprobe')
 
+# Video hardware acceleration: 'auto' (use NVENC/NVDEC if a GPU works),
+# 'cuda' (always), or 'none' (CPU only)
+FFMPEG_HWACCEL = os.environ.get('FFMPEG_HWACCEL', 'auto')
+
+# CUDA device used for NVENC/NVDEC, and how many NVENC sessions may run on
+# it at once (consumer GeForce cards allow only a few per system)
+NVENC_GPU = int(os.environ.get('NVENC_GPU', '0'))
+NVENC_MAX_SESSIONS = int(os.environ.get('NVENC_MAX_SESSIONS', '2'))
+
+# Video transcoding backend: 'ffmpeg', or 'pynvc' to transcode H.264 with
+# PyNvVideoCodec (GPU decode -> encode without FFmpeg's filter graph),
+# falling back to FFmpeg when it isn't installed or fails
+VIDEO_BACKEND = os.environ.get('VIDEO_BACKEND', 'ffmpeg')
+
+# Threads per FFmpeg process. x264 otherwise starts one thread per core in
+# every process, so N concurrent encodes oversubscribe the CPU N times over.
+# Split the cores across the worker's CELERY_CONCURRENCY processes instead;
+# a lower count costs a single encode some speed but keeps total throughput
+# up when the worker is busy. Set FFMPEG_THREADS=0 to let FFmpeg decide.
+# The cores counted are the ones this process may run on, so a worker
+# started under taskset or a container cpuset splits only its own cores.
+_USABLE_CPUS = (
+    len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1)
+)
+FFMPEG_THREADS = int(os.environ.get(
+    'FFMPEG_THREADS',
+    max(1, _USABLE_CPUS // int(os.environ.get('CELERY_CONCURRENCY', '1')))
+))
+
+# Pin each worker process's FFmpeg to its own block of FFMPEG_THREADS CPUs
+# so CPU encodes keep their caches warm. Only for dedicated encode workers
+# whose concurrency x FFMPEG_THREADS matches the core count.
+FFMPEG_PIN_CPUS = os.environ.get('FFMPEG_PIN_CPUS', 'False').lower() == 'true'
+
+# PDF command-line tools (used when PyMuPDF isn't installed)
+GHOSTSCRIPT_PATH = os.environ.get('GHOSTSCRIPT_PATH', 'gs')
+PDFTOPPM_PATH = os.environ.get('PDFTOPPM_PATH', 'pdftoppm')
+
 
 # File Expiry Settings (in hours) - Backup cleanup for missed downloads
 CONVERTED_FILE_EXPIRY_HOURS = 1
 
+# Scratch outputs under OUTPUT_DIR/pdf older than this (seconds) are swept
+OUTPUT_TTL_SEC = int(os.environ.get('OUTPUT_TTL_SEC', 3600))
+
 
 # Rate Limiting (requests per hour per IP)
 RATE_LIMIT_REQUESTS_PER_HOUR = 100
 
+# Conversions one IP may have running at once (needs Redis)
+MAX_CONCURRENT_CONVERSIONS_PER_IP = int(os.environ.get('MAX_CONCURRENT_CONVERSIONS_PER_IP', 5))
+
 
 # ============================================
 # CELERY CONFIGURATION
@@ -214,31 +311,132 @@ RATE_LIMIT_REQUESTS_PER_HOUR = 100
 # Feature flag for async conversion (Switch to True for background processing)
 USE_ASYNC_CONVERSION = os.environ.get('USE_ASYNC_CONVERSION', 'False').lower() == 'true'
 
+# In sync mode, video jobs above either limit are still queued when a broker
+# is reachable, so a web worker isn't held for a long encode
+SYNC_MAX_BYTES = int(os.environ.get('SYNC_MAX_BYTES', 20 * 1024 * 1024))
+SYNC_MAX_DURATION = float(os.environ.get('SYNC_MAX_DURATION', 30))
+
+# PDF to images: documents above this many pages are rendered as a chord
+# of page-range subtasks spread across workers
+PDF_PARALLEL_THRESHOLD = int(os.environ.get('PDF_PARALLEL_THRESHOLD', 200))
+PDF_PARALLEL_CHUNK_PAGES = int(os.environ.get('PDF_PARALLEL_CHUNK_PAGES', 100))
+
 # Redis connection details
 REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
 
-CELERY_BROKER_URL = REDIS_URL
-CELERY_RESULT_BACKEND = REDIS_URL
+
+def _redis_db_url(url, db):
+    """Same Redis server as url, database number db."""
+    from urllib.parse import urlsplit, urlunsplit
+    return urlunsplit(urlsplit(url)._replace(path=f'/{db}'))
+
+
+# Broker, result backend and cache each get their own database (and client
+# pool), so result writes and cache traffic don't share keyspace or
+# connections with the task queue. Each can be pointed elsewhere by env.
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', REDIS_URL)
+CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', _redis_db_url(REDIS_URL, 1))
+CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', _redis_db_url(REDIS_URL, 2))
+
+# Rate limit counters and conversion slots (apps.core.ratelimit) are shared
+# by every web worker; they live beside the cache, not in the broker database
+RATELIMIT_REDIS_URL = os.environ.get('RATELIMIT_REDIS_URL', CACHE_REDIS_URL)
+
+# Cap on the per-process redis-py pool used for rate limiting
+REDIS_MAX_CONNECTIONS = int(os.environ.get('REDIS_MAX_CONNECTIONS', 50))
+
+# Shared cache (health probe results). Redis when redis-py is installed,
+# otherwise Django's default per-process in-memory cache.
+if importlib.util.find_spec('redis') is not None:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+            'OPTIONS': {
+                'socket_connect_timeout': 0.5,
+                'socket_timeout': 0.5,
+                'max_connections': 20,
+            },
+        }
+    }
+
+# Publishers (the web workers' delay()/send_task calls) reuse pooled broker
+# connections instead of connecting per message; the caps keep many
+# processes from exhausting Redis' maxclients
+CELERY_BROKER_POOL_LIMIT = int(os.environ.get('CELERY_BROKER_POOL_LIMIT', 10))
+CELERY_REDIS_MAX_CONNECTIONS = int(os.environ.get('CELERY_REDIS_MAX_CONNECTIONS', 20))
+CELERY_BROKER_TRANSPORT_OPTIONS = {'max_connections': CELERY_BROKER_POOL_LIMIT}
+CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Task messages carry only a job id and a small options dict, where gzip's
+# header and the base64 re-encoding outweigh the savings; set
+# CELERY_TASK_COMPRESSION=gzip (or zstd, with zstandard installed) if
+# payloads ever grow to several KB. send_task_nowait follows this setting.
+CELERY_TASK_COMPRESSION = os.environ.get('CELERY_TASK_COMPRESSION') or None
+
+# Job state lives on ConversionJob; results are never polled from the
+# backend, so store no task args and drop results with the converted files
+CELERY_RESULT_EXTENDED = False
+CELERY_RESULT_EXPIRES = CONVERTED_FILE_EXPIRY_HOURS * 3600
+
 # Task configuration
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 3600  # 1 hour hard limit
+
+# Unreleased concurrency slots (e.g. a killed worker) expire with the task limit
+CONCURRENCY_SLOT_TTL = CELERY_TASK_TIME_LIMIT
 CELERY_TASK_SOFT_TIME_LIMIT = 3300  # 55 min soft limit
 
 # Reliability
 CELERY_TASK_REJECT_ON_WORKER_LOST = True
 CELERY_TASK_ACKS_LATE = True
 
+# Reserve one task per worker process at a time: conversions run for
+# minutes, and the default of 4 lets one worker sit on jobs that idle
+# workers could have started
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+# Memory: recycle forked workers so heap fragmentation can't grow unbounded
+CELERY_WORKER_MAX_TASKS_PER_CHILD = 50
+
+# Routing: CPU-heavy PDF work gets its own queue/worker so it can't starve
+# the default queue (see the pdf-worker service in docker-compose.yml)
+CELERY_TASK_ROUTES = {
+    'apps.pdf.tasks.compress_pdf_task': {'queue': 'pdf_cpu'},
+    'apps.pdf.tasks.rotate_pdf_task': {'queue': 'pdf_cpu'},
+    'apps.pdf.tasks.protect_pdf_task': {'queue': 'pdf_cpu'},
+    'apps.pdf.tasks.unlock_pdf_task': {'queue': 'pdf_cpu'},
+    # Video encodes go to GPU workers where they exist (VIDEO_ENCODE_QUEUE=
+    # video_gpu), otherwise to CPU workers. Trims are routed per request
+    # in VideoTrimView and VideoMultiTrimView: stream copies to video_trim,
+    # re-encodes to video_cpu.
+    'apps.video.tasks.convert_video_task': {'queue': os.environ.get('VIDEO_ENCODE_QUEUE', 'video_cpu')},
+    'apps.video.tasks.trim_video_task': {'queue': 'video_trim'},
+    'apps.video.tasks.trim_video_multi_task': {'queue': 'video_trim'},
+    # Audio transcodes are FFmpeg CPU work too: run them on the FFmpeg-tuned
+    # CPU workers (prefetch 1, FFMPEG_THREADS) rather than the default queue,
+    # which is left to quick image/PDF/maintenance tasks
+    'apps.audio.tasks.*': {'queue': 'video_cpu'},
+}
+
 # Celery Beat Schedule - Periodic Tasks
 CELERY_BEAT_SCHEDULE = {
     'cleanup-expired-files': {
         'task': 'apps.core.tasks.cleanup_expired_files',
         'schedule': 30 * 60,  # Every 30 minutes
     },
+    'cleanup-pdf-outputs': {
+        'task': 'apps.pdf.tasks.cleanup_pdf_outputs',
+        'schedule': 5 * 60,  # Every 5 minutes
+    },
+    'refresh-ffmpeg-health': {
+        'task': 'apps.core.tasks.refresh_ffmpeg_health',
+        'schedule': 30,  # Every 30 seconds
+    },
 }
 
 # ============================================
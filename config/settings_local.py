@@ -16,3 +16,8 @@ DATABASES = {
 # Debug mode on
 DEBUG = True
 ALLOWED_HOSTS = ['*']
+
+# Single-host setups (web + worker on one machine) can keep upload staging
+# in RAM by exporting, before starting the server and worker:
+#   UPLOAD_DIR=/dev/shm/converter/uploads
+#   FILE_UPLOAD_TEMP_DIR=/dev/shm/converter/tmp
@@ -3,24 +3,45 @@ Gunicorn Configuration for Converter SaaS Production Server
 
 Optimized for handling large file uploads/downloads and video conversion.
 """
-import multiprocessing
 import os
 
 # Server socket
 bind = "0.0.0.0:8000"
-backlog = 2048
+# Pending-connection queue for upload spikes. The kernel caps it at
+# net.core.somaxconn, so raise that too: sysctl -w net.core.somaxconn=4096
+backlog = 4096
+
+# Behind a load balancer: set FORWARDED_ALLOW_IPS (read by gunicorn itself)
+# to its address range, or '*' when only the balancer can reach this port,
+# and GUNICORN_PROXY_PROTOCOL=true if it sends the PROXY protocol header.
+proxy_protocol = os.getenv("GUNICORN_PROXY_PROTOCOL", "false").lower() == "true"
 
 # Worker processes
-# Use CPU count * 2 + 1 for optimal performance
-workers = multiprocessing.cpu_count() * 2 + 1
-worker_class = "gthread"  # Thread-based workers for better I/O handling
-threads = 4  # 4 threads per worker for concurrent request handling
-worker_connections = 1000
+# CPUs this process may run on (cpuset/affinity aware, unlike cpu_count(),
+# which reports every host CPU inside a container)
+usable_cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+# Use usable CPUs * 2 + 1 unless GUNICORN_WORKERS is set
+workers = int(os.getenv("GUNICORN_WORKERS", 2 * usable_cpus + 1))
+
+# Worker class: gthread by default. Set GUNICORN_WORKER_CLASS=gevent (needs
+# gevent, plus psycogreen for Postgres) on instances that only queue jobs
+# (USE_ASYNC_CONVERSION) and serve uploads/downloads: greenlets hold far more
+# idle connections than threads. Keep gthread where conversions run inline,
+# since CPU-bound Pillow/PDF work would block every greenlet in the worker.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+if worker_class == "gevent":
+    worker_connections = 2000  # Concurrent greenlets per worker
+else:
+    threads = int(os.getenv("GUNICORN_THREADS", 4))  # Threads per worker
+    worker_connections = 1000
 
 # Timeouts
 timeout = 300  # 5 minutes - allows large file uploads and video processing
 graceful_timeout = 30  # 30 seconds for graceful worker restart
-keepalive = 5  # Keep connections alive for 5 seconds
+# Idle keep-alive (seconds). Behind an ALB, set GUNICORN_KEEPALIVE above
+# the balancer's idle timeout (e.g. 65 for the default 60) so gunicorn never
+# closes a connection the balancer is about to reuse.
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
 
 # Request limits
 # Increased to handle large video files (up to 500MB)
@@ -45,9 +66,38 @@ user = None
 group = None
 tmp_upload_dir = None
 
-# Preload app for faster worker spawning (optional)
-preload_app = False
+# Import Django once in the master; workers share its pages copy-on-write.
+# Not with gevent, whose monkey-patching must happen before the app is imported.
+preload_app = worker_class != "gevent"
 
 # Worker restart settings
 max_requests = 1000  # Restart workers after 1000 requests (prevent memory leaks)
-max_requests_jitter = 50  # Add randomness to avoid all workers restarting at once
+max_requests_jitter = 500  # Spread restarts over 1000-1500 requests so workers don't recycle together
+
+
+def on_starting(server):
+    """Log the sizing inputs so the worker count is explainable from the logs."""
+    server.log.info(f"Usable CPUs: {usable_cpus}, workers: {workers}, worker class: {worker_class}")
+
+
+def post_fork(server, worker):
+    """
+    Reset per-process state after fork.
+    
+    With preload_app, any database connection the master opened while
+    importing the app would be shared by every worker; close it so each
+    opens its own. (random is reseeded by Python itself on fork.)
+    Under gevent, make psycopg2 cooperative (the worker patches the stdlib).
+    """
+    if preload_app:
+        from django.db import connections
+        connections.close_all()
+    
+    if worker_class != "gevent":
+        return
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        server.log.warning("psycogreen not installed: database calls will block gevent workers")
+        return
+    patch_psycopg()
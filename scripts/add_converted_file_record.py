@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+"""
+Codemod: make task modules record their outputs as ConvertedFile rows
+with original_filename, for the unified download architecture.
+
+Each file is parsed once with ast and two fixes are applied:
+
+- job.mark_completed(job.output_file...) with no ConvertedFile.objects.create
+  after it in the same block gets the creation code inserted after it.
+- A ConvertedFile.objects.create(...) right after job.mark_completed(...) that
+  has no original_filename gets one, generated just before the call.
+
+Either fix also adds a module-level generate_clean_output_filename import if
+the module lacks one. Files are only written when something changed, and the
+changes are printed as a unified diff. Running it again is a no-op.
+
+Usage:
+    python scripts/add_converted_file_record.py [--check] [task files...]
+
+With no files, the audio, video, image and pdf task modules are processed.
+--check reports the diff without writing and exits 1 if anything would change.
+"""
+import argparse
+import ast
+import difflib
+import os
+import sys
+
+DEFAULT_TASK_FILES = [
+    'apps/audio/tasks.py',
+    'apps/video/tasks.py',
+    'apps/image/tasks.py',
+    'apps/pdf/tasks.py',
+]
+
+# Imported once at module level rather than at every insertion site
+IMPORT_LINE = 'from apps.core.utils import generate_clean_output_filename'
+
+CLEAN_FILENAME = [
+    'clean_filename = generate_clean_output_filename(',
+    "    original_name=job.input_file.name.split('/')[-1],",
+    '    output_format={output_format}',
+    ')',
+]
+
+CONVERTED_FILE = [
+    '',
+    '# Generate clean filename and create ConvertedFile',
+    *CLEAN_FILENAME,
+    '',
+    'ConvertedFile.objects.create(',
+    '    conversion_job=job,',
+    '    output_file=job.output_file,',
+    '    original_filename=clean_filename,',
+    '    output_format=job.output_format,',
+    '    file_size=get_file_size(output_path)',
+    ')',
+]
+
+
+def is_method_call(node, owner, attr):
+    """Whether node is a call of owner.attr(...), e.g. job.mark_completed(...)."""
+    if not isinstance(node, ast.Call) or not isinstance(node.func, ast.Attribute):
+        return False
+    func = node.func
+    return func.attr == attr and ast.unparse(func.value) == owner
+
+
+def find_call(statements, owner, attr):
+    """First call of owner.attr(...) inside the statements, or None."""
+    for statement in statements:
+        for node in ast.walk(statement):
+            if is_method_call(node, owner, attr):
+                return node
+    return None
+
+
+def indented(lines, col_offset, **fields):
+    """Template lines indented to col_offset, with fields filled in."""
+    indent = ' ' * col_offset
+    return [indent + line.format(**fields) if line else '' for line in lines]
+
+
+def import_insertion(tree):
+    """
+    Where to add the module-level generate_clean_output_filename import.
+
+    Returns:
+        (line index, lines) after the last top-level import, or None if the
+        module already imports it
+    """
+    last_import = None
+    for statement in tree.body:
+        if not isinstance(statement, (ast.Import, ast.ImportFrom)):
+            continue
+        if (
+            isinstance(statement, ast.ImportFrom)
+            and statement.module == 'apps.core.utils'
+            and any(alias.name == 'generate_clean_output_filename' for alias in statement.names)
+        ):
+            return None
+        last_import = statement
+    return (last_import.end_lineno if last_import else 0, [IMPORT_LINE])
+
+
+def find_insertions(source, tree):
+    """
+    Collect the lines to insert into one module.
+
+    Returns:
+        List of (line index, lines) to insert, with indentation applied
+    """
+    insertions = []
+    for node in ast.walk(tree):
+        for field in ('body', 'orelse', 'finalbody'):
+            block = getattr(node, field, None)
+            if not isinstance(block, list):
+                continue
+            for index, statement in enumerate(block):
+                if not (
+                    isinstance(statement, ast.Expr)
+                    and is_method_call(statement.value, 'job', 'mark_completed')
+                ):
+                    continue
+
+                following = block[index + 1:]
+                create = find_call(following[:1], 'ConvertedFile.objects', 'create')
+                if create is not None:
+                    insertions.extend(original_filename_insertions(source, following[0], create))
+                elif (
+                    'job.output_file' in ast.unparse(statement)
+                    and find_call(following, 'ConvertedFile.objects', 'create') is None
+                ):
+                    insertions.append((
+                        statement.end_lineno,
+                        indented(CONVERTED_FILE, statement.col_offset, output_format='job.output_format')
+                    ))
+
+    if insertions:
+        insertion = import_insertion(tree)
+        if insertion:
+            insertions.append(insertion)
+    return insertions
+
+
+def original_filename_insertions(source, statement, create):
+    """Lines adding original_filename to a create call that lacks it."""
+    keywords = {keyword.arg: keyword for keyword in create.keywords}
+    if 'original_filename' in keywords or 'output_format' not in keywords:
+        return []
+
+    output_format = keywords['output_format']
+    return [
+        # Generate the name just before the create statement...
+        (
+            statement.lineno - 1,
+            indented(
+                ['', '# Generate clean filename for user', *CLEAN_FILENAME],
+                statement.col_offset,
+                output_format=ast.get_source_segment(source, output_format.value)
+            )
+        ),
+        # ...and pass it after the output_format argument
+        (
+            output_format.value.end_lineno,
+            [' ' * output_format.col_offset + 'original_filename=clean_filename,']
+        ),
+    ]
+
+
+def transform(source):
+    """Return source with the ConvertedFile fixes applied."""
+    # Both fixes hang off a mark_completed call; skip parsing modules without one
+    if 'mark_completed' not in source:
+        return source
+
+    newline = '\r\n' if '\r\n' in source else '\n'
+    lines = source.splitlines()
+
+    # Insert bottom-up so earlier line numbers stay valid
+    insertions = find_insertions(source, ast.parse(source))
+    for index, new_lines in sorted(insertions, key=lambda item: item[0], reverse=True):
+        lines[index:index] = new_lines
+
+    result = newline.join(lines)
+    if source.endswith(newline):
+        result += newline
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='*', default=DEFAULT_TASK_FILES)
+    parser.add_argument('--check', action='store_true', help="don't write, exit 1 on changes")
+    args = parser.parse_args(argv)
+
+    changed = False
+    for path in args.paths:
+        if not os.path.exists(path):
+            print(f"WARNING: {path} not found!", file=sys.stderr)
+            continue
+
+        # newline='' keeps CRLF files as CRLF
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            source = f.read()
+        result = transform(source)
+        if result == source:
+            continue
+
+        changed = True
+        sys.stdout.writelines(difflib.unified_diff(
+            source.splitlines(keepends=True),
+            result.splitlines(keepends=True),
+            fromfile=f'a/{path}',
+            tofile=f'b/{path}'
+        ))
+        if not args.check:
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                f.write(result)
+
+    return 1 if args.check and changed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())